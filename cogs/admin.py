@@ -1,15 +1,30 @@
 # cogs/admin.py
 
+import asyncio
 import discord
 from discord import app_commands
 from discord.ext import commands
 import io
 import re
+import sqlite3
+from typing import Literal
 from utils.checks import is_exec
+from utils.command_sync import last_synced, sync_command_tree
+from utils.assets import asset_index, icon_cache
+from utils.boot import run_deferred
+from utils.loop_monitor import loop_monitor
+from utils.member_index import member_index
+from utils.admission import COMMAND_COSTS, admission, admission_controlled
+from utils.memory import format_bytes
+from utils.metrics import METRICS_DUMP_INTERVAL_SECONDS, METRICS_DUMP_PATH, metrics
+from utils.query_engine import QueryTimeout, run_readonly_query
+from utils.query_trace import query_tracer
+from utils.response_cache import response_cache
+from utils.single_flight import single_flight
+from utils.snapshot import SNAPSHOT_POLL_SECONDS, analytics_snapshot
 from core.constants import ALLOWED_CHANNELS
 from db import (
     update_discord_id,
-    execute_select_query,
     insert_embed,
     get_alt_igns,
     delete_alt_ign,
@@ -19,6 +34,9 @@ from db import (
     queue_exists,
     insert_scoreboard,
     delete_match,
+    get_counters,
+    get_screenshot_store_stats,
+    refresh_analytics_snapshot,
 )
 
 
@@ -39,9 +57,50 @@ class SlashContext:
         return await self.interaction.response.send_message(content=content, **kwargs)
 
 
+PERF_KINDS = {"command", "slash", "db", "queue", "loop"}
+PERF_SORT_KEYS = {"p95": "p95_ms", "p99": "p99_ms", "p50": "p50_ms", "count": "count", "total": "total_s", "errors": "errors"}
+
+
 class Admin(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.metrics_dump_task = None
+        self.snapshot_task = None
+
+    async def cog_load(self):
+        if METRICS_DUMP_PATH:
+            self.metrics_dump_task = asyncio.create_task(self.dump_metrics_loop())
+        # The bot logs in before setup_hook loads the cogs; offline tools load
+        # them without logging in and must not copy the database.
+        if analytics_snapshot.enabled and self.bot.user is not None:
+            self.snapshot_task = asyncio.create_task(self.refresh_snapshot_loop())
+
+    def cog_unload(self):
+        for task in (self.metrics_dump_task, self.snapshot_task):
+            if task and not task.done():
+                task.cancel()
+
+    async def dump_metrics_loop(self):
+        while True:
+            await asyncio.sleep(METRICS_DUMP_INTERVAL_SECONDS)
+            try:
+                await asyncio.to_thread(metrics.dump, METRICS_DUMP_PATH)
+            except OSError as e:
+                print(f"Could not write metrics to {METRICS_DUMP_PATH}: {e}")
+
+    async def refresh_snapshot_loop(self):
+        # The first build copies the whole database, so it waits for ready
+        # (and the fast-boot delay) like the other startup work.
+        await run_deferred(self.bot, "analytics_snapshot", refresh_analytics_snapshot)
+        # Refreshes are cheap to check for and run off the event loop; the
+        # backup only holds the live database's read lock a page batch at a time.
+        while True:
+            await asyncio.sleep(SNAPSHOT_POLL_SECONDS)
+            try:
+                if analytics_snapshot.refresh_due():
+                    await asyncio.to_thread(refresh_analytics_snapshot)
+            except Exception as e:
+                print(f"Analytics snapshot refresh failed: {e}")
 
     async def _slash_exec_ctx(self, interaction):
         ctx = SlashContext(interaction)
@@ -68,24 +127,48 @@ class Admin(commands.Cog):
         if ctx:
             await self.link_disc.callback(self, ctx, old_id, new_id)
 
-    @commands.command(name="query", help="Execute a SELECT SQL query. Only for Executives.")
+    @commands.command(
+        name="query",
+        help=(
+            "Execute a read-only SQL query. Only for Executives.\n"
+            "Queries stop after QUERY_TIMEOUT_SECONDS; large results are sent as a gzipped CSV."
+        ),
+    )
     @commands.check(is_exec)
+    @admission_controlled("query")
     async def query(self, ctx, *, sql_query: str):
+        sql_query = sql_query.strip().strip("`")
+        if sql_query.lower().startswith("sql\n"):
+            sql_query = sql_query[4:]
         try:
-            results = execute_select_query(sql_query)
-            if results:
-                formatted_results = "\n".join([str(row) for row in results])
-                if len(formatted_results) > 1900:
-                    await ctx.send("Query Results:", file=discord.File(io.StringIO(formatted_results), "results.txt"))
-                else:
-                    await ctx.send(f"```\n{formatted_results}\n```")
-            else:
-                await ctx.send("No results found.")
-        except Exception as e:
-            print(f"Error in query command: {e}")
+            result = await asyncio.to_thread(run_readonly_query, sql_query)
+        except QueryTimeout as e:
+            await ctx.send(f"{e} Narrow it down (a `LIMIT`, a `WHERE` on an indexed column) and try again.")
+            return
+        except sqlite3.Error as e:
             await ctx.send(f"An error occurred while executing the query: {e}")
+            return
 
-    @app_commands.command(name="query", description="Exec: execute a SELECT SQL query.")
+        try:
+            if not result.columns:
+                await ctx.send("Query ran; it returns no rows.")
+                return
+            if result.row_count == 0:
+                await ctx.send("No results found.")
+                return
+            formatted_results = "\n".join([str(tuple(result.columns))] + [str(row) for row in result.preview])
+            if result.complete_preview and len(formatted_results) <= 1900:
+                await ctx.send(f"```\n{formatted_results}\n```")
+                return
+            summary = (
+                f"{result.row_count} row(s), {format_bytes(result.csv_bytes)} of CSV in {result.elapsed:.1f}s"
+                + (f"; stopped at the {result.truncated}." if result.truncated else ".")
+            )
+            await ctx.send(summary, file=discord.File(result.csv_file, "query_results.csv.gz"))
+        finally:
+            result.close()
+
+    @app_commands.command(name="query", description="Exec: execute a read-only SQL query.")
     async def query_slash(self, interaction: discord.Interaction, sql_query: str):
         ctx = await self._slash_exec_ctx(interaction)
         if ctx:
@@ -259,7 +342,7 @@ class Admin(commands.Cog):
                 await ctx.send(f"Queue number {queue_value} already exists in the database.")
                 return
 
-            insert_scoreboard(match_data, queue_value)
+            await asyncio.to_thread(insert_scoreboard, match_data, queue_value)
             if match_data.get("is_complete", True):
                 await ctx.send(f"Match {match_id} for queue {queue_value} successfully recorded.")
             else:
@@ -306,6 +389,407 @@ class Admin(commands.Cog):
         if ctx:
             await self.delete_match_cmd.callback(self, ctx, match_id)
 
+    @commands.command(name="ocr_status", help="Show OCR model memory and reload stats. Execs only.")
+    @commands.check(is_exec)
+    async def ocr_status_cmd(self, ctx):
+        listeners = self.bot.get_cog("Listeners")
+        if listeners is None:
+            await ctx.send("The listeners cog is not loaded.")
+            return
+
+        status = listeners.ocr_status()
+        idle_unload = (
+            f"after {status['idle_unload_seconds'] // 60} idle minutes"
+            if status["idle_unload_seconds"] > 0 else "disabled"
+        )
+        prewarm = ", ".join(f"{hour:02d}:00" for hour in status["prewarm_hours"]) or "none"
+        last_load = (
+            f"{status['last_load_seconds']:.1f}s" if status["last_load_seconds"] is not None else "never loaded"
+        )
+        lines = [
+            f"Model: {'loaded' if status['loaded'] else 'unloaded'} (idle {status['idle_seconds'] / 60:.0f} min)",
+            f"Process RSS: {format_bytes(status['rss'])}",
+            f"Idle unload: {idle_unload}; pre-warm hours: {prewarm}",
+            f"Loads: {status['load_count']}, unloads: {status['unload_count']}, last load took {last_load}",
+        ]
+        if status["last_unload"]:
+            unload = status["last_unload"]
+            lines.append(
+                f"Last unload <t:{int(unload['at'])}:R>: RSS {format_bytes(unload['rss_before'])} "
+                f"-> {format_bytes(unload['rss_after'])}"
+            )
+        await ctx.send("\n".join(lines))
+
+    @app_commands.command(name="ocr_status", description="Exec: show OCR model memory and reload stats.")
+    async def ocr_status_slash(self, interaction: discord.Interaction):
+        ctx = await self._slash_exec_ctx(interaction)
+        if ctx:
+            await self.ocr_status_cmd.callback(self, ctx)
+
+    @commands.command(name="screenshot_stats", help="Show screenshot storage and upload reuse stats. Execs only.")
+    @commands.check(is_exec)
+    async def screenshot_stats_cmd(self, ctx):
+        store = get_screenshot_store_stats()
+        counters = get_counters("screenshot_")
+        uploads = counters.get("screenshot_uploads", 0)
+        avoided = counters.get("screenshot_uploads_avoided", 0)
+        served = uploads + avoided
+        reuse_rate = f"{avoided / served * 100:.0f}%" if served else "n/a"
+        await ctx.send(
+            f"Screenshots: {store['rows']} matches, {store['blobs']} distinct images, "
+            f"{store['with_preview']} with previews.\n"
+            f"!match served {served} times: {uploads} uploads, {avoided} served from Discord CDN links "
+            f"({reuse_rate} uploads avoided)."
+        )
+
+    @app_commands.command(name="screenshot_stats", description="Exec: show screenshot storage and upload reuse stats.")
+    async def screenshot_stats_slash(self, interaction: discord.Interaction):
+        ctx = await self._slash_exec_ctx(interaction)
+        if ctx:
+            await self.screenshot_stats_cmd.callback(self, ctx)
+
+    @commands.command(name="member_index", help="Show member name index size and lookup timings. Execs only.")
+    @commands.check(is_exec)
+    async def member_index_cmd(self, ctx):
+        stats = member_index.stats()
+        built = f"<t:{int(stats['built_at'])}:R>" if stats["built_at"] else "not built yet"
+        lines = [f"Members: {stats['members']} in {stats['guilds']} guild(s), {stats['keys']} name keys, built {built}"]
+        for kind, timing in sorted(stats["timings"].items()):
+            lines.append(
+                f"{kind}: {timing['count']} lookups, mean {timing['mean_us']:.1f}µs, max {timing['max_us']:.1f}µs"
+            )
+        await ctx.send("\n".join(lines))
+
+    @app_commands.command(name="member_index", description="Exec: show member name index size and lookup timings.")
+    async def member_index_slash(self, interaction: discord.Interaction):
+        ctx = await self._slash_exec_ctx(interaction)
+        if ctx:
+            await self.member_index_cmd.callback(self, ctx)
+
+    @commands.command(name="asset_stats", help="Show the asset manifest and icon cache stats. Execs only.")
+    @commands.check(is_exec)
+    async def asset_stats_cmd(self, ctx):
+        manifest = asset_index.manifest
+        cache = icon_cache.stats()
+        lines = []
+        if manifest:
+            lines.append(
+                f"Manifest ({asset_index.source}): {len(manifest['champions'])} champions, "
+                f"{len(manifest['maps'])} maps, {len(manifest['missing'])} missing"
+            )
+        else:
+            lines.append("Manifest: not loaded yet")
+        lines.append(
+            f"Icon cache: {cache['entries']} icons, {format_bytes(cache['bytes'])} / {format_bytes(cache['max_bytes'])}, "
+            f"{cache['hits']} hits, {cache['misses']} misses ({cache['hit_rate']:.0f}% hit rate), "
+            f"{cache['evictions']} evictions"
+        )
+        await ctx.send("\n".join(lines))
+
+    @app_commands.command(name="asset_stats", description="Exec: show the asset manifest and icon cache stats.")
+    async def asset_stats_slash(self, interaction: discord.Interaction):
+        ctx = await self._slash_exec_ctx(interaction)
+        if ctx:
+            await self.asset_stats_cmd.callback(self, ctx)
+
+    @commands.command(name="cache_stats", help="Show response cache and query coalescing stats. Execs only.")
+    @commands.check(is_exec)
+    async def cache_stats_cmd(self, ctx):
+        stats = response_cache.stats()
+        flights = single_flight.stats()
+        by_function = ", ".join(
+            f"{name} {count}" for name, count in sorted(flights["coalesced_by_function"].items(), key=lambda item: -item[1])
+        )
+        await ctx.send(
+            f"Response cache: {stats['entries']} entries, {stats['hits']} hits, {stats['misses']} misses "
+            f"({stats['hit_rate']:.0f}% hit rate), {stats['invalidations']} invalidations by new data, "
+            f"{stats['seconds_saved']:.2f}s of query and render time saved.\n"
+            f"Query coalescing: {flights['calls']} calls, {flights['executions']} executed, "
+            f"{flights['coalesced']} joined an in-flight query, {flights['in_flight']} running now"
+            + (f" ({by_function})." if by_function else ".")
+        )
+
+    @app_commands.command(name="cache_stats", description="Exec: show response cache and query coalescing stats.")
+    async def cache_stats_slash(self, interaction: discord.Interaction):
+        ctx = await self._slash_exec_ctx(interaction)
+        if ctx:
+            await self.cache_stats_cmd.callback(self, ctx)
+
+    @commands.command(
+        name="perf",
+        help=(
+            "Show the slowest commands and db queries. Execs only.\n"
+            "Usage: `!perf [command|slash|db|queue|loop] [p95|p99|p50|count|total|errors]`, or `!perf reset`."
+        ),
+    )
+    @commands.check(is_exec)
+    async def perf_cmd(self, ctx, *args):
+        args = [arg.lower() for arg in args]
+        if "reset" in args:
+            metrics.reset()
+            await ctx.send("Performance metrics reset.")
+            return
+
+        kind = next((arg for arg in args if arg in PERF_KINDS), None)
+        sort_name = next((arg for arg in args if arg in PERF_SORT_KEYS), "p95")
+        rows = metrics.top(kind, PERF_SORT_KEYS[sort_name], limit=15)
+        if not rows:
+            await ctx.send("No metrics recorded yet.")
+            return
+
+        header = f"{'Name':<30} {'N':>6} {'Err':>4} {'p50':>7} {'p95':>7} {'p99':>7}"
+        lines = [header, "-" * len(header)]
+        for name, row in rows:
+            if len(name) > 30:
+                name = name[:29] + "…"
+            lines.append(
+                f"{name:<30} {row['count']:>6} {row['errors']:>4} "
+                f"{row['p50_ms']:>7.0f} {row['p95_ms']:>7.0f} {row['p99_ms']:>7.0f}"
+            )
+        title = f"Top {len(rows)} {kind or 'commands and queries'} by {sort_name}"
+        await ctx.send(f"**{title}** (latency in ms, since <t:{int(metrics.started_at)}:R>)\n```\n" + "\n".join(lines) + "\n```")
+
+    @app_commands.command(name="perf", description="Exec: show the slowest commands and db queries.")
+    async def perf_slash(
+        self,
+        interaction: discord.Interaction,
+        kind: Literal["command", "slash", "db", "queue", "loop"] = None,
+        sort: Literal["p95", "p99", "p50", "count", "total", "errors"] = "p95",
+    ):
+        ctx = await self._slash_exec_ctx(interaction)
+        if ctx:
+            await self.perf_cmd.callback(self, ctx, *[arg for arg in (kind, sort) if arg])
+
+    @commands.command(
+        name="slow_queries",
+        help=(
+            "List the slowest logged SQL query shapes with their query plans. Execs only.\n"
+            "Usage: `!slow_queries [limit]`, or `!slow_queries clear`."
+        ),
+    )
+    @commands.check(is_exec)
+    async def slow_queries_cmd(self, ctx, arg: str = "5"):
+        if arg.lower() == "clear":
+            await asyncio.to_thread(query_tracer.clear)
+            await ctx.send("Slow query log cleared.")
+            return
+        if not arg.isdigit() or int(arg) < 1:
+            await ctx.send("Usage: `!slow_queries [limit]` or `!slow_queries clear`.")
+            return
+
+        shapes = await asyncio.to_thread(query_tracer.slowest_shapes, min(int(arg), 25))
+        stats = query_tracer.stats()
+        summary = (
+            f"Traced {stats['statements']} statements in {stats['shapes']} shapes since startup; "
+            f"{stats['slow_logged']} took over {stats['threshold_ms']:.0f} ms."
+        )
+        if not shapes:
+            await ctx.send(f"{summary}\nNo slow queries logged.")
+            return
+
+        blocks = []
+        for shape in shapes:
+            blocks.append(
+                f"[{shape['shape_hash']}] {shape['caller']}: {shape['hits']}x, "
+                f"max {shape['max_ms']:.0f} ms, avg {shape['avg_ms']:.0f} ms, last {shape['rows']} rows, "
+                f"params ({shape['param_shape'] or 'none'})\n"
+                f"{shape['sql']}\n"
+                f"Plan:\n{shape['query_plan'] or '(none)'}"
+            )
+        report = "\n\n".join(blocks)
+        if len(summary) + len(report) < 1900:
+            await ctx.send(f"{summary}\n```\n{report}\n```")
+        else:
+            await ctx.send(summary, file=discord.File(io.StringIO(report), "slow_queries.txt"))
+
+    @app_commands.command(name="slow_queries", description="Exec: list the slowest logged SQL query shapes.")
+    async def slow_queries_slash(self, interaction: discord.Interaction, limit: app_commands.Range[int, 1, 25] = 5):
+        ctx = await self._slash_exec_ctx(interaction)
+        if ctx:
+            await self.slow_queries_cmd.callback(self, ctx, str(limit))
+
+    @commands.command(name="queue_stats", help="Show heavy command admission queue stats. Execs only.")
+    @commands.check(is_exec)
+    async def queue_stats_cmd(self, ctx):
+        stats = admission.stats()
+        rejected = stats["rejected"]
+        costs = ", ".join(f"{name} {cost}" for name, cost in sorted(COMMAND_COSTS.items(), key=lambda item: (-item[1], item[0])))
+        await ctx.send(
+            f"Heavy commands: {stats['active_cost']}/{stats['capacity']} cost units in use, "
+            f"{stats['depth']} queued now (max {stats['max_depth']}).\n"
+            f"Admitted {stats['admitted']}, {stats['queued_total']} of them after queueing; "
+            f"wait p50 {stats['wait_p50_ms']:.0f} ms, p95 {stats['wait_p95_ms']:.0f} ms, max {stats['wait_max_ms']:.0f} ms.\n"
+            f"Rejected: {rejected['queue_full']} with a full queue, {rejected['per_user']} over the per-user limit.\n"
+            f"Costs: {costs}."
+        )
+
+    @app_commands.command(name="queue_stats", description="Exec: show heavy command admission queue stats.")
+    async def queue_stats_slash(self, interaction: discord.Interaction):
+        ctx = await self._slash_exec_ctx(interaction)
+        if ctx:
+            await self.queue_stats_cmd.callback(self, ctx)
+
+    @commands.command(
+        name="loop_lag",
+        help=(
+            "Show event loop lag and what blocked the loop. Execs only.\n"
+            "Usage: `!loop_lag`, `!loop_lag blocks [limit]`, `!loop_lag stack <n>`, "
+            "`!loop_lag debug on|off` or `!loop_lag reset`."
+        ),
+    )
+    @commands.check(is_exec)
+    async def loop_lag_cmd(self, ctx, action: str = None, arg: str = None):
+        action = (action or "").lower()
+        if action == "reset":
+            loop_monitor.reset()
+            await ctx.send("Event loop lag stats reset.")
+            return
+        if action == "debug":
+            if (arg or "").lower() not in ("on", "off"):
+                await ctx.send(f"Blocking-call capture is {'on' if loop_monitor.debug else 'off'}. Usage: `!loop_lag debug on|off`.")
+                return
+            loop_monitor.set_debug(arg.lower() == "on")
+            await ctx.send(
+                f"Blocking-call capture {'enabled' if loop_monitor.debug else 'disabled'}; "
+                f"stacks are taken for blocks over {loop_monitor.threshold_ms:.0f} ms."
+            )
+            return
+        if action == "stack":
+            blocks = loop_monitor.recent_blocks(len(loop_monitor.blocks))
+            if not (arg or "").isdigit() or not 1 <= int(arg) <= len(blocks):
+                await ctx.send(f"Usage: `!loop_lag stack <n>` with n from 1 to {len(blocks)} (1 is the most recent block).")
+                return
+            block = blocks[int(arg) - 1]
+            if not block["stack"]:
+                await ctx.send("No stack was captured for that block; turn on `!loop_lag debug on` to capture them.")
+                return
+            header = f"Blocked {block['blocked_ms']:.0f} ms <t:{block['at']}:R> in {block['label']} (task {block['task']})"
+            if len(block["stack"]) < 1800:
+                await ctx.send(f"{header}\n```\n{block['stack']}\n```")
+            else:
+                await ctx.send(header, file=discord.File(io.StringIO(block["stack"]), "loop_block_stack.txt"))
+            return
+        if action == "blocks":
+            limit = min(int(arg), 20) if (arg or "").isdigit() and int(arg) > 0 else 10
+            blocks = loop_monitor.recent_blocks(limit)
+            if not blocks:
+                await ctx.send(f"No blocks over {loop_monitor.threshold_ms:.0f} ms recorded.")
+                return
+            lines = []
+            for index, block in enumerate(blocks, start=1):
+                where = f" at `{block['site']}`" if block["site"] else ""
+                lines.append(f"{index}. <t:{block['at']}:R> {block['blocked_ms']:.0f} ms in {block['label'] or 'unknown (debug off)'}{where}")
+            await ctx.send(f"**Recent event loop blocks** (`!loop_lag stack <n>` for the stack)\n" + "\n".join(lines))
+            return
+
+        stats = loop_monitor.stats()
+        if not stats["running"]:
+            await ctx.send("The event loop monitor is not running.")
+            return
+        offenders = ", ".join(
+            f"{label} {count}x/{total:.0f} ms" for label, (count, total) in loop_monitor.top_offenders()
+        )
+        await ctx.send(
+            f"Event loop lag over the last {stats['samples']} beats ({stats['interval_ms']:.0f} ms apart): "
+            f"p50 {stats['lag_p50_ms']:.1f} ms, p95 {stats['lag_p95_ms']:.1f} ms, p99 {stats['lag_p99_ms']:.1f} ms, "
+            f"max {stats['lag_max_ms']:.0f} ms since <t:{int(loop_monitor.started_at)}:R>.\n"
+            f"{stats['blocked_total']} block(s) over {stats['threshold_ms']:.0f} ms. "
+            f"Blocking-call capture is {'on' if stats['debug'] else 'off'}."
+            + (f"\nWorst offenders: {offenders}." if offenders else "")
+        )
+
+    @app_commands.command(name="loop_lag", description="Exec: show event loop lag and what blocked the loop.")
+    async def loop_lag_slash(
+        self,
+        interaction: discord.Interaction,
+        action: Literal["blocks", "stack", "debug", "reset"] = None,
+        arg: str = None,
+    ):
+        ctx = await self._slash_exec_ctx(interaction)
+        if ctx:
+            await self.loop_lag_cmd.callback(self, ctx, action, arg)
+
+    @commands.command(
+        name="snapshot_stats",
+        help=(
+            "Show the analytics snapshot's age, refresh time and routing. Execs only.\n"
+            "Usage: `!snapshot_stats [refresh]`; `refresh` rebuilds it now."
+        ),
+    )
+    @commands.check(is_exec)
+    async def snapshot_stats_cmd(self, ctx, mode: str = None):
+        if not analytics_snapshot.enabled:
+            await ctx.send("The analytics snapshot is disabled (`ANALYTICS_SNAPSHOT_PATH` is empty); heavy reads use the live database.")
+            return
+        if (mode or "").lower() == "refresh":
+            refreshed = await asyncio.to_thread(refresh_analytics_snapshot)
+            if not refreshed:
+                await ctx.send(f"Snapshot refresh did not run: {analytics_snapshot.last_error or 'a refresh is already in progress.'}")
+                return
+
+        stats = analytics_snapshot.stats()
+        if not stats["ready"]:
+            error = f" Last error: {stats['last_error']}" if stats["last_error"] else ""
+            await ctx.send(f"No snapshot built yet; heavy reads use the live database.{error}")
+            return
+        routed_total = stats["routed"] + stats["fallbacks"]
+        if stats["pending_writes"]:
+            freshness = (
+                f"{stats['pending_writes']} write(s) not in it yet, oldest {stats['staleness_s']:.0f}s ago "
+                f"(reads fall back to the live database past {stats['max_staleness_s']}s)."
+            )
+        else:
+            freshness = "It has every write."
+        await ctx.send(
+            f"Analytics snapshot `{stats['path']}` ({format_bytes(stats['size_bytes'])}): "
+            f"refreshed {stats['age_s']:.0f}s ago in {stats['refresh_ms']:.0f} ms, {stats['refreshes']} refresh(es), "
+            f"{stats['failures']} failure(s).\n"
+            f"{freshness}\n"
+            f"Heavy reads: {stats['routed']} from the snapshot, {stats['fallbacks']} from the live database"
+            + (f" ({stats['routed'] * 100 / routed_total:.0f}% routed)." if routed_total else ".")
+        )
+
+    @app_commands.command(name="snapshot_stats", description="Exec: show analytics snapshot age and refresh stats.")
+    async def snapshot_stats_slash(self, interaction: discord.Interaction, refresh: bool = False):
+        ctx = await self._slash_exec_ctx(interaction)
+        if ctx:
+            await self.snapshot_stats_cmd.callback(self, ctx, "refresh" if refresh else None)
+
+    @commands.command(
+        name="sync_commands",
+        help=(
+            "Sync slash commands to this server if their definitions changed. Execs only.\n"
+            "Usage: `!sync_commands [force]`; `force` syncs even when nothing changed."
+        ),
+    )
+    @commands.check(is_exec)
+    async def sync_commands_cmd(self, ctx, mode: str = None):
+        if ctx.guild is None:
+            await ctx.send("Run this in the server whose commands should be synced.")
+            return
+        force = (mode or "").lower() == "force"
+        self.bot.tree.copy_global_to(guild=ctx.guild)
+        previous = last_synced(self.bot.tree, ctx.guild)
+        try:
+            synced, count, fingerprint = await sync_command_tree(self.bot.tree, guild=ctx.guild, force=force)
+        except discord.HTTPException as e:
+            await ctx.send(f"Command sync failed: {e}")
+            return
+        if synced:
+            await ctx.send(f"Synced {count} command(s). Tree fingerprint `{fingerprint[:12]}`.")
+        else:
+            synced_at = f" <t:{previous['synced_at']}:R>" if previous else ""
+            await ctx.send(
+                f"{count} command(s) unchanged since the last sync{synced_at} (`{fingerprint[:12]}`). "
+                "Use `!sync_commands force` to sync anyway."
+            )
+
+    @app_commands.command(name="sync_commands", description="Exec: sync slash commands if their definitions changed.")
+    async def sync_commands_slash(self, interaction: discord.Interaction, force: bool = False):
+        ctx = await self._slash_exec_ctx(interaction)
+        if ctx:
+            await self.sync_commands_cmd.callback(self, ctx, "force" if force else None)
+
 
 async def setup(bot):
     await bot.add_cog(Admin(bot))
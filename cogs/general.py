@@ -76,7 +76,7 @@ class General(commands.Cog):
             ("unlink", "Unlink your Discord from an IGN."),
         ],
         "Exec": [
-            ("query", "Run a SELECT query."),
+            ("query", "Run a read-only SQL query."),
             ("ingest_text", "Insert a pasted scoreboard."),
             ("delete_match", "Delete a match by ID."),
             ("add", "Attach a saved screenshot to a match."),
@@ -87,6 +87,17 @@ class General(commands.Cog):
             ("delete_alt", "Delete an alt IGN."),
             ("player_id", "Get internal player ID."),
             ("old_stats", "Legacy raw stats lookup."),
+            ("ocr_status", "OCR model memory and reload stats."),
+            ("screenshot_stats", "Screenshot storage and upload reuse."),
+            ("member_index", "Member name index lookup timings."),
+            ("asset_stats", "Asset manifest and icon cache stats."),
+            ("cache_stats", "Response cache and query coalescing stats."),
+            ("perf", "Slowest commands and db queries."),
+            ("slow_queries", "Slowest SQL query shapes and their plans."),
+            ("queue_stats", "Heavy command queue depth, waits and rejections."),
+            ("loop_lag [blocks|stack|debug]", "Event loop lag and blocking calls."),
+            ("snapshot_stats [refresh]", "Analytics snapshot age and refresh time."),
+            ("sync_commands [force]", "Sync slash commands if they changed."),
         ],
     }
 
@@ -12,24 +12,43 @@ from db import (
     insert_scoreboard,
     get_registered_igns,
     insert_embed,
+    discard_screenshot_files,
     get_match_screenshot,
     link_match_screenshot,
 )
 import tempfile
 import os
+import time
+from datetime import datetime
 from utils.match_screenshots import (
     MAX_SCREENSHOT_BYTES,
     attachment_is_supported,
-    move_screenshot_file,
-    remove_screenshot_file,
     resolve_screenshot_path,
+    save_screenshot,
     screenshot_extension,
 )
+from utils.boot import run_deferred
+from utils.member_index import member_index
+from utils.memory import current_rss_bytes, format_bytes
+from utils.ocr import MatchIdReader
 
 MATCH_DATA_COMMAND_RE = re.compile(r">>\s*match_data\s+(\d{9,12})", re.IGNORECASE)
-OCR_MATCH_ID_RE = re.compile(r"\bID\s*[:#-]?\s*(\d{9,12})(?!\d)", re.IGNORECASE)
-OCR_STANDALONE_MATCH_ID_RE = re.compile(r"(?<!\d)(\d{9,12})(?!\d)")
-OCR_TEXT_ALLOWLIST = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789:/().- "
+
+
+def _parse_prewarm_hours(value):
+    hours = set()
+    for part in (value or "").split(","):
+        part = part.strip()
+        if part.isdigit() and 0 <= int(part) <= 23:
+            hours.add(int(part))
+    return frozenset(hours)
+
+
+# Unload the OCR model after this many idle seconds (0 keeps it resident), and
+# load it ahead of time during these local hours, e.g. OCR_PREWARM_HOURS=18,19,20.
+OCR_IDLE_UNLOAD_SECONDS = int(os.getenv("OCR_IDLE_UNLOAD_SECONDS", "1800"))
+OCR_PREWARM_HOURS = _parse_prewarm_hours(os.getenv("OCR_PREWARM_HOURS", ""))
+OCR_LIFECYCLE_INTERVAL_SECONDS = 60
 
 
 def parse_match_textbox(text):
@@ -121,19 +140,27 @@ def parse_match_textbox(text):
 class Listeners(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.reader = None
+        self.ocr = MatchIdReader()
         self.ocr_lock = asyncio.Lock()
         self.ocr_warmup_task = None
+        self.ocr_lifecycle_task = None
 
     async def cog_load(self):
         # Load the models once in the background so the first real screenshot
-        # does not pay the 20-second initialization cost.
-        self.ocr_warmup_task = asyncio.create_task(self.warm_up_ocr())
+        # does not pay the 20-second initialization cost. With fast boot this
+        # waits until commands are already being served.
+        self.ocr_warmup_task = asyncio.create_task(run_deferred(self.bot, "ocr_warmup", self.warm_up_ocr))
+        # On a cold start the member index is built by on_ready; this covers
+        # reloading the cog on a running bot.
+        if self.bot.is_ready():
+            member_index.build(self.bot.guilds)
+        if OCR_IDLE_UNLOAD_SECONDS > 0 or OCR_PREWARM_HOURS:
+            self.ocr_lifecycle_task = asyncio.create_task(self.ocr_lifecycle_loop())
 
     async def warm_up_ocr(self):
         try:
             async with self.ocr_lock:
-                await asyncio.to_thread(self.get_ocr_reader)
+                await asyncio.to_thread(self.ocr.load)
             print("EasyOCR models loaded and ready.")
         except asyncio.CancelledError:
             raise
@@ -141,8 +168,54 @@ class Listeners(commands.Cog):
             print(f"EasyOCR warmup failed; the next screenshot will retry: {e}")
 
     def cog_unload(self):
-        if self.ocr_warmup_task and not self.ocr_warmup_task.done():
-            self.ocr_warmup_task.cancel()
+        for task in (self.ocr_warmup_task, self.ocr_lifecycle_task):
+            if task and not task.done():
+                task.cancel()
+
+    async def ocr_lifecycle_loop(self):
+        # Drop the model during quiet hours and bring it back before the
+        # scheduled busy hours, so only the first screenshot after a long gap
+        # pays the reload cost.
+        while True:
+            await asyncio.sleep(OCR_LIFECYCLE_INTERVAL_SECONDS)
+            try:
+                idle_seconds = time.monotonic() - self.ocr.last_used
+                prewarm_now = datetime.now().hour in OCR_PREWARM_HOURS
+                if (
+                    self.ocr.loaded
+                    and not prewarm_now
+                    and 0 < OCR_IDLE_UNLOAD_SECONDS <= idle_seconds
+                    and not self.ocr_lock.locked()
+                ):
+                    async with self.ocr_lock:
+                        await asyncio.to_thread(self.ocr.unload)
+                    unload = self.ocr.last_unload
+                    print(
+                        f"Unloaded EasyOCR after {idle_seconds / 60:.0f} idle minutes; "
+                        f"RSS {format_bytes(unload['rss_before'])} -> {format_bytes(unload['rss_after'])}."
+                    )
+                elif not self.ocr.loaded and prewarm_now:
+                    async with self.ocr_lock:
+                        await asyncio.to_thread(self.ocr.load)
+                    self.ocr.last_used = time.monotonic()
+                    print(f"Pre-warmed EasyOCR for scheduled hours in {self.ocr.last_load_seconds:.1f}s.")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"EasyOCR lifecycle check failed: {e}")
+
+    def ocr_status(self):
+        return {
+            "loaded": self.ocr.loaded,
+            "idle_seconds": time.monotonic() - self.ocr.last_used,
+            "idle_unload_seconds": OCR_IDLE_UNLOAD_SECONDS,
+            "prewarm_hours": sorted(OCR_PREWARM_HOURS),
+            "rss": current_rss_bytes(),
+            "load_count": self.ocr.load_count,
+            "unload_count": self.ocr.unload_count,
+            "last_load_seconds": self.ocr.last_load_seconds,
+            "last_unload": self.ocr.last_unload,
+        }
 
     async def find_match_data_command_timestamp(self, channel, match_id, before_message):
         async for message in channel.history(limit=100, before=before_message):
@@ -226,7 +299,7 @@ class Listeners(commands.Cog):
                 )
 
             # Step 5: Insert the data into the database regardless of link status
-            insert_scoreboard(match_data, match_id)
+            await asyncio.to_thread(insert_scoreboard, match_data, match_id)
 
             # Step 6: Send a public confirmation message
             if match_data.get("is_complete", True):
@@ -244,125 +317,6 @@ class Listeners(commands.Cog):
                     queue_number = queue_number_match.group(1)
                     insert_embed(queue_number, embed.to_dict())
 
-    def get_ocr_reader(self):
-        # EasyOCR imports PyTorch, so keep it lazy to avoid spending hundreds of
-        # megabytes until the background warmup begins after Discord connects.
-        os.environ.setdefault("OMP_NUM_THREADS", "1")
-        os.environ.setdefault("MKL_NUM_THREADS", "1")
-
-        import cv2
-        import easyocr
-        import torch
-
-        if self.reader is None:
-            torch.set_num_threads(1)
-            try:
-                torch.set_num_interop_threads(1)
-            except RuntimeError:
-                pass
-
-            if hasattr(torch.backends, "nnpack") and hasattr(torch.backends.nnpack, "set_flags"):
-                torch.backends.nnpack.set_flags(False)
-            cv2.setNumThreads(1)
-
-            self.reader = easyocr.Reader(
-                ["en"],
-                gpu=False,
-                detector=False,
-                recognizer=True,
-                quantize=True,
-                verbose=False,
-            )
-
-        return self.reader
-
-    def get_match_id(self, img):
-        # --- (HELPER) OCR IMAGE PROCESSING ---
-        import cv2
-
-        reader = self.get_ocr_reader()
-
-        image = cv2.imread(img, cv2.IMREAD_GRAYSCALE)
-        if image is None:
-            raise ValueError("Could not read the screenshot image.")
-
-        height, width = image.shape[:2]
-
-        # Cropped ID attachments do not include the literal "ID" label. Only
-        # allow a standalone number when the image itself is a small crop so a
-        # scoreboard stat cannot be mistaken for the match ID.
-        if width <= 1200 and height <= 300:
-            texts = reader.recognize(
-                image,
-                decoder="greedy",
-                batch_size=1,
-                workers=0,
-                detail=0,
-                allowlist="0123456789",
-            )
-            compact_text = "".join(texts).replace(" ", "")
-            found_id = OCR_STANDALONE_MATCH_ID_RE.fullmatch(compact_text)
-            match_id = int(found_id.group(1)) if found_id else None
-            if match_id is not None:
-                return match_id
-
-        # Recognition-only OCR avoids loading EasyOCR's large text detector.
-        # The match metadata occupies one of these overlapping header strips.
-        results = self._recognize_match_id_strips(
-            reader,
-            image,
-            (0.045, 0.06, 0.075, 0.09, 0.105, 0.12, 0.135, 0.15),
-        )
-        match_id = self._find_best_ocr_match_id(results)
-        if match_id is not None:
-            return match_id
-
-        # Some screenshots are cropped through the top of the Victory heading,
-        # moving the metadata line above the normal range.
-        results = self._recognize_match_id_strips(reader, image, (0.015, 0.03))
-        return self._find_best_ocr_match_id(results)
-
-    @staticmethod
-    def _recognize_match_id_strips(reader, image, height_ratios):
-        height, width = image.shape[:2]
-        x_start = int(width * 0.12)
-        x_end = int(width * 0.45)
-        half_height = max(14, int(height * 0.0175))
-        boxes = []
-        for ratio in height_ratios:
-            center = int(height * ratio)
-            boxes.append(
-                [
-                    x_start,
-                    x_end,
-                    max(0, center - half_height),
-                    min(height, center + half_height),
-                ]
-            )
-
-        return reader.recognize(
-            image,
-            horizontal_list=boxes,
-            free_list=[],
-            decoder="greedy",
-            batch_size=1,
-            workers=0,
-            detail=1,
-            allowlist=OCR_TEXT_ALLOWLIST,
-        )
-
-    @staticmethod
-    def _find_best_ocr_match_id(results):
-        candidates = []
-        for _, text, confidence in results:
-            for found_id in OCR_MATCH_ID_RE.finditer(text):
-                candidates.append((confidence, int(found_id.group(1))))
-
-        if not candidates:
-            return None
-
-        return max(candidates, key=lambda candidate: candidate[0])[1]
-
     async def match_results_id_ocr(self, message):
         # --- AUTOMATED MATCH ID PROCESSING ---
         if message.author == self.bot.user or message.channel.name not in ALLOWED_CHANNELS:
@@ -390,17 +344,16 @@ class Listeners(commands.Cog):
                         # Discord event loop so gateway heartbeats remain healthy,
                         # and serialize jobs to cap peak memory usage.
                         async with self.ocr_lock:
-                            match_id = await asyncio.to_thread(self.get_match_id, img_path)
+                            match_id = await asyncio.to_thread(self.ocr.get_match_id, img_path)
 
                         # Send the match id in the chat if it was successfully extracted
                         if match_id:
                             existing = get_match_screenshot(match_id)
                             existing_path = resolve_screenshot_path(existing["file_path"]) if existing else None
                             if not existing_path or not existing_path.exists():
-                                screenshot_path = move_screenshot_file(
+                                screenshot_path, content_hash, preview_path = await asyncio.to_thread(
+                                    save_screenshot,
                                     img_path,
-                                    match_id,
-                                    attachment.id,
                                     extension,
                                 )
                                 if not link_match_screenshot(
@@ -411,8 +364,11 @@ class Listeners(commands.Cog):
                                     attachment_id=attachment.id,
                                     channel_id=message.channel.id,
                                     created_at=int(message.created_at.timestamp()),
+                                    content_hash=content_hash,
+                                    preview_path=preview_path,
+                                    source_path=img_path,
                                 ):
-                                    remove_screenshot_file(screenshot_path)
+                                    discard_screenshot_files(screenshot_path, preview_path)
                             await message.channel.send(f">>match_data {match_id}")
                         else:
                             await message.channel.send("Match ID not found.")
@@ -436,6 +392,30 @@ class Listeners(commands.Cog):
         except Exception as e:
             print(f"Error in on_message processing: {e}")
 
+    @commands.Cog.listener()
+    async def on_ready(self):
+        # Fires again after a full reconnect, when the member cache is rebuilt.
+        member_index.build(self.bot.guilds)
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member):
+        member_index.add_member(member)
+
+    @commands.Cog.listener()
+    async def on_member_update(self, before, after):
+        member_index.add_member(after)
+
+    @commands.Cog.listener()
+    async def on_user_update(self, before, after):
+        for guild in after.mutual_guilds:
+            member = guild.get_member(after.id)
+            if member:
+                member_index.add_member(member)
+
+    @commands.Cog.listener()
+    async def on_member_remove(self, member):
+        member_index.remove_member(member)
+
     @commands.Cog.listener()
     async def on_command_error(self, ctx, error):
         if isinstance(error, commands.CheckFailure):
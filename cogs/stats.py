@@ -1,5 +1,6 @@
 # cogs/stats.py
 
+import asyncio
 import discord
 from discord import app_commands
 from discord.ext import commands
@@ -8,17 +9,31 @@ import re
 import tempfile
 import time
 import unicodedata
-from datetime import datetime, timedelta
 from typing import Literal
+from utils.admission import admission_controlled
 from utils.converters import PlayerConverter, resolve_player_id
+from utils.boot import run_deferred
+from utils.assets import ICON_CACHE_PRELOAD, asset_index, champion_icon_file, preload_champion_icons
+from utils.member_index import member_index
+from utils.response_cache import response_cache, response_key
+from utils.single_flight import single_flight
 from utils.views import TopChampsView
 from utils.checks import is_exec
+from utils.match_filters import (
+    compact_arg as _compact_arg,
+    extract_match_filters as _extract_match_filters,
+    filter_summary as _filter_summary,
+    slash_filter_args as _slash_filter_args,
+    split_words as _split_words,
+    stat_flag as _stat_flag,
+    title_filter_suffix as _title_filter_suffix,
+)
 from utils.match_screenshots import (
     MAX_SCREENSHOT_BYTES,
     attachment_is_supported,
-    move_screenshot_file,
-    remove_screenshot_file,
+    cdn_url_is_fresh,
     resolve_screenshot_path,
+    save_screenshot,
     screenshot_extension,
 )
 from core.constants import CHAMPION_ROLES, get_champions_for_role, resolve_champion_name, resolve_role_name
@@ -31,6 +46,8 @@ from db import (
     get_player_map_winrates,
     get_champion_map_winrates,
     get_champion_overall_stats,
+    get_champions_map_winrates,
+    get_champions_overall_stats,
     get_leaderboard,
     get_champion_leaderboard,
     get_champion_relationship_records,
@@ -41,11 +58,15 @@ from db import (
     get_related_champion_records,
     get_talent_records,
     get_teammate_records,
+    get_most_played_champions,
     get_top_champs,
+    discard_screenshot_files,
     get_match_screenshot,
+    increment_counter,
     link_match_screenshot,
     match_exists,
     resolve_map_name,
+    set_screenshot_cdn_url,
 )
 
 
@@ -69,14 +90,11 @@ async def _save_match_attachment(ctx, match_id, attachment):
         return None, f"Screenshot must be a PNG or JPEG no larger than {MAX_SCREENSHOT_BYTES // (1024 * 1024)} MB."
 
     extension = screenshot_extension(attachment.filename)
-    existing = get_match_screenshot(match_id)
-    old_path = existing["file_path"] if existing else None
     fd, temp_path = tempfile.mkstemp(suffix=extension)
     os.close(fd)
-    new_path = None
     try:
         await attachment.save(temp_path)
-        new_path = move_screenshot_file(temp_path, match_id, attachment.id, extension)
+        new_path, content_hash, preview_path = await asyncio.to_thread(save_screenshot, temp_path, extension)
         saved = link_match_screenshot(
             match_id,
             new_path,
@@ -85,16 +103,15 @@ async def _save_match_attachment(ctx, match_id, attachment):
             attachment_id=attachment.id,
             channel_id=getattr(ctx.channel, "id", None),
             created_at=int(ctx.message.created_at.timestamp()) if getattr(ctx.message, "created_at", None) else None,
+            content_hash=content_hash,
+            preview_path=preview_path,
+            source_path=temp_path,
         )
         if not saved:
-            remove_screenshot_file(new_path)
+            discard_screenshot_files(new_path, preview_path)
             return None, "Could not link the screenshot in the database."
-        if old_path and old_path != new_path:
-            remove_screenshot_file(old_path)
         return new_path, None
     except (OSError, ValueError) as e:
-        if new_path:
-            remove_screenshot_file(new_path)
         return None, str(e)
     finally:
         if os.path.exists(temp_path):
@@ -129,531 +146,6 @@ def _avatar_url(target_user):
     return getattr(avatar, "url", None) if avatar else None
 
 
-def get_champion_icon_path(champion_name):
-    """Formats a champion name into a valid file path for its icon."""
-    base = champion_name.lower().replace("'", "")
-    candidates = [
-        base.replace(" ", "_"),
-        base.replace(" ", "-"),
-        base.replace(" ", ""),
-    ]
-    for formatted_name in candidates:
-        path = os.path.join("icons", "champ_icons", f"{formatted_name}.png")
-        if os.path.exists(path):
-            return path
-    return os.path.join("icons", "champ_icons", f"{candidates[0]}.png")
-
-
-RESULT_FILTER_ALIASES = {
-    "win": "wins", "wins": "wins", "won": "wins", "wonly": "wins",
-    "winonly": "wins", "winsonly": "wins",
-    "loss": "losses", "losses": "losses", "lost": "losses", "lonly": "losses",
-    "lossonly": "losses", "lossesonly": "losses",
-}
-
-TEAM_FILTER_ALIASES = {
-    "team1": 1, "t1": 1, "first": 1, "fp": 1, "firstpick": 1,
-    "team2": 2, "t2": 2, "second": 2, "lastpick": 2, "lp": 2,
-}
-
-SCORE_FILTER_ALIASES = {
-    "close": "close", "closegame": "close",
-    "stomp": "stomp", "stomps": "stomp",
-    "sweep": "sweep", "sweeps": "sweep",
-}
-
-TIME_FILTER_KEYWORDS = {
-    "time", "last", "since", "after", "from", "between", "before", "until", "season",
-}
-
-MISSING_SEASON_MESSAGE = "Executive team regrets to inform you that our accounting team from previous quarters has lost these records."
-
-SEASON_FILTERS = {
-    "2": {
-        "before": "2025-10-04",
-        "label": "Season 2",
-    },
-    "3": {
-        "after": "2025-10-04",
-        "before": "2026-06-12",
-        "label": "Season 3",
-    },
-    "3.5": {
-        "after": "2026-04-01",
-        "before": "2026-06-12",
-        "label": "Season 3.5",
-    },
-    "4": {
-        "after": "2026-06-12",
-        "label": "Season 4",
-    },
-}
-
-FILTER_KEYWORDS = {
-    "map", "with", "against", "vs", "versus", "notvs", "notversus",
-    *TIME_FILTER_KEYWORDS,
-    *RESULT_FILTER_ALIASES.keys(),
-    *TEAM_FILTER_ALIASES.keys(),
-    *SCORE_FILTER_ALIASES.keys(),
-}
-
-
-def _compact_arg(arg):
-    return str(arg).lower().replace("_", "").replace("-", "").replace("'", "")
-
-
-def _parse_scoreline(arg):
-    if "-" not in arg:
-        return None
-    left, right = arg.split("-", 1)
-    if left.isdigit() and right.isdigit():
-        return int(left), int(right)
-    return None
-
-
-def _parse_period_token(arg):
-    key = _compact_arg(arg)
-    match = re.fullmatch(r"(\d+)(d|day|days|w|week|weeks|h|hour|hours)", key)
-    if not match:
-        return None
-
-    amount = int(match.group(1))
-    unit = match.group(2)
-    if amount <= 0:
-        return None
-
-    if unit.startswith("h"):
-        seconds = amount * 60 * 60
-        label_unit = "hour" if amount == 1 else "hours"
-    elif unit.startswith("w"):
-        seconds = amount * 7 * 24 * 60 * 60
-        label_unit = "week" if amount == 1 else "weeks"
-    else:
-        seconds = amount * 24 * 60 * 60
-        label_unit = "day" if amount == 1 else "days"
-    return seconds, f"last {amount} {label_unit}"
-
-
-def _parse_split_period(args, index):
-    if index >= len(args):
-        return None
-    parsed = _parse_period_token(args[index])
-    if parsed:
-        return parsed, index + 1
-    if index + 1 < len(args) and str(args[index]).isdigit():
-        parsed = _parse_period_token(f"{args[index]}{args[index + 1]}")
-        if parsed:
-            return parsed, index + 2
-    return None
-
-
-def _parse_date_start(arg):
-    value = str(arg).strip()
-    for fmt in ("%Y-%m-%d", "%Y/%m/%d"):
-        try:
-            return int(datetime.strptime(value, fmt).timestamp())
-        except ValueError:
-            continue
-    return None
-
-
-def _parse_date_end(arg):
-    value = str(arg).strip()
-    for fmt in ("%Y-%m-%d", "%Y/%m/%d"):
-        try:
-            end_of_day = datetime.strptime(value, fmt) + timedelta(days=1)
-            return int(end_of_day.timestamp())
-        except ValueError:
-            continue
-    return None
-
-
-def _date_filter_error(arg):
-    return f"`{arg}` is not a valid date. Use `YYYY-MM-DD`, for example `2026-05-25`."
-
-
-def _season_key(value):
-    compact = _compact_arg(value).replace(".", "").replace(" ", "")
-    if compact.startswith("season"):
-        compact = compact[len("season"):]
-    elif compact.startswith("s"):
-        compact = compact[1:]
-    if compact == "35":
-        return "3.5"
-    if compact in {"1", "2", "3", "4"}:
-        return compact
-    return None
-
-
-def _apply_season_filter(filters, season):
-    if season == "1":
-        return MISSING_SEASON_MESSAGE
-
-    season_filter = SEASON_FILTERS.get(season)
-    if not season_filter:
-        return "Unknown season. Use `season 4`, `season 3.5`, `season 3`, or `season 2`."
-
-    if season_filter.get("after"):
-        filters["registered_after"] = _parse_date_start(season_filter["after"])
-    else:
-        filters.pop("registered_after", None)
-
-    if season_filter.get("before"):
-        filters["registered_before"] = _parse_date_start(season_filter["before"])
-    else:
-        filters.pop("registered_before", None)
-
-    filters["time_label"] = season_filter["label"]
-    return None
-
-
-def _set_last_registered_filter(filters, seconds, label):
-    filters["registered_after"] = int(time.time()) - seconds
-    filters.pop("registered_before", None)
-    filters["time_label"] = f"Recorded {label}"
-
-
-def _filter_summary(filters):
-    if not filters:
-        return []
-
-    labels = []
-    if filters.get("time_label"):
-        labels.append(filters["time_label"])
-    if filters.get("map"):
-        labels.append(f"Map: {filters['map']}")
-    if filters.get("result") == "wins":
-        labels.append("Wins Only")
-    elif filters.get("result") == "losses":
-        labels.append("Losses Only")
-    if filters.get("team") == 1:
-        labels.append("Team 1")
-    elif filters.get("team") == 2:
-        labels.append("Team 2")
-    if filters.get("scoreline"):
-        labels.append(f"Scoreline {filters['scoreline'][0]}-{filters['scoreline'][1]}")
-    elif filters.get("score_category") == "close":
-        labels.append("Close Games")
-    elif filters.get("score_category") == "stomp":
-        labels.append("Stomps")
-    elif filters.get("score_category") == "sweep":
-        labels.append("Sweeps")
-    for champ in filters.get("vs_champions", []):
-        labels.append(f"Vs {champ}")
-    for champ in filters.get("not_vs_champions", []):
-        labels.append(f"Not Vs {champ}")
-    if filters.get("with_player_name"):
-        labels.append(f"With {filters['with_player_name']}")
-    if filters.get("against_player_name"):
-        labels.append(f"Against {filters['against_player_name']}")
-    return labels
-
-
-def _title_filter_suffix(filters):
-    parts = []
-    if filters.get("time_label"):
-        parts.append(f"({filters['time_label']})")
-    if filters.get("map"):
-        parts.append(f"on {filters['map']}")
-    if filters.get("result") == "wins":
-        parts.append("in Wins")
-    elif filters.get("result") == "losses":
-        parts.append("in Losses")
-    if filters.get("team") == 1:
-        parts.append("on Team 1")
-    elif filters.get("team") == 2:
-        parts.append("on Team 2")
-    if filters.get("scoreline"):
-        parts.append(f"at {filters['scoreline'][0]}-{filters['scoreline'][1]}")
-    elif filters.get("score_category") == "close":
-        parts.append("in Close Games")
-    elif filters.get("score_category") == "stomp":
-        parts.append("in Stomps")
-    elif filters.get("score_category") == "sweep":
-        parts.append("in Sweeps")
-    for champ in filters.get("vs_champions", []):
-        parts.append(f"vs {champ}")
-    for champ in filters.get("not_vs_champions", []):
-        parts.append(f"not vs {champ}")
-    if filters.get("with_player_name"):
-        parts.append(f"with {filters['with_player_name']}")
-    if filters.get("against_player_name"):
-        parts.append(f"against {filters['against_player_name']}")
-    return " " + " ".join(parts) if parts else ""
-
-
-def _slash_filter_args(
-    *,
-    time_range=None,
-    since=None,
-    until=None,
-    map_name=None,
-    result=None,
-    team=None,
-    score=None,
-    with_player=None,
-    against_player=None,
-):
-    args = []
-    if time_range:
-        if _season_key(time_range):
-            args.extend(_split_words(time_range))
-        else:
-            args.extend(["last", time_range])
-    elif since and until:
-        args.extend(["from", since, "to", until])
-    elif since:
-        args.extend(["since", since])
-    elif until:
-        args.extend(["until", until])
-
-    if map_name:
-        args.extend(["map", map_name])
-    if result:
-        args.append(result)
-    if team:
-        args.append(team)
-    if score:
-        args.append(score)
-    if with_player:
-        args.extend(["with", str(with_player.id)])
-    if against_player:
-        args.extend(["against", str(against_player.id)])
-    return args
-
-
-def _split_words(value):
-    return str(value).split() if value else []
-
-
-def _stat_flag(value):
-    if not value:
-        return None
-    value = value.strip().lower()
-    return value if value.startswith("-") else f"-{value}"
-
-
-async def _extract_match_filters(ctx, args):
-    args = list(args)
-    filters = {}
-    remaining = []
-    i = 0
-
-    while i < len(args):
-        arg = str(args[i])
-        raw_key = arg.lower()
-        key = _compact_arg(arg)
-
-        if raw_key == "-m":
-            remaining.append(arg)
-            if i + 1 < len(args) and str(args[i + 1]).isdigit():
-                remaining.append(str(args[i + 1]))
-                i += 2
-            else:
-                i += 1
-            continue
-
-        inline_min_games = re.fullmatch(r"-m(\d+)", raw_key)
-        if inline_min_games:
-            remaining.extend(["-m", inline_min_games.group(1)])
-            i += 1
-            continue
-
-        season = _season_key(arg)
-        consumed_until = i + 1
-        if key == "season":
-            if i + 1 >= len(args):
-                return remaining, filters, "Use `season 4`, `season 3.5`, `season 3`, or `season 2`."
-            season = _season_key(f"season {args[i + 1]}")
-            consumed_until = i + 2
-        if season:
-            season_error = _apply_season_filter(filters, season)
-            if season_error:
-                return remaining, filters, season_error
-            i = consumed_until
-            continue
-
-        standalone_period = _parse_period_token(arg)
-        if standalone_period:
-            seconds, label = standalone_period
-            _set_last_registered_filter(filters, seconds, label)
-            i += 1
-            continue
-
-        if key in {"time", "last"}:
-            period = _parse_split_period(args, i + 1)
-            if not period:
-                return remaining, filters, f"`{arg}` needs a period like `3d`, `7d`, `14d`, or `30d`."
-            (seconds, label), consumed_until = period
-            _set_last_registered_filter(filters, seconds, label)
-            i = consumed_until
-            continue
-
-        if key in {"since", "after"}:
-            if i + 1 >= len(args):
-                return remaining, filters, f"`{arg}` needs a date like `2026-05-25` or a period like `7d`."
-            period = _parse_split_period(args, i + 1)
-            if period:
-                (seconds, label), consumed_until = period
-                _set_last_registered_filter(filters, seconds, label)
-                i = consumed_until
-                continue
-            start_ts = _parse_date_start(args[i + 1])
-            if start_ts is None:
-                return remaining, filters, _date_filter_error(args[i + 1])
-            filters["registered_after"] = start_ts
-            filters.pop("registered_before", None)
-            filters["time_label"] = f"Recorded since {args[i + 1]}"
-            i += 2
-            continue
-
-        if key in {"before", "until"}:
-            if i + 1 >= len(args):
-                return remaining, filters, f"`{arg}` needs a date like `2026-05-25`."
-            end_ts = _parse_date_end(args[i + 1])
-            if end_ts is None:
-                return remaining, filters, _date_filter_error(args[i + 1])
-            filters["registered_before"] = end_ts
-            if filters.get("time_label", "").startswith("Recorded since "):
-                filters["time_label"] = f"{filters['time_label']} until {args[i + 1]}"
-            else:
-                filters["time_label"] = f"Recorded before {args[i + 1]}"
-            i += 2
-            continue
-
-        if key in {"from", "between"}:
-            if i + 2 >= len(args):
-                return remaining, filters, f"`{arg}` needs a start and end date, like `from 2026-05-01 to 2026-05-25`."
-            start_arg = args[i + 1]
-            end_index = i + 2
-            if _compact_arg(args[end_index]) in {"to", "and"} or str(args[end_index]) == "-":
-                end_index += 1
-            if end_index >= len(args):
-                return remaining, filters, f"`{arg}` needs an end date."
-            end_arg = args[end_index]
-            start_ts = _parse_date_start(start_arg)
-            end_ts = _parse_date_end(end_arg)
-            if start_ts is None:
-                return remaining, filters, _date_filter_error(start_arg)
-            if end_ts is None:
-                return remaining, filters, _date_filter_error(end_arg)
-            if start_ts >= end_ts:
-                return remaining, filters, "`from` date must be before the `to` date."
-            filters["registered_after"] = start_ts
-            filters["registered_before"] = end_ts
-            filters["time_label"] = f"Recorded {start_arg} to {end_arg}"
-            i = end_index + 1
-            continue
-
-        if key == "map":
-            resolved_map = None
-            consumed_until = i + 1
-            for end in range(len(args), i + 1, -1):
-                candidate = " ".join(str(part) for part in args[i + 1:end])
-                resolved_map = resolve_map_name(candidate)
-                if resolved_map:
-                    consumed_until = end
-                    break
-            if not resolved_map:
-                return remaining, filters, f"Could not find a map matching `{arg if i + 1 >= len(args) else args[i + 1]}`."
-            filters["map"] = resolved_map
-            i = consumed_until
-            continue
-
-        if key == "only":
-            i += 1
-            continue
-
-        if key in RESULT_FILTER_ALIASES:
-            filters["result"] = RESULT_FILTER_ALIASES[key]
-            i += 1
-            continue
-
-        if key == "team" and i + 1 < len(args) and _compact_arg(args[i + 1]) in {"1", "2"}:
-            filters["team"] = int(_compact_arg(args[i + 1]))
-            i += 2
-            continue
-
-        if key in {"first", "last"} and i + 1 < len(args) and _compact_arg(args[i + 1]) == "pick":
-            filters["team"] = 1 if key == "first" else 2
-            i += 2
-            continue
-
-        if key in TEAM_FILTER_ALIASES:
-            filters["team"] = TEAM_FILTER_ALIASES[key]
-            i += 1
-            continue
-
-        if key in SCORE_FILTER_ALIASES:
-            filters["score_category"] = SCORE_FILTER_ALIASES[key]
-            filters.pop("scoreline", None)
-            i += 1
-            continue
-
-        scoreline = _parse_scoreline(raw_key)
-        if scoreline:
-            filters["scoreline"] = scoreline
-            filters.pop("score_category", None)
-            i += 1
-            continue
-
-        if key in {"vs", "versus", "notvs", "notversus"} or (key == "not" and i + 1 < len(args) and _compact_arg(args[i + 1]) in {"vs", "versus"}):
-            negated_vs = key in {"notvs", "notversus"} or key == "not"
-            champion_start = i + 2 if key == "not" else i + 1
-            if champion_start >= len(args):
-                return remaining, filters, f"`{arg}` needs a champion after it."
-            resolved_champion = None
-            consumed_until = champion_start
-            for end in range(len(args), champion_start, -1):
-                candidate = " ".join(str(part) for part in args[champion_start:end])
-                resolved_champion = resolve_champion_name(candidate)
-                if resolved_champion:
-                    consumed_until = end
-                    break
-            if not resolved_champion:
-                return remaining, filters, f"Could not find a champion matching `{args[champion_start]}`."
-            filter_key = "not_vs_champions" if negated_vs else "vs_champions"
-            filters.setdefault(filter_key, [])
-            if resolved_champion not in filters[filter_key]:
-                filters[filter_key].append(resolved_champion)
-            i = consumed_until
-            continue
-
-        if key in {"with", "against"}:
-            if i + 1 >= len(args):
-                return remaining, filters, f"`{arg}` needs a player after it."
-            player_arg = str(args[i + 1])
-            try:
-                player = await PlayerConverter().convert(ctx, player_arg)
-            except commands.BadArgument as exc:
-                return remaining, filters, str(exc)
-
-            player_id = resolve_player_id(player)
-            if not player_id:
-                return remaining, filters, f"No stats found for `{player_arg}`."
-
-            filters[f"{key}_player_id"] = player_id
-            filters[f"{key}_player_name"] = player.display_name
-            i += 2
-            continue
-
-        remaining.append(arg)
-        i += 1
-
-    return remaining, filters, None
-
-
-from utils.match_filters import (
-    compact_arg as _compact_arg,
-    extract_match_filters as _extract_match_filters,
-    filter_summary as _filter_summary,
-    slash_filter_args as _slash_filter_args,
-    split_words as _split_words,
-    stat_flag as _stat_flag,
-    title_filter_suffix as _title_filter_suffix,
-)
-
-
 def _resolve_leading_map(args):
     args = list(args)
     for end in range(len(args), 0, -1):
@@ -694,6 +186,23 @@ class Stats(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
+    async def cog_load(self):
+        # Resolve every champion/map asset once so missing files are reported
+        # at boot and icon lookups in commands are plain dict reads.
+        asset_index.load()
+        print(f"Loaded asset manifest from {asset_index.source}.")
+        # The most-played query scans player_stats and the icon cache fills on
+        # demand anyway, so preloading never needs to hold up the cog load.
+        self.icon_preload_task = asyncio.create_task(run_deferred(self.bot, "icon_preload", self._preload_icons))
+
+    def cog_unload(self):
+        if not self.icon_preload_task.done():
+            self.icon_preload_task.cancel()
+
+    def _preload_icons(self):
+        preloaded = preload_champion_icons(get_most_played_champions(ICON_CACHE_PRELOAD))
+        print(f"Preloaded {preloaded} champion icon(s) into memory.")
+
     def _slash_ctx(self, interaction):
         return SlashContext(interaction)
 
@@ -907,6 +416,7 @@ class Stats(commands.Cog):
             ],
             "match": [
                 "`!match 1280311793` - Show the saved screenshot for a match.",
+                "`!match 1280311793 full` - Send the original image instead of the preview.",
                 "`!matchss 1280311793` - Alias for `!match`.",
                 "`!screenshot 1280311793` - Another alias for `!match`.",
                 "`!add 1280311793` - Exec: attach the first screenshot to a recorded match.",
@@ -1130,29 +640,63 @@ class Stats(commands.Cog):
     @commands.command(
         name="match",
         aliases=["matchss", "screenshot"],
-        help="Show the saved screenshot for a match ID. Usage: `!match <match_id>`.",
+        help=(
+            "Show the saved screenshot for a match ID. Sends a compressed preview; "
+            "add `full` for the original. Usage: `!match <match_id> [full]`."
+        ),
     )
-    async def match_cmd(self, ctx, match_id: int):
+    async def match_cmd(self, ctx, match_id: int, quality: str = None):
         screenshot = get_match_screenshot(match_id)
         if not screenshot:
             await ctx.send(f"No saved screenshot found for match `{match_id}`.")
             return
 
-        file_path = resolve_screenshot_path(screenshot["file_path"])
+        want_full = str(quality or "").lower() in {"full", "original", "orig"}
+        preview_path = None if want_full else resolve_screenshot_path(screenshot.get("preview_path"))
+        use_preview = bool(preview_path and preview_path.exists())
+        file_path = preview_path if use_preview else resolve_screenshot_path(screenshot["file_path"])
+        content = None
+        if use_preview:
+            content = f"Preview of match `{match_id}`. Use `!match {match_id} full` for the original."
+
+        # The bot's last upload (or the original attachment for full size) is
+        # usually still on Discord's CDN; linking it avoids another upload.
+        if use_preview:
+            cached_urls = [screenshot.get("preview_cdn_url")]
+        else:
+            cached_urls = [screenshot.get("full_cdn_url"), screenshot.get("source_url")]
+        cached_url = next((url for url in cached_urls if cdn_url_is_fresh(url)), None)
+        if cached_url:
+            embed = discord.Embed(title=f"Match {match_id}")
+            embed.set_image(url=cached_url)
+            try:
+                await ctx.send(content, embed=embed)
+                increment_counter("screenshot_uploads_avoided")
+                return
+            except discord.HTTPException:
+                pass
+
         if not file_path or not file_path.exists():
             await ctx.send(f"The saved screenshot for match `{match_id}` is missing from disk.")
             return
 
         try:
-            await ctx.send(file=discord.File(file_path, filename=file_path.name))
+            message = await ctx.send(content, file=discord.File(file_path, filename=f"{match_id}{file_path.suffix}"))
         except discord.HTTPException:
             await ctx.send(f"The saved screenshot for match `{match_id}` could not be uploaded to Discord.")
+            return
+
+        increment_counter("screenshot_uploads")
+        attachments = getattr(message, "attachments", None)
+        if attachments:
+            set_screenshot_cdn_url(match_id, attachments[0].url, full=not use_preview)
 
     @app_commands.command(name="match", description="Show the saved screenshot for a match ID.")
-    async def match_slash(self, interaction: discord.Interaction, match_id: int):
+    @app_commands.describe(full="Send the original image instead of the compressed preview.")
+    async def match_slash(self, interaction: discord.Interaction, match_id: int, full: bool = False):
         await interaction.response.defer()
         ctx = self._slash_ctx(interaction)
-        await self.match_cmd.callback(self, ctx, match_id)
+        await self.match_cmd.callback(self, ctx, match_id, "full" if full else None)
 
     @commands.command(
         name="add",
@@ -1216,6 +760,7 @@ class Stats(commands.Cog):
             "- `!cstats bk map jaguar falls season 3`"
         ),
     )
+    @admission_controlled("cstats")
     async def champion_stats_cmd(self, ctx, *args):
         start_time = time.monotonic()
         args, match_filters, filter_error = await _extract_match_filters(ctx, args)
@@ -1270,9 +815,8 @@ class Stats(commands.Cog):
             color=discord.Color.blue(),
         )
         embed.description = "```\n" + "\n".join(_format_stat_block(data)) + "\n```"
-        icon_path = get_champion_icon_path(champion_name)
-        if os.path.exists(icon_path):
-            icon_file = discord.File(icon_path, filename="champ_icon.png")
+        icon_file = champion_icon_file(champion_name, "champ_icon.png")
+        if icon_file:
             embed.set_thumbnail(url="attachment://champ_icon.png")
 
         footer_parts = [f"Fetched in {int((time.monotonic() - start_time) * 1000)}ms"]
@@ -1335,6 +879,9 @@ class Stats(commands.Cog):
     async def _player_display_name(self, row):
         discord_id = row.get("discord_id")
         if discord_id:
+            indexed_name = member_index.display_name(discord_id)
+            if indexed_name:
+                return _strip_rating_suffix(indexed_name) or row.get("player_ign")
             member = None
             if getattr(self.bot, "get_user", None):
                 member = self.bot.get_user(int(discord_id))
@@ -1413,6 +960,7 @@ class Stats(commands.Cog):
         aliases=["talentwr", "talentstats"],
         help="Show talent winrates for a champion. Usage: `!talents <champion> [-m games] [filters]`.",
     )
+    @admission_controlled("talents")
     async def talents_cmd(self, ctx, *args):
         start_time = time.monotonic()
         args, match_filters, filter_error = await _extract_match_filters(ctx, args)
@@ -1452,6 +1000,7 @@ class Stats(commands.Cog):
         aliases=["picks", "pr"],
         help="Show champion pickrates. Usage: `!pickrate [role] [best|worst] [-m games] [filters]`.",
     )
+    @admission_controlled("pickrate")
     async def pickrate_cmd(self, ctx, *args):
         start_time = time.monotonic()
         args, match_filters, filter_error = await _extract_match_filters(ctx, args)
@@ -1486,6 +1035,7 @@ class Stats(commands.Cog):
         embed.set_footer(text="   •   ".join(footer_parts), icon_url=ctx.guild.icon.url if ctx.guild and ctx.guild.icon else None)
         await ctx.send(embed=embed)
 
+    @admission_controlled("pair_summary")
     async def _pair_summary_cmd(self, ctx, relation, *args):
         start_time = time.monotonic()
         args, match_filters, filter_error = await _extract_match_filters(ctx, args)
@@ -1589,6 +1139,7 @@ class Stats(commands.Cog):
             "- `!mates me nando map jaguar falls`"
         ),
     )
+    @admission_controlled("mates")
     async def mates_cmd(self, ctx, *args):
         start_time = time.monotonic()
         args = list(args)
@@ -1750,6 +1301,7 @@ class Stats(commands.Cog):
         except commands.BadArgument as exc:
             await ctx.send(str(exc))
 
+    @admission_controlled("enemies")
     async def _enemy_records_cmd(self, ctx, *args):
         start_time = time.monotonic()
         args = list(args)
@@ -1919,6 +1471,7 @@ class Stats(commands.Cog):
         except commands.BadArgument as exc:
             await ctx.send(str(exc))
 
+    @admission_controlled("related_champs")
     async def _related_champs_cmd(self, ctx, relation, *args):
         start_time = time.monotonic()
         args = list(args)
@@ -2036,6 +1589,7 @@ class Stats(commands.Cog):
     async def againstchamps_cmd(self, ctx, *args):
         await self._related_champs_cmd(ctx, "against", *args)
 
+    @admission_controlled("champion_relationship")
     async def _champion_relationship_cmd(self, ctx, relation, *args):
         start_time = time.monotonic()
         args, match_filters, filter_error = await _extract_match_filters(ctx, args)
@@ -2252,7 +1806,7 @@ class Stats(commands.Cog):
                     await ctx.send("Internal error: Could not find champions for that role.")
                     return
 
-                role_stats = get_player_stats(player_id, champions=champs_in_role, filters=match_filters)
+                role_stats = await single_flight.run(get_player_stats, player_id, champions=champs_in_role, filters=match_filters)
 
                 if not role_stats or role_stats["games"] == 0:
                     await ctx.send(f"No stats found for {target_user.display_name} playing the '{role_name}' role.")
@@ -2302,21 +1856,20 @@ class Stats(commands.Cog):
                     await ctx.send(f"No stats found for {target_user.display_name} on a champion or role matching '{filter_str}'.")
                     return
                 
-                champ_stats = get_player_stats(player_id, champions=[full_champion_name], filters=match_filters)
+                champ_stats = await single_flight.run(get_player_stats, player_id, champions=[full_champion_name], filters=match_filters)
                 if not champ_stats or champ_stats["games"] == 0:
                     await ctx.send(f"No stats found for {target_user.display_name} on {full_champion_name}.")
                     return
 
-                global_stats = get_player_stats(player_id, filters=match_filters)
+                global_stats = await single_flight.run(get_player_stats, player_id, filters=match_filters)
 
                 author_icon = _avatar_url(target_user)
                 if author_icon:
                     embed.set_author(name=f"{target_user.display_name}'s Stats", icon_url=author_icon)
                 else:
                     embed.set_author(name=f"{target_user.display_name}'s Stats")
-                icon_path = get_champion_icon_path(full_champion_name)
-                if os.path.exists(icon_path):
-                    icon_file = discord.File(icon_path, filename="icon.png")
+                icon_file = champion_icon_file(full_champion_name, "icon.png")
+                if icon_file:
                     embed.set_thumbnail(url="attachment://icon.png")
                 
                 champ_data = {
@@ -2357,7 +1910,7 @@ class Stats(commands.Cog):
 
         # --- GENERAL STATS (No Filter) ---
         else:
-            stats = get_player_stats(player_id, filters=match_filters)
+            stats = await single_flight.run(get_player_stats, player_id, filters=match_filters)
             if not stats or stats["games"] == 0:
                 await ctx.send(f"No stats found for {target_user.display_name}.")
                 return
@@ -2666,7 +2219,7 @@ Shows champion statistics breakdown for a player.
             stat_flags = ['winrate', 'kda_ratio', 'games', 'time_played']
         
         # Get champion stats
-        champ_data = get_player_champion_stats(
+        champ_data = await single_flight.run(get_player_champion_stats,
             player_id, role_filter=role_filter, min_games=min_games, filters=match_filters
         )
         
@@ -3056,7 +2609,7 @@ Shows champion statistics breakdown for a player.
             )
             return
 
-        history = get_match_history(player_id, limit, filters=match_filters)
+        history = await single_flight.run(get_match_history, player_id, limit, filters=match_filters)
         if not history:
             await ctx.send(f"No match history found for {target_user.display_name}.")
             return
@@ -3215,7 +2768,14 @@ Show a player's winrate on every map, with optional role/champion filters.
                 champions = [champion_name]
                 filter_name = champion_name
 
-        rows = get_player_map_winrates(
+        cache_key = response_key(
+            "map_winrates", player_id, target_user.display_name, filter_name, champions,
+            min_games, sort_by_winrate, filters=match_filters,
+        )
+        if await response_cache.send_cached(ctx, cache_key):
+            return
+        render_started = time.perf_counter()
+        rows = await single_flight.run(get_player_map_winrates,
             player_id,
             champions=champions,
             filters=match_filters,
@@ -3236,9 +2796,8 @@ Show a player's winrate on every map, with optional role/champion filters.
         embed = discord.Embed(title=title, color=discord.Color.blue())
         icon_file = None
         if champions and len(champions) == 1:
-            champ_icon = get_champion_icon_path(champions[0])
-            if os.path.exists(champ_icon):
-                icon_file = discord.File(champ_icon, filename="champ_icon.png")
+            icon_file = champion_icon_file(champions[0], "champ_icon.png")
+            if icon_file:
                 embed.set_thumbnail(url="attachment://champ_icon.png")
         rows = rows[:35]
         name_width = min(24, max(len(row["map"]) for row in rows))
@@ -3264,6 +2823,12 @@ Show a player's winrate on every map, with optional role/champion filters.
             footer_parts.append("Filters: " + "; ".join(active_filters))
         if footer_parts:
             embed.set_footer(text=" • ".join(footer_parts))
+        response_cache.put(
+            cache_key,
+            embed,
+            icon=(champions[0], "champ_icon.png") if icon_file else None,
+            render_seconds=time.perf_counter() - render_started,
+        )
         await ctx.send(embed=embed, file=icon_file)
 
     @app_commands.command(name="mapwr", description="Show a player's winrate on every map.")
@@ -3343,6 +2908,7 @@ Compare two champions overall and by map.
         aliases=["ccompare", "champcmp", "cc", "comparechamps"],
         help=CHAMPION_COMPARE_HELP,
     )
+    @admission_controlled("champcompare")
     async def champion_compare_cmd(self, ctx, *args):
         args, match_filters, filter_error = await _extract_match_filters(ctx, args)
         if filter_error:
@@ -3361,8 +2927,9 @@ Compare two champions overall and by map.
             await ctx.send("Pick two different champions to compare.")
             return
 
-        first_stats = get_champion_overall_stats(first_champ, filters=match_filters)
-        second_stats = get_champion_overall_stats(second_champ, filters=match_filters)
+        overall_stats = await single_flight.run(get_champions_overall_stats, [first_champ, second_champ], filters=match_filters)
+        first_stats = overall_stats[first_champ]
+        second_stats = overall_stats[second_champ]
         if not first_stats and not second_stats:
             await ctx.send(f"No comparison data found for {first_champ} or {second_champ}.")
             return
@@ -3400,8 +2967,9 @@ Compare two champions overall and by map.
         stat_lines = [header, "-" * len(header)]
         stat_lines.extend(f"{name:<12} {left:>12} {right:>12}" for name, left, right in rows)
 
-        first_maps = {row["map"]: row for row in get_champion_map_winrates(first_champ, filters=match_filters)}
-        second_maps = {row["map"]: row for row in get_champion_map_winrates(second_champ, filters=match_filters)}
+        map_winrates = await single_flight.run(get_champions_map_winrates, [first_champ, second_champ], filters=match_filters)
+        first_maps = {row["map"]: row for row in map_winrates[first_champ]}
+        second_maps = {row["map"]: row for row in map_winrates[second_champ]}
         map_names = sorted(set(first_maps) | set(second_maps), key=str.lower)
 
         def map_cell(row):
@@ -3502,6 +3070,7 @@ Show one champion's winrate on every map.
         aliases=["cmapwr", "champmaps", "champmap", "champ_mapwr"],
         help=CHAMPION_MAP_WINRATES_HELP,
     )
+    @admission_controlled("champmapwr")
     async def champion_map_winrates_cmd(self, ctx, *args):
         args, match_filters, filter_error = await _extract_match_filters(ctx, args)
         if filter_error:
@@ -3551,10 +3120,8 @@ Show one champion's winrate on every map.
 
         title = f"Map Winrates for {champion_name}{_title_filter_suffix(match_filters)}"
         embed = discord.Embed(title=title, color=discord.Color.blue())
-        icon_file = None
-        champ_icon = get_champion_icon_path(champion_name)
-        if os.path.exists(champ_icon):
-            icon_file = discord.File(champ_icon, filename="champ_icon.png")
+        icon_file = champion_icon_file(champion_name, "champ_icon.png")
+        if icon_file:
             embed.set_thumbnail(url="attachment://champ_icon.png")
 
         rows = rows[:35]
@@ -3689,6 +3256,7 @@ Shows player rankings, with optional filters for champions or roles.
 """
 
     @commands.command(name="leaderboard", aliases=["lb"], help=LEADERBOARD_HELP)
+    @admission_controlled("leaderboard")
     async def leaderboard_cmd(self, ctx, *args):
         # --- Stat Mapping (Complete with all stats) ---
         stat_map = {
@@ -3798,7 +3366,14 @@ Shows player rankings, with optional filters for champions or roles.
         display_name, data_key, formatter = stat_map[stat_alias]
         if not champion_filter and not role_filter and data_key in ["healing_pm", "avg_healing", "damage_healing_pm", "damage_healed_pct"]:
             role_filter = "Support"
-        leaderboard_data = get_leaderboard(
+        cache_key = response_key(
+            "leaderboard", getattr(ctx.guild, "id", None), display_name, data_key, limit, show_bottom,
+            champion_filter, role_filter, min_games, filters=match_filters,
+        )
+        if await response_cache.send_cached(ctx, cache_key):
+            return
+        render_started = time.perf_counter()
+        leaderboard_data = await single_flight.run(get_leaderboard,
             data_key, limit, show_bottom,
             champion=champion_filter, role=role_filter, min_games=min_games, filters=match_filters
         )
@@ -3846,6 +3421,7 @@ Shows player rankings, with optional filters for champions or roles.
             description.append(f"`{rank:2}.` **{name}** - {formatted_value}")
         
         embed.description = "\n".join(description)
+        response_cache.put(cache_key, embed, render_seconds=time.perf_counter() - render_started)
         await ctx.send(embed=embed)
 
     @app_commands.command(name="leaderboard", description="Show player rankings with structured filters.")
@@ -3923,6 +3499,7 @@ This is the same as using `!lb ... map <map name>`.
 """
 
     @commands.command(name="map", aliases=["maplb"], help=MAP_HELP)
+    @admission_controlled("map")
     async def map_cmd(self, ctx, *args):
         if not args:
             await ctx.send("Usage: `!map <map name> [stat] [champion/role] [filters]`")
@@ -4009,6 +3586,7 @@ This is the same as using `!lb ... map <map name>`.
             "- `!compare lulub DTC map jaguar falls`"
         ),
     )
+    @admission_controlled("compare")
     async def compare_cmd(self, ctx, *args):
         args, match_filters, filter_error = await _extract_match_filters(ctx, args)
         if filter_error:
@@ -4056,7 +3634,15 @@ This is the same as using `!lb ... map <map name>`.
             await ctx.send("Could not find stats for one or both players. Ensure they have linked their IGNs.")
             return
 
-        result = compare_by_player_ids(pid1, pid2, filters=match_filters)
+        cache_key = response_key(
+            "compare",
+            *((pid, user.name, user.display_name, _avatar_url(user)) for pid, user in ((pid1, user1), (pid2, user2))),
+            filters=match_filters,
+        )
+        if await response_cache.send_cached(ctx, cache_key):
+            return
+        render_started = time.perf_counter()
+        result = await single_flight.run(compare_by_player_ids, pid1, pid2, filters=match_filters)
         if not result:
             await ctx.send("Could not find stats for one or both players. Ensure they have linked their IGNs.")
             return
@@ -4150,6 +3736,7 @@ This is the same as using `!lb ... map <map name>`.
             inline=False
         )
         
+        response_cache.put(cache_key, embed, render_seconds=time.perf_counter() - render_started)
         await ctx.send(embed=embed)
 
     @app_commands.command(name="compare", description="Head-to-head comparison between two linked Discord users.")
@@ -4256,6 +3843,7 @@ Shows champion rankings aggregated across all players.
 """
 
     @commands.command(name="champ_lb", aliases=["clb", "champleaderboard"], help=CHAMPION_LEADERBOARD_HELP)
+    @admission_controlled("champ_lb")
     async def champion_leaderboard_cmd(self, ctx, *args):
         # --- Stat Mapping (Same as player leaderboard) ---
         stat_map = {
@@ -4361,7 +3949,14 @@ Shows champion rankings aggregated across all players.
         
         # --- 2. Fetch Data ---
         display_name, data_key, formatter = stat_map[stat_alias]
-        leaderboard_data = get_champion_leaderboard(
+        cache_key = response_key(
+            "champion_leaderboard", display_name, data_key, limit, show_bottom,
+            role_filter, min_games, filters=match_filters,
+        )
+        if await response_cache.send_cached(ctx, cache_key):
+            return
+        render_started = time.perf_counter()
+        leaderboard_data = await single_flight.run(get_champion_leaderboard,
             data_key, limit, show_bottom,
             role=role_filter, min_games=min_games, filters=match_filters
         )
@@ -4400,6 +3995,7 @@ Shows champion rankings aggregated across all players.
             description.append(f"`{rank:2}.` **{champ_name}** - {formatted_value} *({games} games)*")
         
         embed.description = "\n".join(description)
+        response_cache.put(cache_key, embed, render_seconds=time.perf_counter() - render_started)
         await ctx.send(embed=embed)
 
     @app_commands.command(name="champ_lb", description="Show champion rankings with structured filters.")
@@ -1,11 +1,18 @@
+import functools
 import json
+import os
 import re
 import sqlite3
+import threading
 import time as time_module
 import unicodedata
+from collections.abc import Mapping
 
 from core.constants import CHAMPION_ROLES, get_champions_for_role, resolve_champion_name
-from utils.match_screenshots import remove_screenshot_file
+from utils.match_screenshots import remove_screenshot_file, resolve_screenshot_path
+from utils.metrics import instrumented
+from utils.query_trace import connect as _traced_connect
+from utils.snapshot import analytics_snapshot
 
 CHAMPION_NAME_FIXES = {
     "Ghrok": "Grohk",
@@ -51,6 +58,65 @@ MAP_DISPLAY_ALIASES = {
     "Warders Gate Custom": "Warder's Gate",
 }
 
+DATABASE_PATH = "match_data.db"
+# Bump whenever create_database gains a table, column, index or migration, so
+# fast boot knows the on-disk schema needs the full pass before serving.
+SCHEMA_VERSION = 3
+# How long a connection waits on another writer's lock before "database is
+# locked". Kept above QUERY_TIMEOUT_SECONDS (utils/query_engine.py) so an
+# ingest never gives up while a capped !query is still running.
+DB_BUSY_TIMEOUT_SECONDS = float(os.getenv("DB_BUSY_TIMEOUT_SECONDS", "15"))
+
+
+def _connect():
+    # Every connection is traced; see utils/query_trace.py and !slow_queries.
+    return _traced_connect(DATABASE_PATH, timeout=DB_BUSY_TIMEOUT_SECONDS)
+
+
+def _connect_analytics():
+    """Connection for heavy reads: the analytics snapshot while it is fresh enough, else the live database.
+
+    Returns ``(conn, on_snapshot)``; the snapshot has the precomputed
+    ``player_match_shares`` table that :func:`_match_shares_ctes` can use.
+    """
+    snapshot_path = analytics_snapshot.read_path()
+    if snapshot_path is None:
+        return _connect(), False
+    return _traced_connect(f"file:{snapshot_path}?mode=ro", uri=True), True
+
+
+# Incremented after every committed write that can change stats output
+# (matches, player_stats, players). Caches in front of the read API include
+# it in their keys so a write makes every older entry unreachable.
+# Snapshot refreshes bump it from a worker thread, and ``+=`` is not atomic.
+_data_generation = 0
+_data_generation_lock = threading.Lock()
+
+
+def get_data_generation():
+    return _data_generation
+
+
+def _increment_data_generation():
+    global _data_generation
+    with _data_generation_lock:
+        _data_generation += 1
+
+
+def _bump_data_generation():
+    _increment_data_generation()
+    analytics_snapshot.note_write()
+
+
+def refresh_analytics_snapshot():
+    """Rebuild the analytics snapshot from the live database; True if a new one is in place."""
+    refreshed = analytics_snapshot.refresh(DATABASE_PATH)
+    if refreshed:
+        # Heavy reads now see newer data, so responses cached from the old
+        # snapshot must go too. Not a write, so the snapshot is not told.
+        _increment_data_generation()
+    return refreshed
+
 
 def _norm(value):
     """Return the NFC form of a string, trimmed of surrounding whitespace.
@@ -111,8 +177,121 @@ def _win_condition(player_alias):
     )
 
 
-def _apply_match_filters(where_conditions, params, filters=None, player_alias="ps"):
-    filters = filters or {}
+CHAMPION_FILTER_KEYS = (
+    "include_champions",
+    "exclude_champions",
+    "with_champions",
+    "not_with_champions",
+    "vs_champions",
+    "not_vs_champions",
+)
+# Labels only change how a filter is shown, never which rows match.
+FILTER_DISPLAY_KEYS = {"time_label", "map", "with_player_name", "against_player_name"}
+MATCH_FILTER_CACHE_SIZE = 1024
+
+
+def _freeze_filter_value(value):
+    if isinstance(value, Mapping):
+        return tuple(sorted((key, _freeze_filter_value(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze_filter_value(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted(value))
+    return value
+
+
+class MatchFilters(Mapping):
+    """Immutable, hashable match filters, normalized once when parsed.
+
+    Reads like the loose ``filters`` dicts it replaces (``filters.get("map")``),
+    so formatters and query helpers take either. Champion lists are sorted
+    tuples, the map carries every raw name it matches, and equal filters hash
+    equal, so an instance is directly usable as a cache key. :meth:`compile`
+    turns it into SQL conditions and parameters, cached per filter set.
+    """
+
+    __slots__ = ("_values", "_hash", "_sql_key")
+
+    def __init__(self, values=None):
+        values = {
+            key: _freeze_filter_value(value)
+            for key, value in (values or {}).items()
+            if value not in (None, "", [], (), {})
+        }
+        for key in CHAMPION_FILTER_KEYS:
+            if key in values:
+                values[key] = tuple(sorted(set(values[key])))
+        if values.get("map"):
+            values["map_names"] = tuple(related_map_names(values["map"]))
+        if "talent" in values:
+            values["talent"] = str(values["talent"]).strip()
+        if "scoreline" in values:
+            values["scoreline"] = tuple(int(score) for score in values["scoreline"])
+            values.pop("score_category", None)
+        for key in ("team", "registered_after", "registered_before", "with_player_id", "against_player_id"):
+            if key in values:
+                values[key] = int(values[key])
+        self._values = values
+        self._sql_key = tuple(sorted(item for item in values.items() if item[0] not in FILTER_DISPLAY_KEYS))
+        self._hash = hash(tuple(sorted(values.items())))
+
+    @classmethod
+    def coerce(cls, filters):
+        if isinstance(filters, cls):
+            return filters
+        return cls(filters) if filters else NO_MATCH_FILTERS
+
+    def replace(self, **changes):
+        values = dict(self._values)
+        values.pop("map_names", None)
+        values.update(changes)
+        return MatchFilters(values)
+
+    def __getitem__(self, key):
+        return self._values[key]
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other):
+        if isinstance(other, MatchFilters):
+            return self._hash == other._hash and self._values == other._values
+        return super().__eq__(other)
+
+    def __repr__(self):
+        return f"MatchFilters({self._values!r})"
+
+    @property
+    def sql_key(self):
+        """The part of the filters that decides which rows match."""
+        return self._sql_key
+
+    @property
+    def active(self):
+        """True if any filter excludes rows; display-only keys do not count."""
+        return bool(self._sql_key)
+
+    def compile(self, player_alias="ps"):
+        """Return ``(conditions, params)`` tuples for a query joining ``player_stats {player_alias}`` and ``matches m``."""
+        if not self._sql_key:
+            return (), ()
+        return _compile_match_filters(self._sql_key, player_alias)
+
+
+NO_MATCH_FILTERS = MatchFilters()
+
+
+@functools.lru_cache(maxsize=MATCH_FILTER_CACHE_SIZE)
+def _compile_match_filters(sql_key, player_alias):
+    filters = dict(sql_key)
+    where_conditions = []
+    params = []
 
     if filters.get("registered_after") is not None:
         where_conditions.append("m.registered_at >= ?")
@@ -122,8 +301,8 @@ def _apply_match_filters(where_conditions, params, filters=None, player_alias="p
         where_conditions.append("m.registered_at < ?")
         params.append(filters["registered_before"])
 
-    if filters.get("map"):
-        map_names = related_map_names(filters["map"])
+    if filters.get("map_names"):
+        map_names = filters["map_names"]
         placeholders = ", ".join("?" for _ in map_names)
         where_conditions.append(f"m.map IN ({placeholders})")
         params.extend(map_names)
@@ -246,6 +425,70 @@ def _apply_match_filters(where_conditions, params, filters=None, player_alias="p
         )
         params.append(filters["against_player_id"])
 
+    return tuple(where_conditions), tuple(params)
+
+
+def _apply_match_filters(where_conditions, params, filters=None, player_alias="ps"):
+    conditions, filter_params = MatchFilters.coerce(filters).compile(player_alias)
+    where_conditions.extend(conditions)
+    params.extend(filter_params)
+
+
+def _match_shares_ctes(where_conditions, player_alias, narrowed=True, materialized=False):
+    """``Filtered``, ``TeamTotals`` and ``MatchShares`` CTEs for the rows matching ``where_conditions``.
+
+    The conditions (on ``player_stats {player_alias}`` and ``matches m``) are
+    applied in the innermost scan, and team totals are only summed for the
+    matches that survive them, so a filtered query reads rows in proportion
+    to what it matches rather than the whole history. ``MatchShares`` has
+    every ``player_stats`` column plus the share and team damage columns.
+
+    Pass ``narrowed=False`` when nothing but the played-match condition
+    applies: every played match survives then, and collecting the ID list
+    first only adds work to the full scan. With ``materialized`` (a
+    connection from :func:`_connect_analytics` on the snapshot)
+    ``MatchShares`` reads the precomputed ``player_match_shares``.
+    """
+    where_clause = " AND ".join(where_conditions) or "1"
+    if materialized:
+        return f"""
+        MatchShares AS (
+            SELECT {player_alias}.*
+            FROM player_match_shares {player_alias}
+            JOIN matches m ON {player_alias}.match_id = m.match_id
+            WHERE {where_clause}
+        )"""
+    team_totals_where = "WHERE match_id IN (SELECT match_id FROM Filtered)" if narrowed else ""
+    return f"""
+        Filtered AS (
+            SELECT {player_alias}.*
+            FROM player_stats {player_alias}
+            JOIN matches m ON {player_alias}.match_id = m.match_id
+            WHERE {where_clause}
+        ),
+        TeamTotals AS (
+            SELECT
+                match_id,
+                team,
+                SUM(kills + assists) AS team_kill_participations,
+                SUM(damage) AS team_damage
+            FROM player_stats
+            {team_totals_where}
+            GROUP BY match_id, team
+        ),
+        MatchShares AS (
+            SELECT
+                f.*,
+                tt.team_kill_participations,
+                tt.team_damage,
+                COALESCE(ott.team_damage, 0) AS enemy_team_damage,
+                CASE WHEN tt.team_kill_participations > 0 THEN CAST(f.kills + f.assists AS REAL) * 100.0 / tt.team_kill_participations ELSE 0 END AS kill_share,
+                CASE WHEN tt.team_damage > 0 THEN CAST(f.damage AS REAL) * 100.0 / tt.team_damage ELSE 0 END AS damage_share
+            FROM Filtered f
+            JOIN TeamTotals tt ON f.match_id = tt.match_id AND f.team = tt.team
+            LEFT JOIN TeamTotals ott ON f.match_id = ott.match_id AND f.team != ott.team
+        )"""
+
 
 def _find_player_row_by_ign(cursor, ign):
     """Find a ``players`` row whose main or alt IGN matches ``ign`` (NFC + case-insensitive).
@@ -302,12 +545,13 @@ def _refresh_match_completeness(cursor):
     )
 
 
+@instrumented("db")
 def backfill_match_registered_at(match_timestamps):
     """Backfill missing match registration timestamps from Discord history."""
     if not match_timestamps:
         return 0
 
-    conn = sqlite3.connect("match_data.db")
+    conn = _connect()
     cursor = conn.cursor()
     try:
         updated = 0
@@ -323,6 +567,7 @@ def backfill_match_registered_at(match_timestamps):
             )
             updated += cursor.rowcount
         conn.commit()
+        _bump_data_generation()
         return updated
     except sqlite3.Error as e:
         print(f"Backfill registered_at failed: {e}")
@@ -338,7 +583,8 @@ def _get_match_screenshot_row(cursor, match_id):
             """
             SELECT
                 match_id, file_path, source_url, message_id, attachment_id,
-                channel_id, created_at, saved_at
+                channel_id, created_at, saved_at, content_hash, preview_path,
+                preview_cdn_url, full_cdn_url
             FROM match_screenshots
             WHERE match_id = ?;
             """,
@@ -349,6 +595,68 @@ def _get_match_screenshot_row(cursor, match_id):
     return cursor.fetchone()
 
 
+def _screenshot_file_references(cursor, file_path):
+    cursor.execute(
+        """
+        SELECT COUNT(*)
+        FROM match_screenshots
+        WHERE file_path = ? OR preview_path = ?;
+        """,
+        (file_path, file_path),
+    )
+    return cursor.fetchone()[0]
+
+
+def _collect_screenshot_files(cursor, file_paths):
+    """Delete stored images that no match_screenshots row references anymore.
+
+    Called outside a transaction. The reference check and the unlink happen
+    under the write lock, so they cannot interleave with a
+    :func:`link_match_screenshot` that is about to reuse the same blob.
+    """
+    removed = 0
+    cursor.execute("BEGIN IMMEDIATE;")
+    try:
+        for file_path in {path for path in file_paths if path}:
+            if _screenshot_file_references(cursor, file_path) == 0 and remove_screenshot_file(file_path):
+                removed += 1
+    finally:
+        cursor.connection.commit()
+    return removed
+
+
+@instrumented("db")
+def discard_screenshot_files(*file_paths):
+    """Remove images saved for a link that failed, unless another match shares them."""
+    conn = _connect()
+    cursor = conn.cursor()
+    try:
+        return _collect_screenshot_files(cursor, file_paths)
+    finally:
+        conn.close()
+
+
+@instrumented("db")
+def get_screenshot_store_stats():
+    conn = _connect()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            """
+            SELECT
+                COUNT(*),
+                COUNT(DISTINCT COALESCE(content_hash, file_path)),
+                SUM(CASE WHEN preview_path IS NOT NULL THEN 1 ELSE 0 END)
+            FROM match_screenshots;
+            """
+        )
+        rows, blobs, previews = cursor.fetchone()
+        return {"rows": rows, "blobs": blobs, "with_preview": previews or 0}
+    finally:
+        conn.close()
+
+
+@instrumented("db")
 def link_match_screenshot(
     match_id,
     file_path,
@@ -358,24 +666,35 @@ def link_match_screenshot(
     channel_id=None,
     created_at=None,
     saved_at=None,
+    content_hash=None,
+    preview_path=None,
+    source_path=None,
 ):
-    """Store or replace the locally saved OCR image for a match."""
+    """Store or replace the locally saved OCR image for a match.
+
+    Files of a replaced screenshot are deleted once no other match refers to
+    the same content-addressed blob or preview. ``source_path`` is the upload
+    :func:`~utils.match_screenshots.store_screenshot_file` left behind when it
+    reused an existing blob; if a cleanup removed that blob before this link
+    took the write lock, it is put back from there.
+    """
     if not file_path:
         return False
 
     match_id = int(match_id)
     created_at = int(created_at) if created_at is not None else None
     saved_at = int(saved_at or time_module.time())
-    conn = sqlite3.connect("match_data.db")
+    conn = _connect()
     cursor = conn.cursor()
     try:
+        previous = _get_match_screenshot_row(cursor, match_id)
         cursor.execute(
             """
             INSERT INTO match_screenshots (
                 match_id, file_path, source_url, message_id, attachment_id,
-                channel_id, created_at, saved_at
+                channel_id, created_at, saved_at, content_hash, preview_path
             )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             ON CONFLICT(match_id) DO UPDATE SET
                 file_path = excluded.file_path,
                 source_url = excluded.source_url,
@@ -383,7 +702,17 @@ def link_match_screenshot(
                 attachment_id = excluded.attachment_id,
                 channel_id = excluded.channel_id,
                 created_at = excluded.created_at,
-                saved_at = excluded.saved_at;
+                saved_at = excluded.saved_at,
+                content_hash = excluded.content_hash,
+                preview_path = excluded.preview_path,
+                preview_cdn_url = CASE
+                    WHEN match_screenshots.content_hash IS excluded.content_hash
+                    THEN match_screenshots.preview_cdn_url
+                END,
+                full_cdn_url = CASE
+                    WHEN match_screenshots.content_hash IS excluded.content_hash
+                    THEN match_screenshots.full_cdn_url
+                END;
             """,
             (
                 match_id,
@@ -394,6 +723,8 @@ def link_match_screenshot(
                 str(channel_id) if channel_id is not None else None,
                 created_at,
                 saved_at,
+                content_hash,
+                preview_path,
             ),
         )
         if created_at is not None:
@@ -405,9 +736,24 @@ def link_match_screenshot(
                 """,
                 (created_at, match_id),
             )
+        # The INSERT holds the write lock, so no cleanup can remove the files
+        # between this check and the commit.
+        stored_path = resolve_screenshot_path(file_path)
+        if not stored_path or not stored_path.exists():
+            if not (source_path and os.path.exists(source_path)):
+                print(f"Link match screenshot failed for {match_id}: {file_path} is missing.")
+                conn.rollback()
+                return False
+            os.replace(source_path, stored_path)
+        if preview_path:
+            stored_preview = resolve_screenshot_path(preview_path)
+            if not stored_preview or not stored_preview.exists():
+                cursor.execute("UPDATE match_screenshots SET preview_path = NULL WHERE match_id = ?;", (match_id,))
         conn.commit()
+        if previous:
+            _collect_screenshot_files(cursor, (previous[1], previous[9]))
         return True
-    except sqlite3.Error as e:
+    except (sqlite3.Error, OSError) as e:
         print(f"Link match screenshot failed for {match_id}: {e}")
         conn.rollback()
         return False
@@ -415,8 +761,65 @@ def link_match_screenshot(
         conn.close()
 
 
+@instrumented("db")
+def set_screenshot_cdn_url(match_id, url, full=False):
+    """Remember where the bot's own upload of this screenshot lives on Discord's CDN."""
+    column = "full_cdn_url" if full else "preview_cdn_url"
+    conn = _connect()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            f"UPDATE match_screenshots SET {column} = ? WHERE match_id = ?;",
+            (url, int(match_id)),
+        )
+        conn.commit()
+    except sqlite3.Error as e:
+        print(f"Saving screenshot CDN URL failed for {match_id}: {e}")
+        conn.rollback()
+    finally:
+        conn.close()
+
+
+@instrumented("db")
+def increment_counter(name, amount=1):
+    conn = _connect()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            """
+            INSERT INTO bot_counters (name, value)
+            VALUES (?, ?)
+            ON CONFLICT(name) DO UPDATE SET value = value + excluded.value;
+            """,
+            (name, int(amount)),
+        )
+        conn.commit()
+    except sqlite3.Error as e:
+        print(f"Incrementing counter {name} failed: {e}")
+        conn.rollback()
+    finally:
+        conn.close()
+
+
+@instrumented("db")
+def get_counters(prefix=""):
+    conn = _connect()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            "SELECT name, value FROM bot_counters WHERE name LIKE ? ORDER BY name;",
+            (f"{prefix}%",),
+        )
+        return dict(cursor.fetchall())
+    except sqlite3.OperationalError:
+        return {}
+    finally:
+        conn.close()
+
+
+@instrumented("db")
 def get_match_screenshot(match_id):
-    conn = sqlite3.connect("match_data.db")
+    conn = _connect()
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     try:
@@ -426,8 +829,12 @@ def get_match_screenshot(match_id):
         conn.close()
 
 
+@instrumented("db")
 def create_database(match_registered_at=None):
-    conn = sqlite3.connect("match_data.db")
+    conn = _connect()
+    # Reads run in worker threads alongside ingest; in WAL mode they no longer
+    # block the writer (or it them). The mode is stored in the file.
+    conn.execute("PRAGMA journal_mode = WAL;")
     cursor = conn.cursor()
     cursor.execute(
         """
@@ -455,7 +862,19 @@ def create_database(match_registered_at=None):
             attachment_id TEXT,
             channel_id TEXT,
             created_at INTEGER,
-            saved_at INTEGER NOT NULL
+            saved_at INTEGER NOT NULL,
+            content_hash TEXT,
+            preview_path TEXT,
+            preview_cdn_url TEXT,
+            full_cdn_url TEXT
+        );
+        """
+    )
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS bot_counters (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL DEFAULT 0
         );
         """
     )
@@ -542,6 +961,24 @@ def create_database(match_registered_at=None):
         ON match_screenshots(saved_at);
         """
     )
+    cursor.execute("PRAGMA table_info(match_screenshots);")
+    screenshot_columns = [row[1] for row in cursor.fetchall()]
+    if "content_hash" not in screenshot_columns:
+        print("Adding 'content_hash' column to match_screenshots table...")
+        cursor.execute("ALTER TABLE match_screenshots ADD COLUMN content_hash TEXT;")
+    if "preview_path" not in screenshot_columns:
+        print("Adding 'preview_path' column to match_screenshots table...")
+        cursor.execute("ALTER TABLE match_screenshots ADD COLUMN preview_path TEXT;")
+    for column in ("preview_cdn_url", "full_cdn_url"):
+        if column not in screenshot_columns:
+            print(f"Adding '{column}' column to match_screenshots table...")
+            cursor.execute(f"ALTER TABLE match_screenshots ADD COLUMN {column} TEXT;")
+    cursor.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_match_screenshots_content_hash
+        ON match_screenshots(content_hash);
+        """
+    )
 
     cursor.execute("PRAGMA table_info(player_stats);")
     columns = [row[1] for row in cursor.fetchall()]
@@ -556,14 +993,62 @@ def create_database(match_registered_at=None):
             "SELECT 1 FROM player_stats WHERE team IS NULL OR team NOT IN (1, 2) LIMIT 1;"
         )
         needs_team_migration = cursor.fetchone() is not None
+    # Filtered stats queries scan only the matching rows and then sum team
+    # totals per match; these keep both halves proportional to the filter.
+    cursor.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_player_stats_match_team
+        ON player_stats(match_id, team, kills, assists, damage);
+        """
+    )
+    cursor.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_player_stats_champ
+        ON player_stats(champ);
+        """
+    )
+    cursor.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_player_stats_player
+        ON player_stats(player_id);
+        """
+    )
+    cursor.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_matches_map
+        ON matches(map);
+        """
+    )
 
     _migrate_normalize_igns(cursor)
     _migrate_normalize_champions(cursor)
     conn.commit()
+    _bump_data_generation()
     conn.close()
     if needs_team_migration:
         migrate_team_column()
 
+    conn = _connect()
+    # Without statistics SQLite rates every index as equally selective and can
+    # probe "vs champion" subqueries through the champion index instead of the
+    # match index. A sampled ANALYZE stays fast however large the tables get.
+    conn.execute("PRAGMA analysis_limit = 1000;")
+    conn.execute("ANALYZE;")
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION};")
+    conn.commit()
+    conn.close()
+
+
+def schema_is_current():
+    """True if create_database has already completed for this SCHEMA_VERSION."""
+    conn = _connect()
+    try:
+        return conn.execute("PRAGMA user_version;").fetchone()[0] >= SCHEMA_VERSION
+    except sqlite3.Error:
+        return False
+    finally:
+        conn.close()
+
 
 def _migrate_normalize_igns(cursor):
     """One-shot migration: rewrite any non-NFC ``player_ign`` / ``alt_igns`` rows.
@@ -625,8 +1110,9 @@ def _migrate_normalize_champions(cursor):
         print(f"Migration _migrate_normalize_champions failed: {e}")
 
 
+@instrumented("db")
 def insert_scoreboard(scoreboard, queue_num):
-    conn = sqlite3.connect("match_data.db")
+    conn = _connect()
     cursor = conn.cursor()
     try:
         match_id = scoreboard["match_id"]
@@ -706,6 +1192,7 @@ def insert_scoreboard(scoreboard, queue_num):
                 ),
             )
         conn.commit()
+        _bump_data_generation()
         if is_complete:
             print(f"Scoreboard for match_id {match_id} inserted successfully.")
         else:
@@ -731,6 +1218,7 @@ def _merge_player_rows(cursor, keep_player_id, remove_player_id):
     )
 
 
+@instrumented("db")
 def link_ign(player_ign, discord_id, force=False):
     """Link `discord_id` to `player_ign`.
 
@@ -745,7 +1233,7 @@ def link_ign(player_ign, discord_id, force=False):
         return False
     ign_key = _norm_lower(player_ign)
 
-    conn = sqlite3.connect("match_data.db")
+    conn = _connect()
     cursor = conn.cursor()
     try:
         ign_match = _find_player_row_by_ign(cursor, player_ign)
@@ -785,6 +1273,7 @@ def link_ign(player_ign, discord_id, force=False):
                 (player_ign, json.dumps(alts), disc_row[0]),
             )
             conn.commit()
+            _bump_data_generation()
             return True
 
         if ign_row and not disc_row:
@@ -793,6 +1282,7 @@ def link_ign(player_ign, discord_id, force=False):
                 (discord_id, player_ign, ign_row[0]),
             )
             conn.commit()
+            _bump_data_generation()
             return True
 
         if disc_row and not ign_row:
@@ -809,6 +1299,7 @@ def link_ign(player_ign, discord_id, force=False):
                 (player_ign, json.dumps(alts), disc_row[0]),
             )
             conn.commit()
+            _bump_data_generation()
             return True
 
         cursor.execute(
@@ -816,6 +1307,7 @@ def link_ign(player_ign, discord_id, force=False):
             (player_ign, discord_id, "[]"),
         )
         conn.commit()
+        _bump_data_generation()
         return True
     except sqlite3.Error as e:
         print(f"An error occurred in link_ign: {e}")
@@ -825,8 +1317,9 @@ def link_ign(player_ign, discord_id, force=False):
         conn.close()
 
 
+@instrumented("db")
 def update_discord_id(old_discord_id, new_discord_id):
-    conn = sqlite3.connect("match_data.db")
+    conn = _connect()
     cursor = conn.cursor()
     try:
         cursor.execute(
@@ -840,6 +1333,7 @@ def update_discord_id(old_discord_id, new_discord_id):
                 (new_discord_id, player_id),
             )
             conn.commit()
+            _bump_data_generation()
             print(
                 f"Updated Discord ID for player_id {player_id} from {old_discord_id} to {new_discord_id}."
             )
@@ -851,21 +1345,9 @@ def update_discord_id(old_discord_id, new_discord_id):
         conn.close()
 
 
-def execute_select_query(sql_query):
-    conn = sqlite3.connect("match_data.db")
-    cursor = conn.cursor()
-    try:
-        cursor.execute(sql_query)
-        return cursor.fetchall()
-    except sqlite3.Error as e:
-        print(f"Database error: {e}")
-        raise e
-    finally:
-        conn.close()
-
-
+@instrumented("db")
 def insert_embed(queue_num, embed_data):
-    conn = sqlite3.connect("match_data.db")
+    conn = _connect()
     cursor = conn.cursor()
     try:
         queue_num = int(re.search(r"\d+", queue_num).group())
@@ -890,8 +1372,9 @@ def insert_embed(queue_num, embed_data):
         conn.close()
 
 
+@instrumented("db")
 def read_embeds(queue_num):
-    conn = sqlite3.connect("match_data.db")
+    conn = _connect()
     cursor = conn.cursor()
     try:
         cursor.execute("SELECT embed_data FROM embeds WHERE queue_num = ?;", (queue_num,))
@@ -904,8 +1387,9 @@ def read_embeds(queue_num):
         conn.close()
 
 
+@instrumented("db")
 def verify_registered_users(discord_ids):
-    conn = sqlite3.connect("match_data.db")
+    conn = _connect()
     cursor = conn.cursor()
     try:
         placeholders = ",".join("?" for _ in discord_ids)
@@ -923,8 +1407,9 @@ def verify_registered_users(discord_ids):
         conn.close()
 
 
+@instrumented("db")
 def match_exists(match_id):
-    conn = sqlite3.connect("match_data.db")
+    conn = _connect()
     cursor = conn.cursor()
     try:
         cursor.execute("SELECT 1 FROM matches WHERE match_id = ?", (match_id,))
@@ -933,8 +1418,9 @@ def match_exists(match_id):
         conn.close()
 
 
+@instrumented("db")
 def queue_exists(queue_num):
-    conn = sqlite3.connect("match_data.db")
+    conn = _connect()
     cursor = conn.cursor()
     try:
         cursor.execute("SELECT 1 FROM matches WHERE queue_num = ?", (queue_num,))
@@ -943,6 +1429,7 @@ def queue_exists(queue_num):
         conn.close()
 
 
+@instrumented("db")
 def resolve_map_name(partial_name):
     def map_key(value):
         return " ".join(re.sub(r"[^a-z0-9]+", " ", _norm_lower(value).replace("'", "")).split())
@@ -989,7 +1476,7 @@ def resolve_map_name(partial_name):
     if len(set(alias_starts)) == 1:
         return alias_starts[0]
 
-    conn = sqlite3.connect("match_data.db")
+    conn = _connect()
     cursor = conn.cursor()
     try:
         cursor.execute("SELECT DISTINCT map FROM matches WHERE map IS NOT NULL;")
@@ -1031,6 +1518,7 @@ def resolve_map_name(partial_name):
     return None
 
 
+@instrumented("db")
 def get_registered_igns(ign_list):
     """Return ``(registered, not_registered)`` split of the supplied IGN list.
 
@@ -1040,7 +1528,7 @@ def get_registered_igns(ign_list):
     ``Fúriä`` resolve regardless of whether the scoreboard text uses composed
     or decomposed codepoints.
     """
-    conn = sqlite3.connect("match_data.db")
+    conn = _connect()
     cursor = conn.cursor()
     try:
         cursor.execute(
@@ -1072,6 +1560,7 @@ def get_registered_igns(ign_list):
         conn.close()
 
 
+@instrumented("db")
 def add_alt_ign(discord_id, alt_ign):
     """Add an alternate IGN to a linked player.
 
@@ -1094,7 +1583,7 @@ def add_alt_ign(discord_id, alt_ign):
         result["reason"] = "empty"
         return result
 
-    conn = sqlite3.connect("match_data.db")
+    conn = _connect()
     cursor = conn.cursor()
     try:
         cursor.execute(
@@ -1135,6 +1624,7 @@ def add_alt_ign(discord_id, alt_ign):
             (json.dumps(alt_igns), player_id),
         )
         conn.commit()
+        _bump_data_generation()
         result["success"] = True
         return result
     except sqlite3.Error as e:
@@ -1146,6 +1636,7 @@ def add_alt_ign(discord_id, alt_ign):
         conn.close()
 
 
+@instrumented("db")
 def get_ign_link_info(ign):
     """Look up an IGN (NFC + case-insensitive) as a main ``player_ign``.
 
@@ -1153,7 +1644,7 @@ def get_ign_link_info(ign):
     IGN of some row (``discord_id`` may be ``None`` if the row is unclaimed),
     or ``(None, False, None)`` otherwise.
     """
-    conn = sqlite3.connect("match_data.db")
+    conn = _connect()
     cursor = conn.cursor()
     try:
         match = _find_player_row_by_ign(cursor, ign)
@@ -1165,8 +1656,9 @@ def get_ign_link_info(ign):
         conn.close()
 
 
+@instrumented("db")
 def get_ign_for_discord_id(discord_id):
-    conn = sqlite3.connect("match_data.db")
+    conn = _connect()
     cursor = conn.cursor()
     try:
         cursor.execute("SELECT player_ign FROM players WHERE discord_id = ?;", (discord_id,))
@@ -1176,8 +1668,9 @@ def get_ign_for_discord_id(discord_id):
         conn.close()
 
 
+@instrumented("db")
 def get_alt_igns(discord_id):
-    conn = sqlite3.connect("match_data.db")
+    conn = _connect()
     cursor = conn.cursor()
     try:
         cursor.execute("SELECT alt_igns FROM players WHERE discord_id = ?;", (discord_id,))
@@ -1189,9 +1682,10 @@ def get_alt_igns(discord_id):
         conn.close()
 
 
+@instrumented("db")
 def unlink_ign(discord_id):
     """Remove the Discord link from a player, keeping their IGN and stats intact."""
-    conn = sqlite3.connect("match_data.db")
+    conn = _connect()
     cursor = conn.cursor()
     try:
         cursor.execute(
@@ -1199,6 +1693,7 @@ def unlink_ign(discord_id):
             (discord_id,)
         )
         conn.commit()
+        _bump_data_generation()
         return cursor.rowcount > 0
     except sqlite3.Error as e:
         print(f"An error occurred in unlink_ign: {e}")
@@ -1207,9 +1702,10 @@ def unlink_ign(discord_id):
         conn.close()
 
 
+@instrumented("db")
 def get_player_info(discord_id):
     """Get complete player information including main IGN and alts."""
-    conn = sqlite3.connect("match_data.db")
+    conn = _connect()
     cursor = conn.cursor()
     try:
         cursor.execute(
@@ -1230,11 +1726,12 @@ def get_player_info(discord_id):
         conn.close()
 
 
+@instrumented("db")
 def delete_alt_ign(discord_id, alt_ign):
     alt_key = _norm_lower(alt_ign)
     if not alt_key:
         return False
-    conn = sqlite3.connect("match_data.db")
+    conn = _connect()
     cursor = conn.cursor()
     try:
         cursor.execute(
@@ -1253,6 +1750,7 @@ def delete_alt_ign(discord_id, alt_ign):
             (json.dumps(new_alts), player_id),
         )
         conn.commit()
+        _bump_data_generation()
         return True
     except sqlite3.Error as e:
         print(f"An error occurred: {e}")
@@ -1261,8 +1759,9 @@ def delete_alt_ign(discord_id, alt_ign):
         conn.close()
 
 
+@instrumented("db")
 def get_player_id(discord_id):
-    conn = sqlite3.connect("match_data.db")
+    conn = _connect()
     cursor = conn.cursor()
     cursor.execute("SELECT player_id FROM players WHERE discord_id = ?", (discord_id,))
     result = cursor.fetchone()
@@ -1270,19 +1769,95 @@ def get_player_id(discord_id):
     return result[0] if result else None
 
 
-def get_player_stats(player_id, champions=None, filters=None):
+def _player_stats_from_row(data, support_only_healing):
+    games_played = data["games_played"]
+    total_wins = data["total_wins"]
+    total_time_in_minutes = data["total_time_in_minutes"]
+
+    total_enemy_damage = data["total_enemy_damage"] or 0
+
+    stats_dict = {
+        "games": games_played,
+        "wins": total_wins,
+        "losses": games_played - total_wins,
+        "raw_k": data["total_kills"], "raw_d": data["total_deaths"], "raw_a": data["total_assists"],
+        "winrate": round((total_wins / games_played) * 100, 2) if games_played > 0 else 0,
+        "kda": f"{data['total_kills']}/{data['total_deaths']}/{data['total_assists']}",
+        "kda_ratio": round((data['total_kills'] + data['total_assists']) / max(1, data['total_deaths']), 2),
+        "kills_pm": round(data["total_kills"] / max(1, total_time_in_minutes), 2),
+        "deaths_pm": round(data["total_deaths"] / max(1, total_time_in_minutes), 2),
+        "damage_dealt_pm": round(data["total_damage"] / max(1, total_time_in_minutes), 2),
+        "damage_taken_pm": round(data["total_taken"] / max(1, total_time_in_minutes), 2),
+        "shielding_pm": round(data["total_shielding"] / max(1, total_time_in_minutes), 2),
+        "self_healing_pm": round(data["total_self_healing"] / max(1, total_time_in_minutes), 2),
+        "credits_pm": round(data["total_credits"] / max(1, total_time_in_minutes), 2),
+        "obj_time": round(data["total_obj_time"] / games_played, 2) if games_played > 0 else 0,
+        "avg_kills": round(data["total_kills"] / games_played, 2) if games_played > 0 else 0,
+        "avg_deaths": round(data["total_deaths"] / games_played, 2) if games_played > 0 else 0,
+        "avg_damage_dealt": round(data["total_damage"] / games_played) if games_played > 0 else 0,
+        "avg_damage_taken": round(data["total_taken"] / games_played) if games_played > 0 else 0,
+        "avg_self_healing": round(data["total_self_healing"] / games_played) if games_played > 0 else 0,
+        "avg_shielding": round(data["total_shielding"] / games_played) if games_played > 0 else 0,
+        "avg_credits": round(data["total_credits"] / games_played) if games_played > 0 else 0,
+        "damage_delta": round((data["total_damage"] - data["total_taken"]) / games_played) if games_played > 0 else 0,
+        "kill_share": data["avg_kill_share"] or 0,
+        "damage_share": data["avg_damage_share"] or 0,
+        "damage_healed_pct": round((data["total_healing"] / total_enemy_damage) * 100, 2) if total_enemy_damage > 0 else 0,
+    }
+
+    total_healing = data["total_healing"]
+    support_time = total_time_in_minutes
+    support_games = games_played
+
+    if support_only_healing:
+        # Healing stats for an unfiltered profile only count Support games.
+        total_healing = data["support_healing"] or 0
+        support_time = data["support_time"] or 0
+        support_games = data["support_games"] or 0
+        support_enemy_damage = data["support_enemy_damage"] or 0
+        stats_dict["damage_healed_pct"] = round((total_healing / support_enemy_damage) * 100, 2) if support_enemy_damage > 0 else 0
+        
+    stats_dict["healing_pm"] = round(total_healing / max(1, support_time), 2)
+    stats_dict["avg_healing"] = round(total_healing / max(1, support_games))
+    stats_dict["damage_healing_pm"] = round(stats_dict["damage_dealt_pm"] + stats_dict["healing_pm"], 2)
+
+    return stats_dict
+
+
+@instrumented("db")
+def get_players_stats(player_ids, champions=None, filters=None):
     """
-    Fetches aggregated player stats, now including Kill Participation and Damage Share.
-    If no champion/role filter is provided, 'healing' stats are calculated
-    from games played on Support champions only, while 'self_healing' uses all games.
+    Aggregated stats for several players from one grouped query, keyed by player_id.
+    Values match get_player_stats; players without matching games are left out.
     """
-    conn = sqlite3.connect("match_data.db")
+    player_ids = list(dict.fromkeys(player_ids))
+    if not player_ids:
+        return {}
+
+    conn = _connect()
     conn.row_factory = sqlite3.Row 
     cursor = conn.cursor()
     
     try:
-        where_conditions = ["ps.player_id = ?"]
-        params = [player_id]
+        support_champs = [] if champions else [champ for champ, role in CHAMPION_ROLES.items() if role == "Support"]
+        params = list(support_champs)
+        support_cte = ""
+        support_join = ""
+        support_columns = ""
+        if support_champs:
+            support_cte = f""",
+            SupportChamps(champ) AS (
+                VALUES {', '.join('(?)' for _ in support_champs)}
+            )"""
+            support_join = "LEFT JOIN SupportChamps sc ON sc.champ = ps.champ"
+            support_columns = """,
+                SUM(CASE WHEN sc.champ IS NOT NULL THEN ps.healing ELSE 0 END) AS support_healing,
+                SUM(CASE WHEN sc.champ IS NOT NULL THEN m.time ELSE 0 END) AS support_time,
+                SUM(CASE WHEN sc.champ IS NOT NULL THEN 1 ELSE 0 END) AS support_games,
+                SUM(CASE WHEN sc.champ IS NOT NULL THEN COALESCE(ott.team_damage, 0) ELSE 0 END) AS support_enemy_damage"""
+
+        where_conditions = [f"ps.player_id IN ({', '.join('?' for _ in player_ids)})"]
+        params.extend(player_ids)
 
         if champions and isinstance(champions, list):
             placeholders = ', '.join('?' for _ in champions)
@@ -1301,8 +1876,9 @@ def get_player_stats(player_id, champions=None, filters=None):
                     SUM(damage) AS team_damage
                 FROM player_stats
                 GROUP BY match_id, team
-            )
+            ){support_cte}
             SELECT
+                ps.player_id AS player_id,
                 COUNT(ps.match_id) AS games_played,
                 SUM(ps.kills) AS total_kills,
                 SUM(ps.deaths) AS total_deaths,
@@ -1319,224 +1895,236 @@ def get_player_stats(player_id, champions=None, filters=None):
                 SUM(CASE WHEN (ps.team = 1 AND m.team1_score > m.team2_score) OR (ps.team = 2 AND m.team2_score > m.team1_score) THEN 1 ELSE 0 END) AS total_wins,
                 
                 AVG(CASE WHEN tt.team_kill_participations > 0 THEN CAST(ps.kills + ps.assists AS REAL) * 100.0 / tt.team_kill_participations ELSE 0 END) AS avg_kill_share,
-                AVG(CASE WHEN tt.team_damage > 0 THEN CAST(ps.damage AS REAL) * 100.0 / tt.team_damage ELSE 0 END) AS avg_damage_share
+                AVG(CASE WHEN tt.team_damage > 0 THEN CAST(ps.damage AS REAL) * 100.0 / tt.team_damage ELSE 0 END) AS avg_damage_share{support_columns}
 
             FROM player_stats ps
             JOIN matches m ON ps.match_id = m.match_id
             JOIN TeamTotals tt ON ps.match_id = tt.match_id AND ps.team = tt.team
             LEFT JOIN TeamTotals ott ON ps.match_id = ott.match_id AND ps.team != ott.team
+            {support_join}
             WHERE {where_clause}
+            GROUP BY ps.player_id
         """
 
         cursor.execute(query, params)
-        data = cursor.fetchone()
+        return {
+            data["player_id"]: _player_stats_from_row(data, bool(support_champs))
+            for data in cursor.fetchall()
+            if data["games_played"]
+        }
+    finally:
+        conn.close()
 
-        if not data or data["games_played"] == 0:
-            return None
 
-        games_played = data["games_played"]
-        total_wins = data["total_wins"]
-        total_time_in_minutes = data["total_time_in_minutes"]
-
-        total_enemy_damage = data["total_enemy_damage"] or 0
-
-        stats_dict = {
-            "games": games_played,
-            "wins": total_wins,
-            "losses": games_played - total_wins,
-            "raw_k": data["total_kills"], "raw_d": data["total_deaths"], "raw_a": data["total_assists"],
-            "winrate": round((total_wins / games_played) * 100, 2) if games_played > 0 else 0,
-            "kda": f"{data['total_kills']}/{data['total_deaths']}/{data['total_assists']}",
-            "kda_ratio": round((data['total_kills'] + data['total_assists']) / max(1, data['total_deaths']), 2),
-            "kills_pm": round(data["total_kills"] / max(1, total_time_in_minutes), 2),
-            "deaths_pm": round(data["total_deaths"] / max(1, total_time_in_minutes), 2),
-            "damage_dealt_pm": round(data["total_damage"] / max(1, total_time_in_minutes), 2),
-            "damage_taken_pm": round(data["total_taken"] / max(1, total_time_in_minutes), 2),
-            "shielding_pm": round(data["total_shielding"] / max(1, total_time_in_minutes), 2),
-            "self_healing_pm": round(data["total_self_healing"] / max(1, total_time_in_minutes), 2),
-            "credits_pm": round(data["total_credits"] / max(1, total_time_in_minutes), 2),
-            "obj_time": round(data["total_obj_time"] / games_played, 2) if games_played > 0 else 0,
-            "avg_kills": round(data["total_kills"] / games_played, 2) if games_played > 0 else 0,
-            "avg_deaths": round(data["total_deaths"] / games_played, 2) if games_played > 0 else 0,
-            "avg_damage_dealt": round(data["total_damage"] / games_played) if games_played > 0 else 0,
-            "avg_damage_taken": round(data["total_taken"] / games_played) if games_played > 0 else 0,
-            "avg_self_healing": round(data["total_self_healing"] / games_played) if games_played > 0 else 0,
-            "avg_shielding": round(data["total_shielding"] / games_played) if games_played > 0 else 0,
-            "avg_credits": round(data["total_credits"] / games_played) if games_played > 0 else 0,
-            "damage_delta": round((data["total_damage"] - data["total_taken"]) / games_played) if games_played > 0 else 0,
-            "kill_share": data["avg_kill_share"] or 0,
-            "damage_share": data["avg_damage_share"] or 0,
-            "damage_healed_pct": round((data["total_healing"] / total_enemy_damage) * 100, 2) if total_enemy_damage > 0 else 0,
-        }
+@instrumented("db")
+def get_player_stats(player_id, champions=None, filters=None):
+    """
+    Fetches aggregated player stats, now including Kill Participation and Damage Share.
+    If no champion/role filter is provided, 'healing' stats are calculated
+    from games played on Support champions only, while 'self_healing' uses all games.
+    Both sets of aggregates come from a single pass over the player's rows.
+    """
+    return get_players_stats([player_id], champions=champions, filters=filters).get(player_id)
 
-        total_healing = data["total_healing"]
-        support_time = total_time_in_minutes
-        support_games = games_played
-
-        if not champions:
-            support_champs = [champ for champ, role in CHAMPION_ROLES.items() if role == "Support"]
-            placeholders = ', '.join('?' for _ in support_champs)
-            healing_conditions = [f"ps.player_id = ?", f"ps.champ IN ({placeholders})"]
-            healing_params = [player_id] + support_champs
-            _apply_match_filters(healing_conditions, healing_params, filters, player_alias="ps")
-            healing_where_clause = " AND ".join(healing_conditions)
-            cursor.execute(f"""
-                WITH TeamTotals AS (
-                    SELECT match_id, team, SUM(damage) AS team_damage
-                    FROM player_stats
-                    GROUP BY match_id, team
-                )
-                SELECT SUM(ps.healing), SUM(m.time), COUNT(ps.match_id), SUM(COALESCE(ott.team_damage, 0))
-                FROM player_stats ps
-                JOIN matches m ON ps.match_id = m.match_id
-                LEFT JOIN TeamTotals ott ON ps.match_id = ott.match_id AND ps.team != ott.team
-                WHERE {healing_where_clause}
-            """, healing_params)
-            healing_row = cursor.fetchone()
-            total_healing = healing_row[0] or 0
-            support_time = healing_row[1] or 0
-            support_games = healing_row[2] or 0
-            support_enemy_damage = healing_row[3] or 0
-            stats_dict["damage_healed_pct"] = round((total_healing / support_enemy_damage) * 100, 2) if support_enemy_damage > 0 else 0
-            
-        stats_dict["healing_pm"] = round(total_healing / max(1, support_time), 2)
-        stats_dict["avg_healing"] = round(total_healing / max(1, support_games))
-        stats_dict["damage_healing_pm"] = round(stats_dict["damage_dealt_pm"] + stats_dict["healing_pm"], 2)
 
-        return stats_dict
-    finally:
-        conn.close()
+def _top_champ_from_row(row):
+    (
+        champ, games, wins, kills, deaths, assists,
+        damage, obj_time, shielding, healing, total_time_in_minutes
+    ) = row
+    
+    if total_time_in_minutes == 0:
+        total_time_in_minutes = 1
+
+    return {
+        "champ": champ, "games": games,
+        "winrate": round(100 * wins / games, 1) if games else 0,
+        "kda": f"{round(kills/games, 1)}/{round(deaths/games, 1)}/{round(assists/games, 1)}",
+        "damage": round(damage / total_time_in_minutes, 2),
+        "objective_time": round(obj_time, 2),
+        "shielding": round(shielding / total_time_in_minutes, 2),
+        "healing": round(healing / total_time_in_minutes, 2),
+    }
 
 
-def get_top_champs(player_id, filters=None):
-    conn = sqlite3.connect("match_data.db")
+@instrumented("db")
+def get_players_top_champs(player_ids, filters=None, limit=5):
+    """Most played champions for several players from one grouped query, keyed by player_id."""
+    player_ids = list(dict.fromkeys(player_ids))
+    results = {player_id: [] for player_id in player_ids}
+    if not player_ids:
+        return results
+
+    conn = _connect()
     cursor = conn.cursor()
-    where_conditions = ["ps.player_id = ?"]
-    params = [player_id]
+    where_conditions = [f"ps.player_id IN ({', '.join('?' for _ in player_ids)})"]
+    params = list(player_ids)
     _apply_match_filters(where_conditions, params, filters, player_alias="ps")
     where_clause = " AND ".join(where_conditions)
     cursor.execute(
         f"""
-        SELECT
-            champ,
-            COUNT(*),
-            SUM(CASE WHEN (ps.team = 1 AND m.team1_score > m.team2_score) OR (ps.team = 2 AND m.team2_score > m.team1_score) THEN 1 ELSE 0 END) as wins,
-            SUM(kills), SUM(deaths), SUM(assists),
-            SUM(damage), SUM(objective_time), SUM(shielding), SUM(healing), SUM(m.time)
-        FROM player_stats ps
-        JOIN matches m ON ps.match_id = m.match_id
-        WHERE {where_clause}
-        GROUP BY champ
-        ORDER BY COUNT(*) DESC
-        LIMIT 5
+        WITH ChampTotals AS (
+            SELECT
+                ps.player_id,
+                champ,
+                COUNT(*) AS games,
+                SUM(CASE WHEN (ps.team = 1 AND m.team1_score > m.team2_score) OR (ps.team = 2 AND m.team2_score > m.team1_score) THEN 1 ELSE 0 END) as wins,
+                SUM(kills) AS kills, SUM(deaths) AS deaths, SUM(assists) AS assists,
+                SUM(damage) AS damage, SUM(objective_time) AS objective_time, SUM(shielding) AS shielding,
+                SUM(healing) AS healing, SUM(m.time) AS minutes
+            FROM player_stats ps
+            JOIN matches m ON ps.match_id = m.match_id
+            WHERE {where_clause}
+            GROUP BY ps.player_id, champ
+        ),
+        Ranked AS (
+            SELECT *, ROW_NUMBER() OVER (PARTITION BY player_id ORDER BY games DESC, champ) AS champ_rank
+            FROM ChampTotals
+        )
+        SELECT player_id, champ, games, wins, kills, deaths, assists, damage, objective_time, shielding, healing, minutes
+        FROM Ranked
+        WHERE champ_rank <= ?
+        ORDER BY player_id, champ_rank
         """,
-        params,
+        params + [limit],
     )
-    rows = cursor.fetchall()
-    champs = []
-    for row in rows:
-        (
-            champ, games, wins, kills, deaths, assists,
-            damage, obj_time, shielding, healing, total_time_in_minutes
-        ) = row
-        
-        if total_time_in_minutes == 0:
-            total_time_in_minutes = 1
-
-        champ_stats = {
-            "champ": champ, "games": games,
-            "winrate": round(100 * wins / games, 1) if games else 0,
-            "kda": f"{round(kills/games, 1)}/{round(deaths/games, 1)}/{round(assists/games, 1)}",
-            "damage": round(damage / total_time_in_minutes, 2),
-            "objective_time": round(obj_time, 2),
-            "shielding": round(shielding / total_time_in_minutes, 2),
-            "healing": round(healing / total_time_in_minutes, 2),
-        }
-        champs.append(champ_stats)
+    for row in cursor.fetchall():
+        results[row[0]].append(_top_champ_from_row(row[1:]))
     conn.close()
-    return champs
+    return results
 
-def get_winrate_with_against(pid1, pid2, filters=None):
-    conn = sqlite3.connect("match_data.db")
-    cursor = conn.cursor()
-    where_conditions = ["ps1.player_id = ?", "ps2.player_id = ?", "ps1.team = ps2.team"]
-    params = [pid1, pid2]
-    _apply_match_filters(where_conditions, params, filters, player_alias="ps1")
-    where_clause = " AND ".join(where_conditions)
-    cursor.execute(
-        f"""
-        SELECT m.team1_score, m.team2_score, ps1.team
-        FROM matches m
-        JOIN player_stats ps1 ON m.match_id = ps1.match_id
-        JOIN player_stats ps2 ON m.match_id = ps2.match_id
-        WHERE {where_clause}
-        """,
-        params,
-    )
-    rows = cursor.fetchall()
-    with_games = len(rows)
-    with_wins = sum(1 for t1, t2, team in rows if (team == 1 and t1 > t2) or (team == 2 and t2 > t1))
-    with_winrate = round(100 * with_wins / with_games, 1) if with_games else 0
 
-    where_conditions = ["ps1.player_id = ?", "ps2.player_id = ?", "ps1.team != ps2.team"]
-    params = [pid1, pid2]
+@instrumented("db")
+def get_top_champs(player_id, filters=None):
+    return get_players_top_champs([player_id], filters=filters)[player_id]
+
+@instrumented("db")
+def get_pair_records(player_ids, filters=None):
+    """Games and wins together and against for every ordered pair of ``player_ids``, from one grouped query.
+
+    Keys are ``(player_id, other_player_id)``; wins are from the first player's side.
+    """
+    player_ids = list(dict.fromkeys(player_ids))
+    results = {
+        (player_id, other_id): {"with_games": 0, "with_wins": 0, "against_games": 0, "against_wins": 0}
+        for player_id in player_ids
+        for other_id in player_ids
+        if player_id != other_id
+    }
+    if len(player_ids) < 2:
+        return results
+
+    conn = _connect()
+    cursor = conn.cursor()
+    placeholders = ", ".join("?" for _ in player_ids)
+    where_conditions = [f"ps1.player_id IN ({placeholders})", f"ps2.player_id IN ({placeholders})", "ps1.player_id != ps2.player_id"]
+    params = player_ids + player_ids
     _apply_match_filters(where_conditions, params, filters, player_alias="ps1")
     where_clause = " AND ".join(where_conditions)
     cursor.execute(
         f"""
-        SELECT m.team1_score, m.team2_score, ps1.team
+        SELECT
+            ps1.player_id,
+            ps2.player_id,
+            SUM(CASE WHEN ps1.team = ps2.team THEN 1 ELSE 0 END) AS with_games,
+            SUM(CASE WHEN ps1.team = ps2.team AND {_win_condition("ps1")} THEN 1 ELSE 0 END) AS with_wins,
+            SUM(CASE WHEN ps1.team != ps2.team THEN 1 ELSE 0 END) AS against_games,
+            SUM(CASE WHEN ps1.team != ps2.team AND {_win_condition("ps1")} THEN 1 ELSE 0 END) AS against_wins
         FROM matches m
         JOIN player_stats ps1 ON m.match_id = ps1.match_id
         JOIN player_stats ps2 ON m.match_id = ps2.match_id
         WHERE {where_clause}
+        GROUP BY ps1.player_id, ps2.player_id
         """,
         params,
     )
-    rows = cursor.fetchall()
-    against_games = len(rows)
-    against_wins = sum(1 for t1, t2, team in rows if (team == 1 and t1 > t2) or (team == 2 and t2 > t1))
-    against_winrate = round(100 * against_wins / against_games, 1) if against_games else 0
+    for player_id, other_id, with_games, with_wins, against_games, against_wins in cursor.fetchall():
+        results[(player_id, other_id)] = {
+            "with_games": with_games,
+            "with_wins": with_wins,
+            "against_games": against_games,
+            "against_wins": against_wins,
+        }
     conn.close()
+    return results
+
+
+@instrumented("db")
+def get_winrate_with_against(pid1, pid2, filters=None):
+    record = get_pair_records([pid1, pid2], filters=filters).get((pid1, pid2))
+    if record is None:
+        # The same player on both sides; there is no pair to look up.
+        return 0, 0, 0, 0
+    with_games = record["with_games"]
+    against_games = record["against_games"]
+    with_winrate = round(100 * record["with_wins"] / with_games, 1) if with_games else 0
+    against_winrate = round(100 * record["against_wins"] / against_games, 1) if against_games else 0
     return with_winrate, with_games, against_winrate, against_games
 
+
+@instrumented("db")
+def compare_player_ids(player_ids, filters=None):
+    """Stats, top champions and pairwise records for any number of players.
+
+    Each part is one grouped query regardless of how many players are compared.
+    Returns ``None`` unless every player has games matching ``filters``.
+    """
+    player_ids = list(dict.fromkeys(player_id for player_id in player_ids if player_id))
+    if len(player_ids) < 2:
+        return None
+    stats = get_players_stats(player_ids, filters=filters)
+    if len(stats) < len(player_ids):
+        return None
+    return {
+        "players": stats,
+        "top_champs": get_players_top_champs(player_ids, filters=filters),
+        "pairs": get_pair_records(player_ids, filters=filters),
+    }
+
+
+@instrumented("db")
 def compare_by_player_ids(pid1, pid2, filters=None):
     if not pid1 or not pid2:
         return None
 
-    stats1 = get_player_stats(pid1, filters=filters)
-    stats2 = get_player_stats(pid2, filters=filters)
-    if not stats1 or not stats2:
+    comparison = compare_player_ids([pid1, pid2], filters=filters)
+    if not comparison:
         return None
-    champs1 = get_top_champs(pid1, filters=filters)
-    champs2 = get_top_champs(pid2, filters=filters)
-    with_winrate, with_games, against_winrate, against_games = get_winrate_with_against(pid1, pid2, filters=filters)
+    pair = comparison["pairs"][(pid1, pid2)]
+    with_games = pair["with_games"]
+    against_games = pair["against_games"]
 
     return {
-        "player1": stats1, "player2": stats2, "top_champs1": champs1, "top_champs2": champs2,
-        "with_winrate": with_winrate, "with_games": with_games,
-        "against_winrate": against_winrate, "against_games": against_games,
+        "player1": comparison["players"][pid1], "player2": comparison["players"][pid2],
+        "top_champs1": comparison["top_champs"][pid1], "top_champs2": comparison["top_champs"][pid2],
+        "with_winrate": round(100 * pair["with_wins"] / with_games, 1) if with_games else 0, "with_games": with_games,
+        "against_winrate": round(100 * pair["against_wins"] / against_games, 1) if against_games else 0, "against_games": against_games,
     }
 
 
+@instrumented("db")
 def compare_players(discord_id1, discord_id2, filters=None):
     pid1 = get_player_id(discord_id1)
     pid2 = get_player_id(discord_id2)
     return compare_by_player_ids(pid1, pid2, filters=filters)
 
+@instrumented("db")
 def get_teammate_records(player_id, limit=10, show_bottom=False, min_games=1, champion=None, role=None, filters=None):
     return get_player_relationship_records(
         player_id, relation="with", limit=limit, show_bottom=show_bottom,
         min_games=min_games, champion=champion, role=role, filters=filters,
     )
 
+@instrumented("db")
 def get_enemy_records(player_id, limit=10, show_bottom=False, min_games=1, champion=None, role=None, filters=None):
     return get_player_relationship_records(
         player_id, relation="against", limit=limit, show_bottom=show_bottom,
         min_games=min_games, champion=champion, role=role, filters=filters,
     )
 
+@instrumented("db")
 def get_player_relationship_records(player_id, relation="with", limit=10, show_bottom=False, min_games=1, champion=None, role=None, filters=None):
-    conn = sqlite3.connect("match_data.db")
+    conn, _ = _connect_analytics()
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     try:
@@ -1603,8 +2191,9 @@ def get_player_relationship_records(player_id, relation="with", limit=10, show_b
     finally:
         conn.close()
 
+@instrumented("db")
 def get_related_champion_records(player_id, relation="with", limit=10, show_bottom=False, min_games=1, champion=None, role=None, filters=None):
-    conn = sqlite3.connect("match_data.db")
+    conn, _ = _connect_analytics()
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     try:
@@ -1667,9 +2256,10 @@ def get_related_champion_records(player_id, relation="with", limit=10, show_bott
         conn.close()
 
 
+@instrumented("db")
 def get_champion_relationship_records(champion, relation="with", limit=10, show_bottom=False, min_games=1, related_champion=None, related_role=None, filters=None):
     champion = resolve_champion_name(champion) or champion
-    conn = sqlite3.connect("match_data.db")
+    conn, _ = _connect_analytics()
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     try:
@@ -1733,9 +2323,10 @@ def _record_dict(row, name_key):
     }
 
 
+@instrumented("db")
 def get_talent_records(champion, limit=10, show_bottom=False, min_games=1, filters=None):
     champion = resolve_champion_name(champion) or champion
-    conn = sqlite3.connect("match_data.db")
+    conn, _ = _connect_analytics()
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     try:
@@ -1772,8 +2363,9 @@ def get_talent_records(champion, limit=10, show_bottom=False, min_games=1, filte
         conn.close()
 
 
+@instrumented("db")
 def get_pickrate_records(limit=20, show_bottom=False, min_games=1, role=None, filters=None):
-    conn = sqlite3.connect("match_data.db")
+    conn, _ = _connect_analytics()
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     try:
@@ -1835,7 +2427,7 @@ def get_pickrate_records(limit=20, show_bottom=False, min_games=1, role=None, fi
 
 
 def _relationship_record(player_id, other_player_id, relation, filters=None):
-    conn = sqlite3.connect("match_data.db")
+    conn = _connect()
     cursor = conn.cursor()
     try:
         team_operator = "=" if relation == "with" else "!="
@@ -1869,8 +2461,9 @@ def _relationship_record(player_id, other_player_id, relation, filters=None):
         conn.close()
 
 
+@instrumented("db")
 def get_player_pair_champion_records(player_id, other_player_id, relation="with", limit=5, show_bottom=False, min_games=1, filters=None):
-    conn = sqlite3.connect("match_data.db")
+    conn = _connect()
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     try:
@@ -1905,8 +2498,9 @@ def get_player_pair_champion_records(player_id, other_player_id, relation="with"
         conn.close()
 
 
+@instrumented("db")
 def get_player_pair_map_records(player_id, other_player_id, relation="with", limit=5, show_bottom=False, min_games=1, filters=None):
-    conn = sqlite3.connect("match_data.db")
+    conn = _connect()
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     try:
@@ -1957,6 +2551,7 @@ def get_player_pair_map_records(player_id, other_player_id, relation="with", lim
         conn.close()
 
 
+@instrumented("db")
 def get_player_pair_summary(player_id, other_player_id, relation="with", limit=5, min_games=1, filters=None):
     return {
         "record": _relationship_record(player_id, other_player_id, relation, filters=filters),
@@ -1966,8 +2561,9 @@ def get_player_pair_summary(player_id, other_player_id, relation="with", limit=5
         "worst_maps": get_player_pair_map_records(player_id, other_player_id, relation, limit, True, min_games, filters),
     }
 
+@instrumented("db")
 def get_match_history(player_id, limit: int = 30, filters=None):
-    conn = sqlite3.connect("match_data.db")
+    conn = _connect()
     cursor = conn.cursor()
     try:
         where_conditions = ["ps.player_id = ?"]
@@ -2015,8 +2611,13 @@ def _display_map_name(map_name):
 def _map_winrate_rows(cursor, query, params, min_games=1, include_all_maps=True, sort_by_winrate=False):
     all_maps = _get_all_map_names(cursor) if include_all_maps else []
     cursor.execute(query, params + [min_games])
+    return _merge_map_winrate_rows(cursor.fetchall(), all_maps, sort_by_winrate)
+
+
+def _merge_map_winrate_rows(rows, all_maps, sort_by_winrate=False):
+    """Fold raw per-map rows into display maps, padding with ``all_maps`` at zero games."""
     rows_by_map = {}
-    for row in cursor.fetchall():
+    for row in rows:
         map_name = _display_map_name(row["map"])
         if map_name in EXCLUDED_MAP_DISPLAY_NAMES:
             continue
@@ -2028,12 +2629,11 @@ def _map_winrate_rows(cursor, query, params, min_games=1, include_all_maps=True,
         existing["losses"] = existing["games"] - existing["wins"]
         existing["winrate"] = round((existing["wins"] / existing["games"]) * 100, 2) if existing["games"] else 0
 
-    if include_all_maps:
-        for map_name in all_maps:
-            rows_by_map.setdefault(
-                map_name,
-                {"map": map_name, "games": 0, "wins": 0, "losses": 0, "winrate": 0},
-            )
+    for map_name in all_maps:
+        rows_by_map.setdefault(
+            map_name,
+            {"map": map_name, "games": 0, "wins": 0, "losses": 0, "winrate": 0},
+        )
 
     rows = list(rows_by_map.values())
     if sort_by_winrate:
@@ -2043,8 +2643,9 @@ def _map_winrate_rows(cursor, query, params, min_games=1, include_all_maps=True,
     return rows
 
 
+@instrumented("db")
 def get_player_map_winrates(player_id, champions=None, filters=None, min_games=1, include_all_maps=True, sort_by_winrate=False):
-    conn = sqlite3.connect("match_data.db")
+    conn = _connect()
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     try:
@@ -2081,19 +2682,25 @@ def get_player_map_winrates(player_id, champions=None, filters=None, min_games=1
         conn.close()
 
 
-def get_champion_map_winrates(champion, filters=None, min_games=1, include_all_maps=True, sort_by_winrate=False):
-    champion = resolve_champion_name(champion) or champion
-    conn = sqlite3.connect("match_data.db")
+@instrumented("db")
+def get_champions_map_winrates(champions, filters=None, min_games=1, include_all_maps=True, sort_by_winrate=False):
+    """Map winrates for several champions from one grouped query, keyed by the names passed in."""
+    resolved = {champion: resolve_champion_name(champion) or champion for champion in champions}
+    names = list(dict.fromkeys(resolved.values()))
+    if not names:
+        return {}
+    conn, _ = _connect_analytics()
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     try:
-        where_conditions = ["ps.champ = ?"]
-        params = [champion]
+        where_conditions = [f"ps.champ IN ({', '.join('?' for _ in names)})"]
+        params = list(names)
         _apply_match_filters(where_conditions, params, filters, player_alias="ps")
         where_clause = " AND ".join(where_conditions)
 
         query = f"""
             SELECT
+                ps.champ,
                 m.map,
                 COUNT(ps.match_id) AS games,
                 SUM(
@@ -2106,48 +2713,90 @@ def get_champion_map_winrates(champion, filters=None, min_games=1, include_all_m
             FROM player_stats ps
             JOIN matches m ON ps.match_id = m.match_id
             WHERE {where_clause}
-            GROUP BY m.map
+            GROUP BY ps.champ, m.map
             HAVING games >= ?
         """
-        return _map_winrate_rows(cursor, query, params, min_games, include_all_maps, sort_by_winrate)
+        all_maps = _get_all_map_names(cursor) if include_all_maps else []
+        cursor.execute(query, params + [min_games])
+        rows_by_champ = {name: [] for name in names}
+        for row in cursor.fetchall():
+            rows_by_champ[row["champ"]].append(row)
+        return {
+            champion: _merge_map_winrate_rows(rows_by_champ[name], all_maps, sort_by_winrate)
+            for champion, name in resolved.items()
+        }
     finally:
         conn.close()
 
 
-def get_champion_overall_stats(champion, filters=None):
-    champion = resolve_champion_name(champion) or champion
-    conn = sqlite3.connect("match_data.db")
+@instrumented("db")
+def get_champion_map_winrates(champion, filters=None, min_games=1, include_all_maps=True, sort_by_winrate=False):
+    return get_champions_map_winrates(
+        [champion], filters=filters, min_games=min_games,
+        include_all_maps=include_all_maps, sort_by_winrate=sort_by_winrate,
+    )[champion]
+
+
+def _champion_overall_stats_from_row(row):
+    games = row["games"]
+    minutes = row["minutes"] or 1
+    wins = row["wins"] or 0
+    damage = row["damage"] or 0
+    healing = row["healing"] or 0
+    enemy_damage = row["enemy_damage"] or 0
+    return {
+        "champ": row["champ"],
+        "games": games,
+        "wins": wins,
+        "losses": games - wins,
+        "winrate": round(wins * 100.0 / games, 2),
+        "kda": round(((row["kills"] or 0) + (row["assists"] or 0)) / max(1, row["deaths"] or 0), 2),
+        "raw_k": row["kills"] or 0,
+        "raw_d": row["deaths"] or 0,
+        "raw_a": row["assists"] or 0,
+        "dpm": round(damage / minutes, 2),
+        "taken_pm": round((row["taken"] or 0) / minutes, 2),
+        "hpm": round(healing / minutes, 2),
+        "shield_pm": round((row["shielding"] or 0) / minutes, 2),
+        "self_heal_pm": round((row["self_healing"] or 0) / minutes, 2),
+        "credits_pm": round((row["credits"] or 0) / minutes, 2),
+        "avg_kills": round((row["kills"] or 0) / games, 2),
+        "avg_deaths": round((row["deaths"] or 0) / games, 2),
+        "avg_damage": round(damage / games),
+        "avg_taken": round((row["taken"] or 0) / games),
+        "avg_healing": round(healing / games),
+        "avg_self_healing": round((row["self_healing"] or 0) / games),
+        "shield_avg": round((row["shielding"] or 0) / games),
+        "avg_credits": round((row["credits"] or 0) / games),
+        "obj_avg": round((row["objective_time"] or 0) / games, 2),
+        "damage_healed_pct": round(healing * 100.0 / enemy_damage, 2) if enemy_damage > 0 else 0,
+        "kp": round(row["kp"] or 0, 2),
+        "dmg_share": round(row["dmg_share"] or 0, 2),
+    }
+
+
+@instrumented("db")
+def get_champions_overall_stats(champions, filters=None):
+    """Overall stats for several champions from one grouped query, keyed by the names passed in.
+
+    Champions without matching games map to ``None``.
+    """
+    resolved = {champion: resolve_champion_name(champion) or champion for champion in champions}
+    names = list(dict.fromkeys(resolved.values()))
+    if not names:
+        return {}
+    conn, on_snapshot = _connect_analytics()
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     try:
-        where_conditions = ["ms.champ = ?", "m.time > 0"]
-        params = [champion]
+        where_conditions = [f"ms.champ IN ({', '.join('?' for _ in names)})", "m.time > 0"]
+        params = list(names)
         _apply_match_filters(where_conditions, params, filters, player_alias="ms")
-        where_clause = " AND ".join(where_conditions)
 
         query = f"""
-            WITH TeamTotals AS (
-                SELECT
-                    match_id,
-                    team,
-                    SUM(kills + assists) AS team_kill_participations,
-                    SUM(damage) AS team_damage
-                FROM player_stats
-                GROUP BY match_id, team
-            ),
-            MatchShares AS (
-                SELECT
-                    ps.*,
-                    tt.team_kill_participations,
-                    tt.team_damage,
-                    COALESCE(ott.team_damage, 0) AS enemy_team_damage,
-                    CASE WHEN tt.team_kill_participations > 0 THEN CAST(ps.kills + ps.assists AS REAL) * 100.0 / tt.team_kill_participations ELSE 0 END AS kill_share,
-                    CASE WHEN tt.team_damage > 0 THEN CAST(ps.damage AS REAL) * 100.0 / tt.team_damage ELSE 0 END AS damage_share
-                FROM player_stats ps
-                JOIN TeamTotals tt ON ps.match_id = tt.match_id AND ps.team = tt.team
-                LEFT JOIN TeamTotals ott ON ps.match_id = ott.match_id AND ps.team != ott.team
-            )
+            WITH {_match_shares_ctes(where_conditions, "ms", materialized=on_snapshot)}
             SELECT
+                ms.champ AS champ,
                 COUNT(ms.match_id) AS games,
                 SUM(CASE WHEN (ms.team = 1 AND m.team1_score > m.team2_score) OR (ms.team = 2 AND m.team2_score > m.team1_score) THEN 1 ELSE 0 END) AS wins,
                 SUM(ms.kills) AS kills,
@@ -2166,52 +2815,25 @@ def get_champion_overall_stats(champion, filters=None):
                 AVG(ms.damage_share) AS dmg_share
             FROM MatchShares ms
             JOIN matches m ON ms.match_id = m.match_id
-            WHERE {where_clause}
+            GROUP BY ms.champ
         """
         cursor.execute(query, params)
-        row = cursor.fetchone()
-        if not row or not row["games"]:
-            return None
-
-        games = row["games"]
-        minutes = row["minutes"] or 1
-        wins = row["wins"] or 0
-        damage = row["damage"] or 0
-        healing = row["healing"] or 0
-        enemy_damage = row["enemy_damage"] or 0
-        return {
-            "champ": champion,
-            "games": games,
-            "wins": wins,
-            "losses": games - wins,
-            "winrate": round(wins * 100.0 / games, 2),
-            "kda": round(((row["kills"] or 0) + (row["assists"] or 0)) / max(1, row["deaths"] or 0), 2),
-            "raw_k": row["kills"] or 0,
-            "raw_d": row["deaths"] or 0,
-            "raw_a": row["assists"] or 0,
-            "dpm": round(damage / minutes, 2),
-            "taken_pm": round((row["taken"] or 0) / minutes, 2),
-            "hpm": round(healing / minutes, 2),
-            "shield_pm": round((row["shielding"] or 0) / minutes, 2),
-            "self_heal_pm": round((row["self_healing"] or 0) / minutes, 2),
-            "credits_pm": round((row["credits"] or 0) / minutes, 2),
-            "avg_kills": round((row["kills"] or 0) / games, 2),
-            "avg_deaths": round((row["deaths"] or 0) / games, 2),
-            "avg_damage": round(damage / games),
-            "avg_taken": round((row["taken"] or 0) / games),
-            "avg_healing": round(healing / games),
-            "avg_self_healing": round((row["self_healing"] or 0) / games),
-            "shield_avg": round((row["shielding"] or 0) / games),
-            "avg_credits": round((row["credits"] or 0) / games),
-            "obj_avg": round((row["objective_time"] or 0) / games, 2),
-            "damage_healed_pct": round(healing * 100.0 / enemy_damage, 2) if enemy_damage > 0 else 0,
-            "kp": round(row["kp"] or 0, 2),
-            "dmg_share": round(row["dmg_share"] or 0, 2),
+        stats_by_champ = {
+            row["champ"]: _champion_overall_stats_from_row(row)
+            for row in cursor.fetchall()
+            if row["games"]
         }
+        return {champion: stats_by_champ.get(name) for champion, name in resolved.items()}
     finally:
         conn.close()
 
 
+@instrumented("db")
+def get_champion_overall_stats(champion, filters=None):
+    return get_champions_overall_stats([champion], filters=filters)[champion]
+
+
+@instrumented("db")
 def get_leaderboard(stat_key, limit, show_bottom=False, champion=None, role=None, min_games=1, filters=None):
     stat_expressions = {
         "winrate": "SUM(CASE WHEN (ps.team = 1 AND m.team1_score > m.team2_score) OR (ps.team = 2 AND m.team2_score > m.team1_score) THEN 1 ELSE 0 END) * 100.0 / COUNT(ps.match_id)",
@@ -2245,7 +2867,7 @@ def get_leaderboard(stat_key, limit, show_bottom=False, champion=None, role=None
 
     order = "ASC" if show_bottom else "DESC"
     params = []
-    where_conditions = ["p.discord_id IS NOT NULL", "m.time > 0"]
+    where_conditions = ["m.time > 0"]
     healing_only_stats = ["healing_pm", "avg_healing", "damage_healing_pm", "damage_healed_pct"]
 
     if champion:
@@ -2264,30 +2886,15 @@ def get_leaderboard(stat_key, limit, show_bottom=False, champion=None, role=None
         where_conditions.append(f"ps.champ IN ({placeholders})")
         params.extend(champions_in_role)
 
-    _apply_match_filters(where_conditions, params, filters, player_alias="ps")
+    match_filters = MatchFilters.coerce(filters)
+    _apply_match_filters(where_conditions, params, match_filters, player_alias="ps")
+    narrowed = bool(champion or role or stat_key in healing_only_stats) or match_filters.active
 
-    where_clause = " AND ".join(where_conditions)
     final_params = params + [min_games, limit]
 
+    conn, on_snapshot = _connect_analytics()
     query = f"""
-        WITH TeamTotals AS (
-            SELECT
-                match_id,
-                team,
-                SUM(kills + assists) as team_kill_participations,
-                SUM(damage) as team_damage
-            FROM player_stats GROUP BY match_id, team
-        ),
-        MatchShares AS (
-            SELECT 
-                ps.*,
-                COALESCE(ott.team_damage, 0) AS enemy_team_damage,
-                CASE WHEN tt.team_kill_participations > 0 THEN CAST(ps.kills + ps.assists AS REAL) * 100.0 / tt.team_kill_participations ELSE 0 END as kill_share,
-                CASE WHEN tt.team_damage > 0 THEN CAST(ps.damage AS REAL) * 100.0 / tt.team_damage ELSE 0 END as damage_share
-            FROM player_stats ps
-            JOIN TeamTotals tt ON ps.match_id = tt.match_id AND ps.team = tt.team
-            LEFT JOIN TeamTotals ott ON ps.match_id = ott.match_id AND ps.team != ott.team
-        ),
+        WITH {_match_shares_ctes(where_conditions, "ps", narrowed, on_snapshot)},
         PlayerAggregates AS (
             SELECT
                 p.discord_id, p.player_ign,
@@ -2298,7 +2905,7 @@ def get_leaderboard(stat_key, limit, show_bottom=False, champion=None, role=None
             FROM MatchShares ps
             JOIN players p ON ps.player_id = p.player_id
             JOIN matches m ON ps.match_id = m.match_id
-            WHERE {where_clause}
+            WHERE p.discord_id IS NOT NULL
             GROUP BY p.discord_id
             HAVING games_played >= ?
         )
@@ -2312,7 +2919,6 @@ def get_leaderboard(stat_key, limit, show_bottom=False, champion=None, role=None
         LIMIT ?;
     """
 
-    conn = sqlite3.connect("match_data.db")
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     try:
@@ -2324,8 +2930,9 @@ def get_leaderboard(stat_key, limit, show_bottom=False, champion=None, role=None
     finally:
         conn.close()
 
+@instrumented("db")
 def get_old_stats(player_id):
-    conn = sqlite3.connect("match_data.db")
+    conn = _connect()
     cursor = conn.cursor()
     cursor.execute(
         "SELECT kills, deaths, assists, damage, objective_time, shielding, healing, match_id FROM player_stats WHERE player_id = ?",
@@ -2352,8 +2959,9 @@ def get_old_stats(player_id):
         "objective_time": norm_stats[4], "shielding": norm_stats[5], "healing": norm_stats[6], "games": len(rows),
     }
 
+@instrumented("db")
 def migrate_team_column():
-    conn = sqlite3.connect("match_data.db")
+    conn = _connect()
     cursor = conn.cursor()
     try:
         cursor.execute("PRAGMA table_info(player_stats);")
@@ -2391,6 +2999,7 @@ def migrate_team_column():
                 )
         _refresh_match_completeness(cursor)
         conn.commit()
+        _bump_data_generation()
         print("Migration: Populated 'team' column in player_stats.")
     except Exception as e:
         print(f"Migration error: {e}")
@@ -2398,6 +3007,7 @@ def migrate_team_column():
         conn.close()
 
 
+@instrumented("db")
 def get_player_by_ign(ign):
     """Look up a player (linked or not) by main IGN or alt IGN.
 
@@ -2405,7 +3015,7 @@ def get_player_by_ign(ign):
     with ``player_id``, ``player_ign``, and ``discord_id`` (may be ``None`` for
     unclaimed rows created by scoreboard ingestion), or ``None``.
     """
-    conn = sqlite3.connect("match_data.db")
+    conn = _connect()
     cursor = conn.cursor()
     try:
         match = _find_player_row_by_ign(cursor, ign)
@@ -2417,9 +3027,10 @@ def get_player_by_ign(ign):
         conn.close()
 
 
+@instrumented("db")
 def get_discord_id_for_ign(ign):
     """Look up a linked Discord ID by main IGN or any stored alt IGN (NFC + case-insensitive)."""
-    conn = sqlite3.connect("match_data.db")
+    conn = _connect()
     cursor = conn.cursor()
     try:
         match = _find_player_row_by_ign(cursor, ign)
@@ -2430,12 +3041,13 @@ def get_discord_id_for_ign(ign):
         conn.close()
 
 
+@instrumented("db")
 def get_champion_name(player_id, partial_name):
     resolved_name = resolve_champion_name(partial_name)
     if resolved_name:
         return resolved_name
 
-    conn = sqlite3.connect("match_data.db")
+    conn = _connect()
     cursor = conn.cursor()
     cursor.execute(
         "SELECT DISTINCT champ FROM player_stats WHERE player_id = ? AND champ LIKE ? LIMIT 1;",
@@ -2447,8 +3059,29 @@ def get_champion_name(player_id, partial_name):
 
 
 
+@instrumented("db")
+def get_most_played_champions(limit=20):
+    conn = _connect()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            """
+            SELECT champ
+            FROM player_stats
+            GROUP BY champ
+            ORDER BY COUNT(*) DESC
+            LIMIT ?;
+            """,
+            (int(limit),),
+        )
+        return [row[0] for row in cursor.fetchall()]
+    finally:
+        conn.close()
+
+
+@instrumented("db")
 def get_all_champion_stats(player_id):
-    conn = sqlite3.connect("match_data.db")
+    conn = _connect()
     cursor = conn.cursor()
     cursor.execute(
         """
@@ -2482,12 +3115,13 @@ def get_all_champion_stats(player_id):
     return champs
 
 
+@instrumented("db")
 def get_player_champion_stats(player_id, role_filter=None, min_games=1, filters=None):
     """
     Gets comprehensive stats for all champions played by a player.
     Returns a list of champion stats with all available metrics.
     """
-    conn = sqlite3.connect("match_data.db")
+    conn = _connect()
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     
@@ -2505,31 +3139,11 @@ def get_player_champion_stats(player_id, role_filter=None, min_games=1, filters=
             where_conditions.append(f"ps.champ IN ({placeholders})")
             params.extend(champions_in_role)
         
-        where_clause = " AND ".join(where_conditions)
-        match_conditions = ["m.time > 0"]
-        _apply_match_filters(match_conditions, params, filters, player_alias="pms")
-        match_where_clause = " AND ".join(match_conditions)
+        where_conditions.append("m.time > 0")
+        _apply_match_filters(where_conditions, params, filters, player_alias="ps")
         
         query = f"""
-            WITH TeamTotals AS (
-                SELECT
-                    match_id,
-                    team,
-                    SUM(kills + assists) as team_kill_participations,
-                    SUM(damage) as team_damage
-                FROM player_stats GROUP BY match_id, team
-            ),
-            PlayerMatchShares AS (
-                SELECT 
-                    ps.*,
-                    COALESCE(ott.team_damage, 0) AS enemy_team_damage,
-                    CASE WHEN tt.team_kill_participations > 0 THEN CAST(ps.kills + ps.assists AS REAL) * 100.0 / tt.team_kill_participations ELSE 0 END as kill_share,
-                    CASE WHEN tt.team_damage > 0 THEN CAST(ps.damage AS REAL) * 100.0 / tt.team_damage ELSE 0 END as damage_share
-                FROM player_stats ps
-                JOIN TeamTotals tt ON ps.match_id = tt.match_id AND ps.team = tt.team
-                LEFT JOIN TeamTotals ott ON ps.match_id = ott.match_id AND ps.team != ott.team
-                WHERE {where_clause}
-            )
+            WITH {_match_shares_ctes(where_conditions, "ps")}
             SELECT
                 pms.champ,
                 COUNT(pms.match_id) AS games,
@@ -2560,9 +3174,8 @@ def get_player_champion_stats(player_id, role_filter=None, min_games=1, filters=
                 AVG(pms.kill_share) as avg_kill_share,
                 AVG(pms.damage_share) as avg_damage_share
                 
-            FROM PlayerMatchShares pms
+            FROM MatchShares pms
             JOIN matches m ON pms.match_id = m.match_id
-            WHERE {match_where_clause}
             GROUP BY pms.champ
             HAVING games >= ?
         """
@@ -2618,8 +3231,9 @@ def get_player_champion_stats(player_id, role_filter=None, min_games=1, filters=
         conn.close()
 
 
+@instrumented("db")
 def delete_match(match_id):
-    conn = sqlite3.connect("match_data.db")
+    conn = _connect()
     cursor = conn.cursor()
     try:
         cursor.execute("SELECT 1 FROM matches WHERE match_id = ?", (match_id,))
@@ -2627,7 +3241,6 @@ def delete_match(match_id):
             return 0
 
         screenshot_row = _get_match_screenshot_row(cursor, match_id)
-        screenshot_path = screenshot_row[1] if screenshot_row else None
 
         cursor.execute("DELETE FROM player_stats WHERE match_id = ?", (match_id,))
         stats_deleted_count = cursor.rowcount
@@ -2639,8 +3252,9 @@ def delete_match(match_id):
         match_deleted_count = cursor.rowcount
 
         conn.commit()
-        if screenshot_path:
-            remove_screenshot_file(screenshot_path)
+        _bump_data_generation()
+        if screenshot_row:
+            _collect_screenshot_files(cursor, (screenshot_row[1], screenshot_row[9]))
         
         return stats_deleted_count + screenshots_deleted_count + match_deleted_count
     except sqlite3.Error as e:
@@ -2651,6 +3265,7 @@ def delete_match(match_id):
         conn.close()
 
 
+@instrumented("db")
 def get_champion_leaderboard(stat_key, limit, show_bottom=False, role=None, min_games=1, filters=None):
     """
     Gets leaderboard of champions (not players) aggregated across all games.
@@ -2702,30 +3317,15 @@ def get_champion_leaderboard(stat_key, limit, show_bottom=False, role=None, min_
         where_conditions.append(f"ms.champ IN ({placeholders})")
         params.extend(champions_in_role)
 
-    _apply_match_filters(where_conditions, params, filters, player_alias="ms")
+    match_filters = MatchFilters.coerce(filters)
+    _apply_match_filters(where_conditions, params, match_filters, player_alias="ms")
+    narrowed = bool(role) or match_filters.active
 
-    where_clause = " AND ".join(where_conditions)
     final_params = params + [min_games, limit]
 
+    conn, on_snapshot = _connect_analytics()
     query = f"""
-        WITH TeamTotals AS (
-            SELECT
-                match_id,
-                team,
-                SUM(kills + assists) as team_kill_participations,
-                SUM(damage) as team_damage
-            FROM player_stats GROUP BY match_id, team
-        ),
-        MatchShares AS (
-            SELECT 
-                ps.*,
-                COALESCE(ott.team_damage, 0) AS enemy_team_damage,
-                CASE WHEN tt.team_kill_participations > 0 THEN CAST(ps.kills + ps.assists AS REAL) * 100.0 / tt.team_kill_participations ELSE 0 END as kill_share,
-                CASE WHEN tt.team_damage > 0 THEN CAST(ps.damage AS REAL) * 100.0 / tt.team_damage ELSE 0 END as damage_share
-            FROM player_stats ps
-            JOIN TeamTotals tt ON ps.match_id = tt.match_id AND ps.team = tt.team
-            LEFT JOIN TeamTotals ott ON ps.match_id = ott.match_id AND ps.team != ott.team
-        ),
+        WITH {_match_shares_ctes(where_conditions, "ms", narrowed, on_snapshot)},
         ChampionAggregates AS (
             SELECT
                 ms.champ,
@@ -2737,7 +3337,6 @@ def get_champion_leaderboard(stat_key, limit, show_bottom=False, role=None, min_
                 ({stat_expressions[stat_key]}) AS value
             FROM MatchShares ms
             JOIN matches m ON ms.match_id = m.match_id
-            WHERE {where_clause}
             GROUP BY ms.champ
             HAVING games_played >= ?
         )
@@ -2756,7 +3355,6 @@ def get_champion_leaderboard(stat_key, limit, show_bottom=False, role=None, min_
         LIMIT ?;
     """
 
-    conn = sqlite3.connect("match_data.db")
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     try:
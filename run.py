@@ -3,31 +3,70 @@
 import asyncio
 import os
 import re
-import sqlite3
+import time
+
+# Imported first so the boot clock also covers the imports below.
+from utils.boot import FAST_BOOT, boot_profiler, run_deferred
 
 import discord
 import dotenv
 from discord.ext import commands
 
-from db import backfill_match_registered_at, create_database
+from db import DATABASE_PATH, backfill_match_registered_at, create_database, schema_is_current
+from utils.command_sync import FORCE_COMMAND_SYNC, sync_command_tree
+from utils.loop_monitor import loop_monitor
+from utils.metrics import metrics
+from utils.query_trace import connect
 
 
 dotenv.load_dotenv()
+boot_profiler.mark("imports")
 
 intents = discord.Intents.default()
 intents.message_content = True
 intents.members = True
 
-bot = commands.Bot(command_prefix=["!"], intents=intents)
+
+class InstrumentedCommandTree(discord.app_commands.CommandTree):
+    """Command tree that records latency and errors for every slash command."""
+
+    async def interaction_check(self, interaction):
+        interaction.extras["metrics_started"] = time.perf_counter()
+        if interaction.command is not None:
+            loop_monitor.label_current_task(f"slash:{interaction.command.qualified_name}")
+        return True
+
+    async def on_error(self, interaction, error):
+        _record_app_command(interaction, error=True)
+        await super().on_error(interaction, error)
+
+
+def _record_app_command(interaction, error=False):
+    started = interaction.extras.pop("metrics_started", None)
+    command = interaction.command
+    if started is not None and command is not None:
+        metrics.record("slash", command.qualified_name, time.perf_counter() - started, error)
+
+
+class RoundTableBot(commands.Bot):
+    async def setup_hook(self):
+        # Runs once after login and before the gateway connects, so commands
+        # are registered by the time the first ready arrives.
+        loop_monitor.start()
+        await startup()
+
+
+bot = RoundTableBot(command_prefix=["!"], intents=intents, tree_cls=InstrumentedCommandTree)
 bot.remove_command("help")
 GUILD_ID = int(os.getenv("GUILD_ID"))
+COGS = ["cogs.admin", "cogs.general", "cogs.stats", "cogs.listeners"]
+DATABASE_RETRY_SECONDS = 60
 
 _startup_backfill_done = False
-_startup_cogs_loaded = False
 
 
 def get_missing_registered_match_ids():
-    conn = sqlite3.connect("match_data.db")
+    conn = connect(DATABASE_PATH)
     cursor = conn.cursor()
     try:
         cursor.execute("SELECT match_id FROM matches WHERE registered_at IS NULL;")
@@ -110,38 +149,111 @@ async def backfill_match_timestamps_task():
         print(f"Failed to collect/backfill match timestamps from #match-results: {e}")
 
 
-@bot.event
-async def on_ready():
-    global _startup_backfill_done, _startup_cogs_loaded
-    print(f"Logged in as {bot.user}")
+@bot.before_invoke
+async def label_command_task(ctx):
+    # Listeners like on_command run in their own task; this hook runs in the
+    # one that executes the command, which is the task a block is caught in.
+    # For the same reason the latency clock starts here: on_command would only
+    # run once the command first awaits, after its synchronous work.
+    ctx.metrics_started = time.perf_counter()
+    loop_monitor.label_current_task(f"command:{ctx.command.qualified_name}")
+
+
+@bot.listen()
+async def on_command_completion(ctx):
+    metrics.record("command", ctx.command.qualified_name, time.perf_counter() - ctx.metrics_started)
+    boot_profiler.command_completed(ctx.command.qualified_name)
+
+
+@bot.listen()
+async def on_command_error(ctx, error):
+    started = getattr(ctx, "metrics_started", None)
+    if ctx.command is not None and started is not None:
+        metrics.record("command", ctx.command.qualified_name, time.perf_counter() - started, error=True)
+
+
+@bot.listen()
+async def on_app_command_completion(interaction, command):
+    _record_app_command(interaction)
+    boot_profiler.command_completed(f"/{command.qualified_name}")
 
+
+async def sync_commands():
     try:
-        create_database()
+        guild = discord.Object(id=GUILD_ID)
+        bot.tree.copy_global_to(guild=guild)
+        synced, count, fingerprint = await sync_command_tree(bot.tree, guild=guild, force=FORCE_COMMAND_SYNC)
+        if synced:
+            print(f"Synced {count} command(s) to guild (tree {fingerprint[:12]})")
+        else:
+            print(f"Skipped command sync: {count} command(s) unchanged since the last sync (tree {fingerprint[:12]})")
     except Exception as e:
-        print(f"Failed to initialize database: {e}")
-        return
+        print(f"Failed to sync commands: {e}")
+
+
+async def startup():
+    boot_profiler.mark("login")
+    if FAST_BOOT and schema_is_current():
+        # Every table and migration is already in place; the full idempotent
+        # pass only normalizes data, so it can wait until the bot is serving.
+        print("Fast boot: database schema is current, checking it after ready.")
+        asyncio.create_task(run_deferred(bot, "database", create_database))
+    else:
+        try:
+            with boot_profiler.phase("database"):
+                create_database()
+        except Exception as e:
+            # Still load the cogs: startup runs once per process, so returning
+            # here would leave the bot connected with no commands.
+            print(f"Failed to initialize database: {e}")
+            asyncio.create_task(retry_database_init())
 
-    if not _startup_cogs_loaded:
-        _startup_cogs_loaded = True
-        cogs = ["cogs.admin", "cogs.general", "cogs.stats", "cogs.listeners"]
-        for cog in cogs:
-            try:
+    for cog in COGS:
+        try:
+            with boot_profiler.phase(f"load:{cog}"):
                 await bot.load_extension(cog)
-                print(f"Loaded {cog}")
-            except Exception as e:
-                print(f"Failed to load {cog}: {e}")
+            print(f"Loaded {cog}")
+        except Exception as e:
+            print(f"Failed to load {cog}: {e}")
+
+    if FAST_BOOT:
+        # Commands already registered with Discord keep working until then.
+        asyncio.create_task(run_deferred(bot, "tree_sync", sync_commands))
+    else:
+        with boot_profiler.phase("tree_sync"):
+            await sync_commands()
+
 
+async def retry_database_init():
+    await bot.wait_until_ready()
+    while True:
         try:
-            guild = discord.Object(id=GUILD_ID)
-            bot.tree.copy_global_to(guild=guild)
-            synced = await bot.tree.sync(guild=guild)
-            print(f"Synced {len(synced)} command(s) to guild")
+            await asyncio.to_thread(create_database)
         except Exception as e:
-            print(f"Failed to sync commands: {e}")
+            print(f"Failed to initialize database: {e}; retrying in {DATABASE_RETRY_SECONDS}s.")
+            await asyncio.sleep(DATABASE_RETRY_SECONDS)
+            continue
+        print("Database initialized.")
+        return
+
+
+@bot.event
+async def on_ready():
+    global _startup_backfill_done
+    print(f"Logged in as {bot.user}")
+    boot_profiler.ready()
 
     if not _startup_backfill_done:
         _startup_backfill_done = True
-        asyncio.create_task(backfill_match_timestamps_task())
+        boot_profiler.mark("gateway_connect")
+        print(f"Boot phases: {boot_profiler.summary()}")
+        boot_profiler.write()
+        asyncio.create_task(run_deferred(bot, "backfill", backfill_match_timestamps_task))
+
+
+@bot.event
+async def on_resumed():
+    boot_profiler.ready("resume")
 
 
 bot.run(os.getenv("BOT_TOKEN"))
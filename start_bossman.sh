@@ -36,6 +36,9 @@ touch "$OUT_LOG" "$ERR_LOG"
 start_line=$(( $(wc -l < "$OUT_LOG") + 1 ))
 
 cd "$BOT_DIR" || exit 1
+# Fresh bytecode keeps the large cogs from being recompiled on every start,
+# even when the environment sets PYTHONDONTWRITEBYTECODE.
+"$PYTHON" -m compileall -q run.py db.py cogs core utils > /dev/null 2>> "$ERR_LOG"
 nohup "$PYTHON" -u "$RUN_FILE" >> "$OUT_LOG" 2>> "$ERR_LOG" < /dev/null &
 bot_pid=$!
 echo "$bot_pid" > "$PID_FILE"
@@ -1,8 +1,12 @@
 import argparse
 import asyncio
+import json
 import os
 import sys
 import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 import discord
 import dotenv
@@ -12,108 +16,314 @@ ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if ROOT_DIR not in sys.path:
     sys.path.insert(0, ROOT_DIR)
 
-from cogs.listeners import Listeners
 from core.constants import ALLOWED_CHANNELS
-from db import create_database, get_match_screenshot, link_match_screenshot
+from db import create_database, discard_screenshot_files, get_match_screenshot, link_match_screenshot
 from utils.match_screenshots import (
     attachment_is_supported,
-    move_screenshot_file,
-    remove_screenshot_file,
     resolve_screenshot_path,
+    save_screenshot,
     screenshot_extension,
 )
+from utils.ocr import MatchIdReader
 
 
-async def _collect_candidate_messages(client, guild_id, channel_names, history_limit):
+DEFAULT_CHECKPOINT = os.path.join(ROOT_DIR, "backfill_checkpoint.json")
+PROGRESS_INTERVAL_SECONDS = 10
+CHECKPOINT_EVERY = 25
+
+
+class Checkpoint:
+    """Attachment IDs that reached a final outcome, persisted so reruns resume."""
+
+    def __init__(self, path, enabled=True):
+        self.path = path
+        self.enabled = enabled
+        self.done_attachments = set()
+        self.finished_channels = set()
+        self._unsaved = 0
+
+    def load(self):
+        if not self.enabled or not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as checkpoint_file:
+            data = json.load(checkpoint_file)
+        self.done_attachments = {int(item) for item in data.get("done_attachments", [])}
+        self.finished_channels = {int(item) for item in data.get("finished_channels", [])}
+        print(
+            f"Resuming from {self.path}: {len(self.done_attachments)} attachments done, "
+            f"{len(self.finished_channels)} channels finished."
+        )
+
+    def mark_done(self, attachment_id):
+        self.done_attachments.add(int(attachment_id))
+        self._unsaved += 1
+        if self._unsaved >= CHECKPOINT_EVERY:
+            self.save()
+
+    def mark_channel_finished(self, channel_id):
+        self.finished_channels.add(int(channel_id))
+        self.save()
+
+    def save(self):
+        if not self.enabled:
+            return
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as checkpoint_file:
+            json.dump(
+                {
+                    "done_attachments": sorted(self.done_attachments),
+                    "finished_channels": sorted(self.finished_channels),
+                    "saved_at": int(time.time()),
+                },
+                checkpoint_file,
+            )
+        os.replace(temp_path, self.path)
+        self._unsaved = 0
+
+
+class Progress:
+    def __init__(self):
+        self.started = time.monotonic()
+        self.messages_scanned = 0
+        self.images_queued = 0
+        self.images_downloaded = 0
+        self.bytes_downloaded = 0
+        self.images_ocrd = 0
+        self.ocr_seconds = 0.0
+        self.skipped_done = 0
+        self.skipped_existing = 0
+        self.no_match_id = 0
+        self.errors = 0
+        self.linked = []
+
+    def line(self):
+        elapsed = max(0.001, time.monotonic() - self.started)
+        return (
+            f"[{elapsed:6.0f}s] scanned {self.messages_scanned} msgs, "
+            f"downloaded {self.images_downloaded} ({self.bytes_downloaded / (1024 * 1024):.1f} MB), "
+            f"OCR {self.images_ocrd} ({self.images_ocrd / elapsed:.2f} img/s), linked {len(self.linked)}"
+        )
+
+
+class _OcrPool:
+    """Thread pool where every worker thread owns its own EasyOCR reader."""
+
+    def __init__(self, workers):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ocr")
+        self._local = threading.local()
+
+    def _get_match_id(self, path):
+        ocr = getattr(self._local, "ocr", None)
+        if ocr is None:
+            ocr = self._local.ocr = MatchIdReader()
+        started = time.perf_counter()
+        match_id = ocr.get_match_id(path)
+        return match_id, time.perf_counter() - started
+
+    async def get_match_id(self, path):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self._get_match_id, path)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
+
+
+def _candidate_channels(client, guild_id, channel_names):
     guilds = [client.get_guild(guild_id)] if guild_id else list(client.guilds)
     allowed_names = {name.strip() for name in channel_names if name.strip()}
-    candidates = []
-    for guild in filter(None, guilds):
-        for channel in guild.text_channels:
-            if channel.name not in allowed_names:
+    return [
+        channel
+        for guild in filter(None, guilds)
+        for channel in guild.text_channels
+        if channel.name in allowed_names
+    ]
+
+
+async def _page_history(channels, history_limit, download_queue, checkpoint, progress, stop):
+    for channel in channels:
+        if channel.id in checkpoint.finished_channels:
+            print(f"Skipping #{channel.name}: finished in a previous run.")
+            continue
+        try:
+            async for message in channel.history(limit=history_limit):
+                if stop.is_set():
+                    return
+                progress.messages_scanned += 1
+                for attachment in message.attachments:
+                    if not attachment_is_supported(attachment):
+                        continue
+                    if attachment.id in checkpoint.done_attachments:
+                        progress.skipped_done += 1
+                        continue
+                    progress.images_queued += 1
+                    await download_queue.put((message, attachment))
+        except discord.Forbidden:
+            print(f"Skipping #{channel.name}: missing history permission.")
+            continue
+        except discord.HTTPException as exc:
+            print(f"Skipping #{channel.name}: {exc}")
+            continue
+
+        if not stop.is_set() and history_limit is None:
+            checkpoint.mark_channel_finished(channel.id)
+
+
+async def _download_worker(download_queue, ocr_queue, progress, stop):
+    while True:
+        item = await download_queue.get()
+        if item is None:
+            return
+        if stop.is_set():
+            continue
+
+        message, attachment = item
+        extension = screenshot_extension(attachment.filename)
+        fd, temp_path = tempfile.mkstemp(suffix=extension)
+        os.close(fd)
+        try:
+            await attachment.save(temp_path)
+        except (OSError, discord.HTTPException) as exc:
+            progress.errors += 1
+            print(f"Skipping attachment {attachment.id}: download failed: {exc}")
+            os.remove(temp_path)
+            continue
+
+        progress.images_downloaded += 1
+        progress.bytes_downloaded += int(attachment.size or 0)
+        await ocr_queue.put((message, attachment, temp_path))
+
+
+def _link_screenshot(message, attachment, match_id, temp_path, args, progress, checkpoint):
+    existing = get_match_screenshot(match_id)
+    existing_path = resolve_screenshot_path(existing["file_path"]) if existing else None
+    if existing_path and existing_path.exists() and not args.overwrite:
+        progress.skipped_existing += 1
+        checkpoint.mark_done(attachment.id)
+        return
+
+    if args.dry_run:
+        progress.linked.append((match_id, f"(dry run) attachment {attachment.id}"))
+        return
+
+    extension = screenshot_extension(attachment.filename)
+    new_path, content_hash, preview_path = save_screenshot(temp_path, extension)
+    if link_match_screenshot(
+        match_id,
+        new_path,
+        source_url=attachment.url,
+        message_id=message.id,
+        attachment_id=attachment.id,
+        channel_id=message.channel.id,
+        created_at=int(message.created_at.timestamp()),
+        content_hash=content_hash,
+        preview_path=preview_path,
+        source_path=temp_path,
+    ):
+        progress.linked.append((match_id, new_path))
+        checkpoint.mark_done(attachment.id)
+    else:
+        discard_screenshot_files(new_path, preview_path)
+
+
+async def _ocr_worker(ocr_queue, ocr_pool, args, progress, checkpoint, stop):
+    while True:
+        item = await ocr_queue.get()
+        if item is None:
+            return
+
+        message, attachment, temp_path = item
+        try:
+            if stop.is_set():
+                continue
+            match_id, ocr_seconds = await ocr_pool.get_match_id(temp_path)
+            progress.images_ocrd += 1
+            progress.ocr_seconds += ocr_seconds
+            if not match_id:
+                progress.no_match_id += 1
+                checkpoint.mark_done(attachment.id)
                 continue
-            try:
-                async for message in channel.history(limit=history_limit):
-                    if any(attachment_is_supported(item) for item in message.attachments):
-                        candidates.append(message)
-            except discord.Forbidden:
-                print(f"Skipping #{channel.name}: missing history permission.")
-            except discord.HTTPException as exc:
-                print(f"Skipping #{channel.name}: {exc}")
 
-    candidates.sort(key=lambda message: message.created_at, reverse=True)
-    return candidates
+            # Other workers may have reached the limit while this image was in OCR.
+            if len(progress.linked) >= args.limit:
+                stop.set()
+                continue
+
+            _link_screenshot(message, attachment, match_id, temp_path, args, progress, checkpoint)
+            if len(progress.linked) >= args.limit:
+                stop.set()
+        except Exception as exc:
+            # A lock held by the live bot, or a cv2/torch error, must not end the
+            # worker: the bounded queue would fill and stall the whole run.
+            progress.errors += 1
+            print(f"Skipping attachment {attachment.id}: {type(exc).__name__}: {exc}")
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+
+async def _report_progress(progress):
+    while True:
+        await asyncio.sleep(PROGRESS_INTERVAL_SECONDS)
+        print(progress.line())
 
 
 async def _backfill(client, args):
     create_database()
-    ocr = Listeners(bot=None)
     history_limit = None if args.history_limit <= 0 else args.history_limit
-    messages = await _collect_candidate_messages(
-        client,
-        args.guild_id,
-        args.channels or ALLOWED_CHANNELS,
-        history_limit,
-    )
+    checkpoint = Checkpoint(args.checkpoint, enabled=not args.dry_run)
+    if args.reset and os.path.exists(args.checkpoint) and not args.dry_run:
+        os.remove(args.checkpoint)
+    checkpoint.load()
 
-    linked = []
-    skipped_existing = 0
-    scanned_images = 0
-    for message in messages:
-        if len(linked) >= args.limit:
-            break
-
-        for attachment in message.attachments:
-            if len(linked) >= args.limit:
-                break
-            if not attachment_is_supported(attachment):
-                continue
+    channels = _candidate_channels(client, args.guild_id, args.channels or ALLOWED_CHANNELS)
+    progress = Progress()
+    stop = asyncio.Event()
+    download_queue = asyncio.Queue(maxsize=args.download_concurrency * 2)
+    ocr_queue = asyncio.Queue(maxsize=args.ocr_workers * 2)
+    ocr_pool = _OcrPool(args.ocr_workers)
+
+    downloaders = [
+        asyncio.create_task(_download_worker(download_queue, ocr_queue, progress, stop))
+        for _ in range(args.download_concurrency)
+    ]
+    recognizers = [
+        asyncio.create_task(_ocr_worker(ocr_queue, ocr_pool, args, progress, checkpoint, stop))
+        for _ in range(args.ocr_workers)
+    ]
+    reporter = asyncio.create_task(_report_progress(progress))
+    try:
+        await _page_history(channels, history_limit, download_queue, checkpoint, progress, stop)
+        for _ in downloaders:
+            await download_queue.put(None)
+        await asyncio.gather(*downloaders)
+        for _ in recognizers:
+            await ocr_queue.put(None)
+        await asyncio.gather(*recognizers)
+    finally:
+        reporter.cancel()
+        for task in downloaders + recognizers:
+            task.cancel()
+        ocr_pool.shutdown()
+        checkpoint.save()
 
-            scanned_images += 1
-            extension = screenshot_extension(attachment.filename)
-            fd, temp_path = tempfile.mkstemp(suffix=extension)
-            os.close(fd)
-            new_path = None
-            try:
-                await attachment.save(temp_path)
-                match_id = ocr.get_match_id(temp_path)
-                if not match_id:
-                    continue
-
-                existing = get_match_screenshot(match_id)
-                existing_path = resolve_screenshot_path(existing["file_path"]) if existing else None
-                if existing_path and existing_path.exists() and not args.overwrite:
-                    skipped_existing += 1
-                    continue
-
-                new_path = move_screenshot_file(temp_path, match_id, attachment.id, extension)
-                temp_path = None
-                if link_match_screenshot(
-                    match_id,
-                    new_path,
-                    source_url=attachment.url,
-                    message_id=message.id,
-                    attachment_id=attachment.id,
-                    channel_id=message.channel.id,
-                    created_at=int(message.created_at.timestamp()),
-                ):
-                    if existing and existing["file_path"] != new_path:
-                        remove_screenshot_file(existing["file_path"])
-                    linked.append((match_id, new_path))
-                else:
-                    remove_screenshot_file(new_path)
-            except (OSError, ValueError) as exc:
-                if new_path:
-                    remove_screenshot_file(new_path)
-                print(f"Skipping attachment {attachment.id}: {exc}")
-            finally:
-                if temp_path and os.path.exists(temp_path):
-                    os.remove(temp_path)
-
-    print(f"Scanned image attachments: {scanned_images}")
-    print(f"Linked screenshots: {len(linked)}")
-    print(f"Already linked: {skipped_existing}")
-    for match_id, path in linked:
+    elapsed = max(0.001, time.monotonic() - progress.started)
+    print(progress.line())
+    print(f"Scanned messages: {progress.messages_scanned}")
+    print(f"Image attachments queued: {progress.images_queued} (skipped {progress.skipped_done} from checkpoint)")
+    print(
+        f"Downloaded: {progress.images_downloaded} "
+        f"({progress.bytes_downloaded / (1024 * 1024) / elapsed:.2f} MB/s)"
+    )
+    if progress.images_ocrd:
+        print(
+            f"OCR: {progress.images_ocrd} images, {progress.images_ocrd / elapsed:.2f} img/s overall, "
+            f"{progress.ocr_seconds / progress.images_ocrd * 1000:.0f} ms/img per worker"
+        )
+    print(f"No match ID found: {progress.no_match_id}")
+    print(f"Errors: {progress.errors}")
+    print(f"{'Would link' if args.dry_run else 'Linked screenshots'}: {len(progress.linked)}")
+    print(f"Already linked: {progress.skipped_existing}")
+    for match_id, path in progress.linked:
         print(f"!match {match_id} -> {path}")
 
 
@@ -125,10 +335,26 @@ async def main():
     parser.add_argument("--guild-id", type=int, default=int(os.getenv("GUILD_ID") or 0) or None)
     parser.add_argument("--channels", nargs="*", default=None, help="Channel names; defaults to result/admin channels.")
     parser.add_argument("--overwrite", action="store_true", help="Replace screenshots that are already stored.")
+    parser.add_argument("--download-concurrency", type=int, default=4, help="Attachments downloaded at once.")
+    parser.add_argument(
+        "--ocr-workers",
+        type=int,
+        default=1,
+        help="OCR threads. Each loads its own EasyOCR model, so memory grows with this value.",
+    )
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT, help="Progress file used to resume interrupted runs.")
+    parser.add_argument("--reset", action="store_true", help="Ignore and delete the existing checkpoint.")
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Download and OCR without saving files, linking, or updating the checkpoint.",
+    )
     args = parser.parse_args()
 
     if args.limit <= 0:
         raise ValueError("--limit must be greater than zero.")
+    if args.download_concurrency <= 0 or args.ocr_workers <= 0:
+        raise ValueError("--download-concurrency and --ocr-workers must be greater than zero.")
 
     token = os.getenv("BOT_TOKEN")
     if not token:
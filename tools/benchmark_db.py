@@ -0,0 +1,368 @@
+import argparse
+import inspect
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+import db
+from tools.generate_synthetic_db import database_shape, generate_synthetic_db, use_database
+from utils.match_filters import SEASON_FILTERS
+from utils.snapshot import analytics_snapshot
+
+
+# Public db.py functions that are not timed here: writes, migrations, pure
+# helpers and the raw SQL escape hatch. Anything public and in neither this
+# set nor read_calls() is reported, so new read functions get added.
+NOT_BENCHMARKED = {
+    "add_alt_ign",
+    "backfill_match_registered_at",
+    "create_database",
+    "delete_alt_ign",
+    "delete_match",
+    "discard_screenshot_files",
+    "display_map_name",
+    "increment_counter",
+    "insert_embed",
+    "insert_scoreboard",
+    "link_ign",
+    "link_match_screenshot",
+    "migrate_team_column",
+    "refresh_analytics_snapshot",
+    "related_map_names",
+    "schema_is_current",
+    "set_screenshot_cdn_url",
+    "unlink_ign",
+    "update_discord_id",
+}
+
+
+def _season_timestamp(season, key):
+    return int(datetime.strptime(SEASON_FILTERS[season][key], "%Y-%m-%d").timestamp())
+
+
+def benchmark_context():
+    """Pick the busiest linked players, champions and a map to query, like the bot's heaviest users would."""
+    conn = db._connect()
+    try:
+        players = conn.execute(
+            """
+            SELECT p.player_id, p.discord_id, p.player_ign, p.alt_igns
+            FROM player_stats ps
+            JOIN players p ON ps.player_id = p.player_id
+            WHERE p.discord_id IS NOT NULL
+            GROUP BY p.player_id
+            ORDER BY COUNT(*) DESC
+            LIMIT 5;
+            """
+        ).fetchall()
+        champions = [
+            row[0]
+            for row in conn.execute(
+                "SELECT champ FROM player_stats GROUP BY champ ORDER BY COUNT(*) DESC LIMIT 2;"
+            )
+        ]
+        map_name, match_id, queue_num = conn.execute(
+            """
+            SELECT map, match_id, queue_num
+            FROM matches
+            GROUP BY map
+            ORDER BY COUNT(*) DESC
+            LIMIT 1;
+            """
+        ).fetchone()
+    finally:
+        conn.close()
+
+    if len(players) < 3 or len(champions) < 2:
+        raise SystemExit("The database needs at least three linked players and two champions with matches.")
+    alt_ign = next((json.loads(row[3])[0] for row in players if row[3] and json.loads(row[3])), players[0][2])
+    return {
+        "player_ids": [row[0] for row in players],
+        "discord_ids": [row[1] for row in players],
+        "igns": [row[2] for row in players],
+        "alt_ign": alt_ign,
+        "champions": champions,
+        "map": map_name,
+        "match_id": match_id,
+        "queue_num": queue_num,
+    }
+
+
+def filter_sets(context, now):
+    """Representative filter combinations, from none to narrow."""
+    return [
+        ("all", None),
+        ("season 4", {"registered_after": _season_timestamp("4", "after")}),
+        ("last 30 days", {"registered_after": now - 30 * 86400}),
+        ("last 7 days", {"registered_after": now - 7 * 86400}),
+        ("map", {"map": context["map"]}),
+        ("wins", {"result": "wins"}),
+        ("vs champion", {"vs_champions": [context["champions"][0]]}),
+        ("season 4, map, wins", {
+            "registered_after": _season_timestamp("4", "after"),
+            "map": context["map"],
+            "result": "wins",
+        }),
+    ]
+
+
+def read_calls(context):
+    """``(label, function name, args, kwargs, takes_filters)`` for every public read function."""
+    p1, p2, p3 = context["player_ids"][:3]
+    d1, d2 = context["discord_ids"][:2]
+    c1, c2 = context["champions"]
+    ign = context["igns"][0]
+    return [
+        ("get_players_stats", "get_players_stats", ([p1, p2, p3],), {}, True),
+        ("get_player_stats", "get_player_stats", (p1,), {}, True),
+        ("get_players_top_champs", "get_players_top_champs", ([p1, p2],), {}, True),
+        ("get_top_champs", "get_top_champs", (p1,), {}, True),
+        ("get_pair_records", "get_pair_records", ([p1, p2, p3],), {}, True),
+        ("get_winrate_with_against", "get_winrate_with_against", (p1, p2), {}, True),
+        ("compare_player_ids", "compare_player_ids", ([p1, p2],), {}, True),
+        ("compare_by_player_ids", "compare_by_player_ids", (p1, p2), {}, True),
+        ("compare_players", "compare_players", (d1, d2), {}, True),
+        ("get_teammate_records", "get_teammate_records", (p1,), {}, True),
+        ("get_enemy_records", "get_enemy_records", (p1,), {}, True),
+        ("get_player_relationship_records[support]", "get_player_relationship_records", (p1, "against"), {"role": "Support"}, True),
+        ("get_related_champion_records", "get_related_champion_records", (p1,), {}, True),
+        ("get_champion_relationship_records", "get_champion_relationship_records", (c1,), {}, True),
+        ("get_talent_records", "get_talent_records", (c1,), {}, True),
+        ("get_pickrate_records", "get_pickrate_records", (), {}, True),
+        ("get_player_pair_champion_records", "get_player_pair_champion_records", (p1, p2), {}, True),
+        ("get_player_pair_map_records", "get_player_pair_map_records", (p1, p2), {}, True),
+        ("get_player_pair_summary", "get_player_pair_summary", (p1, p2), {}, True),
+        ("get_match_history", "get_match_history", (p1,), {}, True),
+        ("get_player_map_winrates", "get_player_map_winrates", (p1,), {}, True),
+        ("get_champions_map_winrates", "get_champions_map_winrates", ([c1, c2],), {}, True),
+        ("get_champion_map_winrates", "get_champion_map_winrates", (c1,), {}, True),
+        ("get_champions_overall_stats", "get_champions_overall_stats", ([c1, c2],), {}, True),
+        ("get_champion_overall_stats", "get_champion_overall_stats", (c1,), {}, True),
+        ("get_leaderboard[kda]", "get_leaderboard", ("kda", 10), {}, True),
+        ("get_leaderboard[kp]", "get_leaderboard", ("kp", 10), {}, True),
+        ("get_player_champion_stats", "get_player_champion_stats", (p1,), {}, True),
+        ("get_champion_leaderboard[winrate]", "get_champion_leaderboard", ("winrate", 10), {}, True),
+        ("get_data_generation", "get_data_generation", (), {}, False),
+        ("get_screenshot_store_stats", "get_screenshot_store_stats", (), {}, False),
+        ("get_counters", "get_counters", (), {}, False),
+        ("get_match_screenshot", "get_match_screenshot", (context["match_id"],), {}, False),
+        ("read_embeds", "read_embeds", (context["queue_num"],), {}, False),
+        ("verify_registered_users", "verify_registered_users", (context["discord_ids"],), {}, False),
+        ("match_exists", "match_exists", (context["match_id"],), {}, False),
+        ("queue_exists", "queue_exists", (context["queue_num"],), {}, False),
+        ("resolve_map_name", "resolve_map_name", (context["map"][:4],), {}, False),
+        ("get_registered_igns", "get_registered_igns", (context["igns"] + [context["alt_ign"]],), {}, False),
+        ("get_ign_link_info", "get_ign_link_info", (context["alt_ign"],), {}, False),
+        ("get_ign_for_discord_id", "get_ign_for_discord_id", (d1,), {}, False),
+        ("get_alt_igns", "get_alt_igns", (d1,), {}, False),
+        ("get_player_info", "get_player_info", (d1,), {}, False),
+        ("get_player_id", "get_player_id", (d1,), {}, False),
+        ("get_old_stats", "get_old_stats", (p1,), {}, False),
+        ("get_player_by_ign", "get_player_by_ign", (ign,), {}, False),
+        ("get_discord_id_for_ign", "get_discord_id_for_ign", (ign,), {}, False),
+        ("get_champion_name", "get_champion_name", (p1, c1[:3]), {}, False),
+        ("get_most_played_champions", "get_most_played_champions", (), {}, False),
+        ("get_all_champion_stats", "get_all_champion_stats", (p1,), {}, False),
+    ]
+
+
+def uncovered_functions(calls):
+    covered = {name for _, name, _, _, _ in calls} | NOT_BENCHMARKED
+    return sorted(
+        name
+        for name, func in inspect.getmembers(db, inspect.isfunction)
+        if not name.startswith("_") and func.__module__ == db.__name__ and name not in covered
+    )
+
+
+def _result_size(result):
+    if isinstance(result, (list, tuple, dict)):
+        return len(result)
+    return None if result is None else 1
+
+
+def time_call(func, args, kwargs, runs):
+    func(*args, **kwargs)  # warm the page cache and the filter compile cache
+    samples = []
+    result = None
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = func(*args, **kwargs)
+        samples.append(time.perf_counter() - started)
+    return {
+        "median_ms": statistics.median(samples) * 1000,
+        "min_ms": min(samples) * 1000,
+        "max_ms": max(samples) * 1000,
+        "runs": runs,
+        "result_size": _result_size(result),
+    }
+
+
+def run_suite(runs, only=None):
+    context = benchmark_context()
+    calls = read_calls(context)
+    filters_by_label = filter_sets(context, int(time.time()))
+    results = {}
+    for label, name, args, kwargs, takes_filters in calls:
+        if only and not any(part in label for part in only):
+            continue
+        func = getattr(db, name)
+        for filter_label, filters in filters_by_label if takes_filters else [("all", None)]:
+            call_kwargs = dict(kwargs, filters=filters) if takes_filters else kwargs
+            key = f"{label} | {filter_label}"
+            try:
+                results[key] = time_call(func, args, call_kwargs, runs)
+            except Exception as error:
+                results[key] = {"error": f"{type(error).__name__}: {error}"}
+            entry = results[key]
+            if "error" in entry:
+                print(f"  ERROR {key}: {entry['error']}")
+            else:
+                print(f"  {entry['median_ms']:9.2f} ms  {key}")
+    return results, uncovered_functions(calls)
+
+
+def database_meta(path):
+    matches, players = database_shape(path)
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        player_rows = conn.execute("SELECT COUNT(*) FROM player_stats;").fetchone()[0]
+    finally:
+        conn.close()
+    return {
+        "matches": matches,
+        "players": players,
+        "player_stats_rows": player_rows,
+        "size_bytes": os.path.getsize(path),
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def prepare_scale(args, scale):
+    """Return a database path for ``scale``: a migrated copy of --db, or a freshly generated one."""
+    if args.db:
+        # Work on a migrated copy so the suite never writes to a live database.
+        path = os.path.join(tempfile.gettempdir(), "benchmark_db_copy.db")
+        shutil.copyfile(args.db, path)
+        use_database(path)
+        db.create_database()
+        return path
+
+    base_matches, base_players = (
+        database_shape(args.like) if args.like and os.path.exists(args.like) else (args.matches, args.players)
+    )
+    matches = max(1, int(base_matches * scale))
+    players = max(10, int(base_players * scale))
+    path = os.path.join(tempfile.gettempdir(), f"benchmark_db_x{scale:g}.db")
+    if not (args.reuse and os.path.exists(path)):
+        started = time.perf_counter()
+        generate_synthetic_db(path, matches, players, args.seed)
+        print(f"Generated {matches} matches for {players} players in {time.perf_counter() - started:.1f}s")
+    use_database(path)
+    db.create_database()
+    return path
+
+
+def print_comparison(report, baseline, threshold):
+    print(f"\nAgainst {baseline['meta'].get('commit') or 'baseline'} (changes over {threshold:.0%}):")
+    for scale, entry in report["scales"].items():
+        before_results = baseline["scales"].get(scale, {}).get("results")
+        if before_results is None:
+            print(f"  x{scale}: not in the baseline")
+            continue
+        before_total = after_total = 0.0
+        for key, after in entry["results"].items():
+            before = before_results.get(key)
+            if not before or "median_ms" not in before or "median_ms" not in after:
+                continue
+            before_total += before["median_ms"]
+            after_total += after["median_ms"]
+            change = (after["median_ms"] - before["median_ms"]) / max(before["median_ms"], 0.001)
+            if abs(change) >= threshold and abs(after["median_ms"] - before["median_ms"]) >= 1:
+                print(f"  x{scale} {change:+7.0%}  {before['median_ms']:9.2f} -> {after['median_ms']:9.2f} ms  {key}")
+        print(f"  x{scale} total {before_total:.0f} ms -> {after_total:.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time every public db.py read function across filter combinations on synthetic databases."
+    )
+    parser.add_argument("--scale", type=float, nargs="+", default=[1, 10], help="Sizes to test, relative to --like.")
+    parser.add_argument("--like", default="match_data.db", help="Database whose match and player counts are scale 1.")
+    parser.add_argument("--matches", type=int, default=350, help="Scale-1 matches when --like does not exist.")
+    parser.add_argument("--players", type=int, default=180, help="Scale-1 players when --like does not exist.")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--db", help="Benchmark a copy of this database instead of generated ones.")
+    parser.add_argument("--reuse", action="store_true", help="Reuse previously generated databases.")
+    parser.add_argument("--runs", type=int, default=3, help="Timed runs per call after one warm-up; medians are reported.")
+    parser.add_argument("--only", nargs="+", help="Only time calls whose label contains one of these.")
+    parser.add_argument("--json", dest="json_path", help="Write the report to this path.")
+    parser.add_argument("--compare", help="Print the difference against an earlier --json report.")
+    parser.add_argument("--snapshot", action="store_true", help="Route heavy reads to a freshly built analytics snapshot.")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Relative change --compare reports.")
+    args = parser.parse_args()
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "created_at": int(time.time()),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "runs": args.runs,
+            "seed": args.seed,
+            "snapshot": args.snapshot,
+        },
+        "scales": {},
+    }
+    uncovered = []
+    for scale in [1] if args.db else args.scale:
+        path = prepare_scale(args, scale)
+        meta = database_meta(path)
+        if args.snapshot:
+            analytics_snapshot.path = f"{path}.snapshot"
+            db.refresh_analytics_snapshot()
+            meta["snapshot_refresh_ms"] = analytics_snapshot.last_refresh_seconds * 1000
+            print(f"Built the analytics snapshot in {meta['snapshot_refresh_ms']:.0f} ms")
+        print(
+            f"\nx{scale:g}: {meta['matches']} matches, {meta['players']} players, "
+            f"{meta['player_stats_rows']} player rows"
+        )
+        results, uncovered = run_suite(max(1, args.runs), args.only)
+        timed = [entry["median_ms"] for entry in results.values() if "median_ms" in entry]
+        print(f"x{scale:g}: {len(results)} calls, {sum(timed):.0f} ms total")
+        report["scales"][f"{scale:g}"] = {"database": meta, "results": results}
+
+    if uncovered:
+        print(f"\nPublic db.py functions not benchmarked: {', '.join(uncovered)}")
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as baseline_file:
+            print_comparison(report, json.load(baseline_file), args.threshold)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as report_file:
+            json.dump(report, report_file, indent=2)
+        print(f"\nWrote {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
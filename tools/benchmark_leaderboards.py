@@ -0,0 +1,210 @@
+import argparse
+import os
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+import db
+from core.constants import CHAMPION_ROLES
+from tools.generate_synthetic_db import generate_synthetic_db, use_database
+
+
+DEFAULT_BENCHMARK_DB_PATH = os.path.join(tempfile.gettempdir(), "synthetic_leaderboards.db")
+PUSH_DOWN_INDEXES = (
+    "idx_player_stats_match_team",
+    "idx_player_stats_champ",
+    "idx_player_stats_player",
+    "idx_matches_map",
+)
+
+
+def legacy_match_shares_ctes(where_conditions, player_alias, narrowed=True, materialized=False):
+    """The plan before push-down: shares for every row in history, filters applied afterwards.
+
+    ``narrowed`` and ``materialized`` are accepted for the same signature and
+    ignored: this plan never restricts team totals, and the benchmark never
+    builds an analytics snapshot, so queries run live.
+    """
+    where_clause = " AND ".join(where_conditions) or "1"
+    return f"""
+        TeamTotals AS (
+            SELECT
+                match_id,
+                team,
+                SUM(kills + assists) AS team_kill_participations,
+                SUM(damage) AS team_damage
+            FROM player_stats
+            GROUP BY match_id, team
+        ),
+        AllShares AS (
+            SELECT
+                ps.*,
+                tt.team_kill_participations,
+                tt.team_damage,
+                COALESCE(ott.team_damage, 0) AS enemy_team_damage,
+                CASE WHEN tt.team_kill_participations > 0 THEN CAST(ps.kills + ps.assists AS REAL) * 100.0 / tt.team_kill_participations ELSE 0 END AS kill_share,
+                CASE WHEN tt.team_damage > 0 THEN CAST(ps.damage AS REAL) * 100.0 / tt.team_damage ELSE 0 END AS damage_share
+            FROM player_stats ps
+            JOIN TeamTotals tt ON ps.match_id = tt.match_id AND ps.team = tt.team
+            LEFT JOIN TeamTotals ott ON ps.match_id = ott.match_id AND ps.team != ott.team
+        ),
+        MatchShares AS (
+            SELECT {player_alias}.*
+            FROM AllShares {player_alias}
+            JOIN matches m ON {player_alias}.match_id = m.match_id
+            WHERE {where_clause}
+        )"""
+
+
+def query_cases(champion):
+    return [
+        ("leaderboard kda", lambda filters: db.get_leaderboard("kda", 10, filters=filters)),
+        ("leaderboard kp", lambda filters: db.get_leaderboard("kp", 10, filters=filters)),
+        ("champion board dmg_share", lambda filters: db.get_champion_leaderboard("dmg_share", 10, filters=filters)),
+        (f"overall {champion}", lambda filters: db.get_champions_overall_stats([champion], filters)),
+        ("player 1 champions", lambda filters: db.get_player_champion_stats(1, filters=filters)),
+    ]
+
+
+def filter_cases(now, champion, some_map):
+    return [
+        ("all games", None),
+        ("last 30 days", {"registered_after": now - 30 * 86400}),
+        ("last 7 days", {"registered_after": now - 7 * 86400}),
+        ("last day", {"registered_after": now - 86400}),
+        (f"map {some_map}", {"map": some_map}),
+        (f"{champion} only", {"include_champions": [champion]}),
+        ("team 1", {"team": 1}),
+        ("last 7 days on map", {"registered_after": now - 7 * 86400, "map": some_map}),
+    ]
+
+
+def filtered_row_count(filters):
+    conditions = ["m.time > 0"]
+    params = []
+    db._apply_match_filters(conditions, params, filters, player_alias="ps")
+    conn = db._connect()
+    try:
+        return conn.execute(
+            f"""
+            SELECT COUNT(*)
+            FROM player_stats ps
+            JOIN matches m ON ps.match_id = m.match_id
+            WHERE {" AND ".join(conditions)}
+            """,
+            params,
+        ).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def comparable(value):
+    """Round floats so results summed in a different row order still compare equal."""
+    if isinstance(value, float):
+        return round(value, 9)
+    if isinstance(value, dict):
+        return {key: comparable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [comparable(item) for item in value]
+    return value
+
+
+def timed_median(func, filters, runs):
+    result = None
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = func(filters)
+        samples.append(time.perf_counter() - started)
+    return result, statistics.median(samples)
+
+
+def run_legacy(func, filters, runs):
+    pushed_down = db._match_shares_ctes
+    db._match_shares_ctes = legacy_match_shares_ctes
+    try:
+        return timed_median(func, filters, runs)
+    finally:
+        db._match_shares_ctes = pushed_down
+
+
+def prepare_database(args):
+    if args.db:
+        # Work on a migrated copy so the benchmark never writes to a live database.
+        path = os.path.join(tempfile.gettempdir(), "benchmark_leaderboards.db")
+        shutil.copyfile(args.db, path)
+        use_database(path)
+        db.create_database()
+    elif args.reuse and os.path.exists(args.output):
+        path = args.output
+        use_database(path)
+        db.create_database()
+    else:
+        started = time.perf_counter()
+        path = generate_synthetic_db(args.output, args.matches, args.players, args.seed, args.days)
+        print(f"Generated {args.matches * 10} player rows in {time.perf_counter() - started:.1f}s")
+        use_database(path)
+
+    conn = sqlite3.connect(path)
+    if args.no_indexes:
+        for index in PUSH_DOWN_INDEXES:
+            conn.execute(f"DROP INDEX IF EXISTS {index};")
+    conn.execute("ANALYZE;")
+    conn.commit()
+    conn.close()
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check that pushed-down leaderboard queries match the old plan, and time both across filter selectivities."
+    )
+    parser.add_argument("--db", help="Existing database to benchmark instead of a generated one.")
+    parser.add_argument("--output", default=DEFAULT_BENCHMARK_DB_PATH, help="Where to generate the synthetic database.")
+    parser.add_argument("--reuse", action="store_true", help="Reuse --output if it already exists.")
+    parser.add_argument("--matches", type=int, default=100_000, help="Matches to generate; each has 10 player rows.")
+    parser.add_argument("--players", type=int, default=2000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--runs", type=int, default=3, help="Timed runs per query; medians are reported.")
+    parser.add_argument("--legacy-runs", type=int, default=1, help="Timed runs of the old plan, which is slow at this size.")
+    parser.add_argument("--no-indexes", action="store_true", help="Drop the push-down indexes to time the plan without them.")
+    args = parser.parse_args()
+
+    prepare_database(args)
+    champion = sorted(CHAMPION_ROLES)[0]
+    some_map = sorted(db.MAP_POOL_DISPLAY_NAMES)[0]
+    filters_by_label = filter_cases(int(time.time()), champion, some_map)
+    total_rows = filtered_row_count(None)
+
+    mismatches = 0
+    print(f"{'query':<26} {'filter':<22} {'rows':>9} {'old plan':>10} {'pushed':>10} {'speedup':>8}")
+    for query_label, func in query_cases(champion):
+        for filter_label, filters in filters_by_label:
+            rows = filtered_row_count(filters)
+            expected, legacy_seconds = run_legacy(func, filters, max(1, args.legacy_runs))
+            actual, current_seconds = timed_median(func, filters, max(1, args.runs))
+            if comparable(expected) != comparable(actual):
+                mismatches += 1
+                print(f"MISMATCH {query_label} / {filter_label}")
+            print(
+                f"{query_label:<26} {filter_label:<22} {rows:>9} "
+                f"{legacy_seconds * 1000:>8.0f}ms {current_seconds * 1000:>8.0f}ms "
+                f"{legacy_seconds / current_seconds if current_seconds else 0:>7.1f}x"
+            )
+
+    print(f"{total_rows} rows in total, {mismatches} mismatches")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
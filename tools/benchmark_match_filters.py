@@ -0,0 +1,281 @@
+import argparse
+import asyncio
+import os
+import re
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+import discord
+from discord.ext import commands
+
+import db
+from cogs.stats import Stats
+from tools.generate_synthetic_db import DEFAULT_SYNTHETIC_DB_PATH, generate_synthetic_db, use_database
+from utils.match_filters import extract_match_filters
+
+
+EXAMPLE_COMMAND_RE = re.compile(r"`!([a-z_]+)((?: [^`]*)?)`")
+EXAMPLE_TOPICS = [
+    "overview", "stats", "top", "lb", "clb", "map", "mapwr", "champmapwr", "cstats", "talents",
+    "pickrate", "match", "champcompare", "mates", "duos", "rivals", "enemies", "withchamps",
+    "champwith", "filters", "aliases",
+]
+
+
+def legacy_apply_match_filters(where_conditions, params, filters=None, player_alias="ps"):
+    """The dict-based translation every query ran before MatchFilters, kept verbatim as the reference."""
+    filters = filters or {}
+
+    if filters.get("registered_after") is not None:
+        where_conditions.append("m.registered_at >= ?")
+        params.append(filters["registered_after"])
+
+    if filters.get("registered_before") is not None:
+        where_conditions.append("m.registered_at < ?")
+        params.append(filters["registered_before"])
+
+    if filters.get("map"):
+        map_names = db.related_map_names(filters["map"])
+        placeholders = ", ".join("?" for _ in map_names)
+        where_conditions.append(f"m.map IN ({placeholders})")
+        params.extend(map_names)
+
+    if filters.get("talent"):
+        where_conditions.append(f"LOWER(TRIM({player_alias}.talent)) LIKE ?")
+        params.append(f"%{str(filters['talent']).lower().strip()}%")
+
+    if filters.get("include_champions"):
+        placeholders = ", ".join("?" for _ in filters["include_champions"])
+        where_conditions.append(f"{player_alias}.champ IN ({placeholders})")
+        params.extend(filters["include_champions"])
+
+    if filters.get("exclude_champions"):
+        placeholders = ", ".join("?" for _ in filters["exclude_champions"])
+        where_conditions.append(f"{player_alias}.champ NOT IN ({placeholders})")
+        params.extend(filters["exclude_champions"])
+
+    if filters.get("result") == "wins":
+        where_conditions.append(db._win_condition(player_alias))
+    elif filters.get("result") == "losses":
+        where_conditions.append(f"NOT {db._win_condition(player_alias)}")
+
+    if filters.get("team"):
+        where_conditions.append(f"{player_alias}.team = ?")
+        params.append(filters["team"])
+
+    if filters.get("scoreline"):
+        team_score, opponent_score = filters["scoreline"]
+        where_conditions.append(
+            f"{db._team_score_expr(player_alias)} = ? AND {db._opponent_score_expr(player_alias)} = ?"
+        )
+        params.extend([team_score, opponent_score])
+    elif filters.get("score_category") == "close":
+        where_conditions.append(
+            "((m.team1_score = 4 AND m.team2_score = 3) OR (m.team1_score = 3 AND m.team2_score = 4))"
+        )
+    elif filters.get("score_category") == "stomp":
+        where_conditions.append("ABS(m.team1_score - m.team2_score) >= 3")
+    elif filters.get("score_category") == "sweep":
+        where_conditions.append("ABS(m.team1_score - m.team2_score) = 4")
+
+    for champ in filters.get("vs_champions", []):
+        where_conditions.append(
+            f"""
+            EXISTS (
+                SELECT 1 FROM player_stats enemy_champ_ps
+                WHERE enemy_champ_ps.match_id = {player_alias}.match_id
+                  AND enemy_champ_ps.champ = ?
+                  AND enemy_champ_ps.team != {player_alias}.team
+            )
+            """
+        )
+        params.append(champ)
+
+    for champ in filters.get("not_vs_champions", []):
+        where_conditions.append(
+            f"""
+            NOT EXISTS (
+                SELECT 1 FROM player_stats enemy_champ_ps
+                WHERE enemy_champ_ps.match_id = {player_alias}.match_id
+                  AND enemy_champ_ps.champ = ?
+                  AND enemy_champ_ps.team != {player_alias}.team
+            )
+            """
+        )
+        params.append(champ)
+
+    for champ in filters.get("with_champions", []):
+        where_conditions.append(
+            f"""
+            EXISTS (
+                SELECT 1 FROM player_stats ally_champ_ps
+                WHERE ally_champ_ps.match_id = {player_alias}.match_id
+                  AND ally_champ_ps.champ = ?
+                  AND ally_champ_ps.team = {player_alias}.team
+                  AND ally_champ_ps.player_stats_id != {player_alias}.player_stats_id
+            )
+            """
+        )
+        params.append(champ)
+
+    for champ in filters.get("not_with_champions", []):
+        where_conditions.append(
+            f"""
+            NOT EXISTS (
+                SELECT 1 FROM player_stats ally_champ_ps
+                WHERE ally_champ_ps.match_id = {player_alias}.match_id
+                  AND ally_champ_ps.champ = ?
+                  AND ally_champ_ps.team = {player_alias}.team
+                  AND ally_champ_ps.player_stats_id != {player_alias}.player_stats_id
+            )
+            """
+        )
+        params.append(champ)
+
+    if filters.get("with_player_id"):
+        where_conditions.append(
+            f"""
+            EXISTS (
+                SELECT 1 FROM player_stats teammate_ps
+                WHERE teammate_ps.match_id = {player_alias}.match_id
+                  AND teammate_ps.player_id = ?
+                  AND teammate_ps.team = {player_alias}.team
+            )
+            """
+        )
+        params.append(filters["with_player_id"])
+
+    if filters.get("against_player_id"):
+        where_conditions.append(
+            f"""
+            EXISTS (
+                SELECT 1 FROM player_stats opponent_ps
+                WHERE opponent_ps.match_id = {player_alias}.match_id
+                  AND opponent_ps.player_id = ?
+                  AND opponent_ps.team != {player_alias}.team
+            )
+            """
+        )
+        params.append(filters["against_player_id"])
+
+
+def example_corpus():
+    """Every ``!command args`` example shown by ``!examples``, as argument lists."""
+    stats = Stats(bot=None)
+    corpus = []
+    for topic in EXAMPLE_TOPICS:
+        embed = stats._examples_embed(topic)
+        texts = [embed.description or ""] + [field.value for field in embed.fields]
+        for text in texts:
+            for command, args in EXAMPLE_COMMAND_RE.findall(text):
+                if command not in {"examples", "help", "filters"} and args.strip():
+                    corpus.append((command, args.split()))
+    return corpus
+
+
+def _timed(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def _summary(label, seconds):
+    seconds = sorted(seconds)
+    p95 = seconds[min(len(seconds) - 1, int(len(seconds) * 0.95))]
+    print(f"  {label:<28} median {statistics.median(seconds) * 1e6:8.1f} us   p95 {p95 * 1e6:8.1f} us   total {sum(seconds) * 1e3:7.2f} ms")
+
+
+async def run(args):
+    corpus = example_corpus()
+    async with commands.Bot(command_prefix="!", intents=discord.Intents.default(), help_command=None) as bot:
+        ctx = SimpleNamespace(bot=bot, guild=None, author=SimpleNamespace(id=None, player_id=1, display_name="me"))
+
+        parsed = []
+        parse_seconds = []
+        errors = 0
+        unstable = 0
+        for command, example_args in corpus:
+            samples = []
+            results = set()
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                _, filters, error = await extract_match_filters(ctx, example_args)
+                samples.append(time.perf_counter() - started)
+                results.add(filters)
+            parse_seconds.append(statistics.median(samples))
+            if len(results) != 1:
+                # Repeat parses must be equal so they share cache entries.
+                unstable += 1
+                print(f"UNSTABLE !{command} {' '.join(example_args)}")
+            if error:
+                errors += 1
+            elif filters:
+                parsed.append((command, example_args, filters))
+
+    print(f"{len(corpus)} examples from !examples, {len(parsed)} with filters, {errors} rejected (unknown players etc.)")
+    print("Per command, tokens to MatchFilters:")
+    _summary("parse", parse_seconds)
+
+    mismatches = 0
+    legacy_seconds, build_seconds, cold_seconds, warm_seconds = [], [], [], []
+    for command, example_args, filters in parsed:
+        legacy_filters = dict(filters)
+        legacy_conditions, legacy_params = [], []
+        legacy_apply_match_filters(legacy_conditions, legacy_params, legacy_filters)
+        conditions, params = filters.compile()
+        if (tuple(legacy_conditions), tuple(legacy_params)) != (conditions, params):
+            mismatches += 1
+            print(f"MISMATCH !{command} {' '.join(example_args)}")
+
+        legacy_seconds.append(_timed(lambda: legacy_apply_match_filters([], [], legacy_filters), args.repeat))
+        build_seconds.append(_timed(lambda: db.MatchFilters(legacy_filters), args.repeat))
+
+        def cold():
+            db._compile_match_filters.cache_clear()
+            filters.compile()
+
+        cold_seconds.append(_timed(cold, args.repeat))
+        filters.compile()
+        warm_seconds.append(_timed(filters.compile, args.repeat))
+
+    print("Per query, filters to SQL:")
+    _summary("dict translation (before)", legacy_seconds)
+    _summary("build MatchFilters (once)", build_seconds)
+    _summary("compile, cache miss", cold_seconds)
+    _summary("compile, cache hit", warm_seconds)
+    distinct = len({filters.sql_key for _, _, filters in parsed})
+    print(f"{distinct} distinct SQL shapes; {mismatches} mismatch(es) against the dict translation; {unstable} unstable parse(s)")
+    return mismatches + unstable
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark parsing and compiling match filters for every !examples command, and check the SQL is unchanged."
+    )
+    parser.add_argument("--db", help="Database for player and map lookups. Defaults to a synthetic database.")
+    parser.add_argument("--repeat", type=int, default=200, help="Timed repetitions per example.")
+    args = parser.parse_args()
+
+    if args.db:
+        use_database(args.db)
+    else:
+        if not os.path.exists(DEFAULT_SYNTHETIC_DB_PATH):
+            generate_synthetic_db(DEFAULT_SYNTHETIC_DB_PATH)
+        use_database(DEFAULT_SYNTHETIC_DB_PATH)
+
+    if asyncio.run(run(args)):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
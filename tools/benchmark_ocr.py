@@ -0,0 +1,237 @@
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from utils.match_screenshots import IMAGE_EXTENSIONS
+from utils.memory import format_bytes
+
+
+FILENAME_MATCH_ID_RE = re.compile(r"(?<!\d)(\d{9,12})(?!\d)")
+
+# Config keys map onto the OCR tuning constants in utils/ocr.py.
+CONFIG_KEYS = {
+    "allowlist": "OCR_TEXT_ALLOWLIST",
+    "header_strip_ratios": "OCR_HEADER_STRIP_RATIOS",
+    "fallback_strip_ratios": "OCR_FALLBACK_STRIP_RATIOS",
+    "strip_x_range": "OCR_STRIP_X_RANGE",
+    "strip_half_height_ratio": "OCR_STRIP_HALF_HEIGHT_RATIO",
+}
+
+
+class _CountingReader:
+    """Wraps an EasyOCR reader and counts recognition passes per image."""
+
+    def __init__(self, reader):
+        self.reader = reader
+        self.passes = 0
+
+    def recognize(self, *args, **kwargs):
+        self.passes += 1
+        return self.reader.recognize(*args, **kwargs)
+
+
+def load_corpus(corpus_dir, manifest_path=None):
+    """Return ``[(path, expected_match_id), ...]`` for every labeled image.
+
+    A manifest is a JSON object of ``{"file name": match_id}``; ``null`` marks an
+    image that should not produce a match ID. Without a manifest the expected ID
+    is the first 9-12 digit number in the file name.
+    """
+    manifest = {}
+    if manifest_path:
+        with open(manifest_path, "r", encoding="utf-8") as manifest_file:
+            manifest = json.load(manifest_file)
+
+    samples = []
+    for name in sorted(os.listdir(corpus_dir)):
+        if os.path.splitext(name)[1].lower() not in IMAGE_EXTENSIONS:
+            continue
+        if manifest:
+            if name not in manifest:
+                continue
+            expected = manifest[name]
+            expected = int(expected) if expected is not None else None
+        else:
+            found = FILENAME_MATCH_ID_RE.search(name)
+            if not found:
+                print(f"Skipping {name}: no match ID in the file name and no manifest entry.")
+                continue
+            expected = int(found.group(1))
+        samples.append((os.path.join(corpus_dir, name), expected))
+    return samples
+
+
+def load_config(spec):
+    if spec == "baseline":
+        return "baseline", {}
+
+    with open(spec, "r", encoding="utf-8") as config_file:
+        raw = json.load(config_file)
+    unknown = set(raw) - set(CONFIG_KEYS)
+    if unknown:
+        raise ValueError(f"{spec}: unknown config keys {sorted(unknown)}; expected {sorted(CONFIG_KEYS)}.")
+    overrides = {
+        CONFIG_KEYS[key]: tuple(value) if isinstance(value, list) else value
+        for key, value in raw.items()
+    }
+    return os.path.splitext(os.path.basename(spec))[0], overrides
+
+
+def _run_config(overrides, samples):
+    # Runs in a fresh process so each configuration reports its own peak RSS.
+    from utils import ocr as ocr_module
+    from utils.memory import peak_rss_bytes
+
+    for name, value in overrides.items():
+        setattr(ocr_module, name, value)
+
+    ocr = ocr_module.MatchIdReader()
+    load_started = time.perf_counter()
+    reader = _CountingReader(ocr.load())
+    load_seconds = time.perf_counter() - load_started
+    ocr.reader = reader
+
+    results = []
+    for path, expected in samples:
+        reader.passes = 0
+        error = None
+        started = time.perf_counter()
+        try:
+            found = ocr.get_match_id(path)
+        except Exception as exc:
+            # A cv2 or EasyOCR failure on one image must not lose the run.
+            found = None
+            error = f"{type(exc).__name__}: {exc}"
+        elapsed = time.perf_counter() - started
+        results.append({
+            "file": os.path.basename(path),
+            "expected": expected,
+            "found": found,
+            "correct": found == expected,
+            "seconds": elapsed,
+            "passes": reader.passes,
+            "error": error,
+        })
+
+    return {"load_seconds": load_seconds, "peak_rss": peak_rss_bytes(), "results": results}
+
+
+def _percentile(values, percent):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(percent / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(name, run):
+    results = run["results"]
+    latencies = [item["seconds"] for item in results]
+    correct = sum(1 for item in results if item["correct"])
+    return {
+        "config": name,
+        "images": len(results),
+        "correct": correct,
+        "accuracy": correct / len(results) * 100 if results else 0.0,
+        "p50_ms": _percentile(latencies, 50) * 1000,
+        "p95_ms": _percentile(latencies, 95) * 1000,
+        "mean_passes": sum(item["passes"] for item in results) / len(results) if results else 0.0,
+        "load_seconds": run["load_seconds"],
+        "peak_rss": run["peak_rss"],
+    }
+
+
+def print_report(summaries, runs):
+    header = f"{'Config':<18} {'Accuracy':>14} {'p50':>9} {'p95':>9} {'Passes':>7} {'Load':>7} {'Peak RSS':>10}"
+    print(header)
+    print("-" * len(header))
+    for summary in summaries:
+        accuracy = f"{summary['accuracy']:.1f}% ({summary['correct']}/{summary['images']})"
+        print(
+            f"{summary['config'][:18]:<18} {accuracy:>14} {summary['p50_ms']:>7.0f}ms {summary['p95_ms']:>7.0f}ms "
+            f"{summary['mean_passes']:>7.2f} {summary['load_seconds']:>6.1f}s {format_bytes(summary['peak_rss']):>10}"
+        )
+
+    if len(runs) < 2:
+        return
+
+    names = [summary["config"] for summary in summaries]
+    by_file = [{item["file"]: item for item in run["results"]} for run in runs]
+    differences = []
+    for file_name, first in by_file[0].items():
+        others = [results.get(file_name) for results in by_file[1:]]
+        if any(other is None or other["found"] != first["found"] for other in others):
+            differences.append((file_name, first["expected"], [first] + others))
+
+    print()
+    if not differences:
+        print("All configurations produced identical match IDs.")
+        return
+    print(f"{len(differences)} image(s) where configurations disagree:")
+    for file_name, expected, items in differences:
+        found = ", ".join(
+            f"{name}={item['found'] if item else 'n/a'}" for name, item in zip(names, items)
+        )
+        print(f"  {file_name}: expected {expected}; {found}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure OCR match ID accuracy and latency over labeled screenshots.")
+    parser.add_argument("corpus", help="Directory of screenshots named with their match ID (or listed in --manifest).")
+    parser.add_argument("--manifest", help="JSON object mapping file names to expected match IDs (null for none).")
+    parser.add_argument(
+        "--config",
+        action="append",
+        dest="configs",
+        help="`baseline` or a JSON file overriding allowlist/strip ratios. Repeat to compare side by side.",
+    )
+    parser.add_argument("--limit", type=int, default=0, help="Only benchmark the first N images.")
+    parser.add_argument("--json", dest="json_path", help="Write per-image results and summaries to this file.")
+    args = parser.parse_args()
+
+    samples = load_corpus(args.corpus, args.manifest)
+    if args.limit > 0:
+        samples = samples[:args.limit]
+    if not samples:
+        raise ValueError("No labeled images found.")
+
+    configs = [load_config(spec) for spec in (args.configs or ["baseline"])]
+    print(f"Benchmarking {len(samples)} image(s) across {len(configs)} configuration(s).")
+
+    context = multiprocessing.get_context("spawn")
+    runs = []
+    for name, overrides in configs:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            runs.append(executor.submit(_run_config, overrides, samples).result())
+        print(f"Finished {name}.")
+
+    summaries = [summarize(name, run) for (name, _), run in zip(configs, runs)]
+    print()
+    print_report(summaries, runs)
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as output:
+            json.dump(
+                {
+                    "summaries": summaries,
+                    "runs": {name: run for (name, _), run in zip(configs, runs)},
+                },
+                output,
+                indent=2,
+            )
+        print(f"\nWrote {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+import argparse
+import os
+import sys
+
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from utils.assets import ASSET_MANIFEST_PATH, build_asset_manifest, write_asset_manifest
+from utils.memory import format_bytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prebuild icons/manifest.json so the bot skips the asset scan at boot.")
+    parser.add_argument("--output", default=ASSET_MANIFEST_PATH, help="Manifest path, relative to the bot directory.")
+    parser.add_argument("--check", action="store_true", help="Exit with status 1 if any champion or map asset is missing.")
+    args = parser.parse_args()
+
+    os.chdir(ROOT_DIR)
+    manifest = build_asset_manifest()
+    write_asset_manifest(manifest, args.output)
+
+    for name, totals in sorted(manifest["directories"].items()):
+        print(f"{name:<20} {totals['files']:>6} files {format_bytes(totals['bytes']):>10}")
+    print(
+        f"Indexed {len(manifest['champions'])} champions and {len(manifest['maps'])} maps "
+        f"in {manifest['build_seconds'] * 1000:.0f}ms -> {args.output}"
+    )
+    for missing in manifest["missing"]:
+        print(f"Missing {missing}")
+    if args.check and manifest["missing"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
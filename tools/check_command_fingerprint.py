@@ -0,0 +1,153 @@
+import argparse
+import asyncio
+import copy
+import os
+import random
+import sys
+import tempfile
+
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+import discord
+from discord.ext import commands
+
+from utils.command_sync import (
+    COMMAND_SYNC_STATE_PATH,
+    command_tree_payload,
+    load_sync_state,
+    payload_fingerprint,
+    sync_command_tree,
+)
+
+
+# Same list as run.py, which cannot be imported without starting the bot.
+COGS = ["cogs.admin", "cogs.general", "cogs.stats", "cogs.listeners"]
+OFFLINE_GUILD = discord.Object(id=1)
+
+
+def make_bot():
+    intents = discord.Intents.default()
+    intents.message_content = True
+    intents.members = True
+    bot = commands.Bot(command_prefix=["!"], intents=intents)
+    bot.remove_command("help")
+    return bot
+
+
+async def load_cogs(bot):
+    """Load every cog into a bot that never logs in."""
+    for cog in COGS:
+        await bot.load_extension(cog)
+    bot.tree.copy_global_to(guild=OFFLINE_GUILD)
+
+
+def _mutate_first_choice(payload):
+    changed = copy.deepcopy(payload)
+    for command in changed:
+        for option in command.get("options", []):
+            if option.get("choices"):
+                option["choices"] = option["choices"][1:]
+                return changed, f"/{command['name']} {option['name']}"
+    return None, None
+
+
+async def check_sync_skips(bot, payload):
+    """Run sync_command_tree against a tree whose upload is replaced by a counter."""
+    uploads = []
+
+    async def fake_sync(*, guild=None):
+        uploads.append(guild)
+        return payload
+
+    bot.tree.sync = fake_sync
+    fd, state_path = tempfile.mkstemp(suffix=".json")
+    os.close(fd)
+    os.remove(state_path)
+    try:
+        first = await sync_command_tree(bot.tree, OFFLINE_GUILD, path=state_path)
+        second = await sync_command_tree(bot.tree, OFFLINE_GUILD, path=state_path)
+        forced = await sync_command_tree(bot.tree, OFFLINE_GUILD, force=True, path=state_path)
+        other_guild = await sync_command_tree(bot.tree, discord.Object(id=2), path=state_path)
+    finally:
+        if os.path.exists(state_path):
+            os.remove(state_path)
+    return [
+        ("first start syncs", first[0] and len(uploads) >= 1),
+        ("unchanged tree skips sync", not second[0]),
+        ("force syncs an unchanged tree", forced[0]),
+        ("another guild has its own fingerprint", other_guild[0]),
+        ("uploads only when synced", len(uploads) == 3),
+    ]
+
+
+async def run_checks(args):
+    # Entering the bots sets up their ready events, so startup work the cogs
+    # defer until ready just waits and is cancelled on exit.
+    async with make_bot() as first, make_bot() as second:
+        await load_cogs(first)
+        await load_cogs(second)
+        return await _run_checks(args, first, second)
+
+
+async def _run_checks(args, first, second):
+    payload = command_tree_payload(first.tree, OFFLINE_GUILD)
+    fingerprint = payload_fingerprint(payload)
+
+    if args.show:
+        for command in payload:
+            print(f"{payload_fingerprint(command)[:12]}  /{command['name']}")
+        print()
+    print(f"{len(payload)} commands, tree fingerprint {fingerprint}")
+
+    shuffled = list(payload)
+    random.Random(0).shuffle(shuffled)
+    reordered = sorted(shuffled, key=lambda command: (command.get("type", 1), command["name"]))
+    checks = [
+        ("independent builds match", command_tree_payload(second.tree, OFFLINE_GUILD) == payload),
+        ("fingerprint ignores registration order", payload_fingerprint(reordered) == fingerprint),
+    ]
+
+    changed, where = _mutate_first_choice(payload)
+    if changed is not None:
+        checks.append((f"dropping a choice from {where} changes it", payload_fingerprint(changed) != fingerprint))
+    described = copy.deepcopy(payload)
+    described[0]["description"] += "."
+    checks.append(("editing a description changes it", payload_fingerprint(described) != fingerprint))
+    checks.extend(await check_sync_skips(first, payload))
+
+    failed = 0
+    for name, ok in checks:
+        failed += not ok
+        print(f"{'ok  ' if ok else 'FAIL'} {name}")
+
+    if args.guild_id:
+        stored = [
+            entry for key, entry in load_sync_state(args.state).items() if key.endswith(f":{args.guild_id}")
+        ]
+        if not stored:
+            print(f"No sync recorded for guild {args.guild_id} in {args.state}; the next start will sync.")
+        elif any(entry["fingerprint"] == fingerprint for entry in stored):
+            print(f"{args.state} matches this tree; the next start will skip the sync.")
+        else:
+            print(f"{args.state} is from a different tree; the next start will sync.")
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fingerprint the slash command tree offline and check the sync-skip logic.")
+    parser.add_argument("--show", action="store_true", help="Print a fingerprint for every command.")
+    parser.add_argument("--state", default=COMMAND_SYNC_STATE_PATH, help="Sync state file to compare against.")
+    parser.add_argument("--guild-id", help="Compare the tree against the stored fingerprint for this guild.")
+    args = parser.parse_args()
+
+    failed = asyncio.run(run_checks(args))
+    if failed:
+        print(f"{failed} check(s) failed")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+import argparse
+import os
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+import db
+from core.constants import CHAMPION_ROLES, get_champions_for_role
+from tools.generate_synthetic_db import DEFAULT_SYNTHETIC_DB_PATH, generate_synthetic_db, use_database
+
+
+def legacy_get_player_stats(player_id, champions=None, filters=None):
+    """The two-query implementation, kept verbatim as the reference for the single-pass rewrite."""
+    conn = db._connect()
+    conn.row_factory = sqlite3.Row 
+    cursor = conn.cursor()
+    
+    try:
+        where_conditions = ["ps.player_id = ?"]
+        params = [player_id]
+
+        if champions and isinstance(champions, list):
+            placeholders = ', '.join('?' for _ in champions)
+            where_conditions.append(f"ps.champ IN ({placeholders})")
+            params.extend(champions)
+
+        db._apply_match_filters(where_conditions, params, filters, player_alias="ps")
+        where_clause = " AND ".join(where_conditions)
+
+        query = f"""
+            WITH TeamTotals AS (
+                SELECT
+                    match_id,
+                    team,
+                    SUM(kills + assists) AS team_kill_participations,
+                    SUM(damage) AS team_damage
+                FROM player_stats
+                GROUP BY match_id, team
+            )
+            SELECT
+                COUNT(ps.match_id) AS games_played,
+                SUM(ps.kills) AS total_kills,
+                SUM(ps.deaths) AS total_deaths,
+                SUM(ps.assists) AS total_assists,
+                SUM(ps.damage) AS total_damage,
+                SUM(ps.taken) AS total_taken,
+                SUM(ps.objective_time) AS total_obj_time,
+                SUM(ps.shielding) AS total_shielding,
+                SUM(ps.healing) AS total_healing,
+                SUM(ps.self_healing) AS total_self_healing,
+                SUM(ps.credits) AS total_credits,
+                SUM(COALESCE(ott.team_damage, 0)) AS total_enemy_damage,
+                SUM(m.time) AS total_time_in_minutes,
+                SUM(CASE WHEN (ps.team = 1 AND m.team1_score > m.team2_score) OR (ps.team = 2 AND m.team2_score > m.team1_score) THEN 1 ELSE 0 END) AS total_wins,
+                
+                AVG(CASE WHEN tt.team_kill_participations > 0 THEN CAST(ps.kills + ps.assists AS REAL) * 100.0 / tt.team_kill_participations ELSE 0 END) AS avg_kill_share,
+                AVG(CASE WHEN tt.team_damage > 0 THEN CAST(ps.damage AS REAL) * 100.0 / tt.team_damage ELSE 0 END) AS avg_damage_share
+
+            FROM player_stats ps
+            JOIN matches m ON ps.match_id = m.match_id
+            JOIN TeamTotals tt ON ps.match_id = tt.match_id AND ps.team = tt.team
+            LEFT JOIN TeamTotals ott ON ps.match_id = ott.match_id AND ps.team != ott.team
+            WHERE {where_clause}
+        """
+
+        cursor.execute(query, params)
+        data = cursor.fetchone()
+
+        if not data or data["games_played"] == 0:
+            return None
+
+        games_played = data["games_played"]
+        total_wins = data["total_wins"]
+        total_time_in_minutes = data["total_time_in_minutes"]
+
+        total_enemy_damage = data["total_enemy_damage"] or 0
+
+        stats_dict = {
+            "games": games_played,
+            "wins": total_wins,
+            "losses": games_played - total_wins,
+            "raw_k": data["total_kills"], "raw_d": data["total_deaths"], "raw_a": data["total_assists"],
+            "winrate": round((total_wins / games_played) * 100, 2) if games_played > 0 else 0,
+            "kda": f"{data['total_kills']}/{data['total_deaths']}/{data['total_assists']}",
+            "kda_ratio": round((data['total_kills'] + data['total_assists']) / max(1, data['total_deaths']), 2),
+            "kills_pm": round(data["total_kills"] / max(1, total_time_in_minutes), 2),
+            "deaths_pm": round(data["total_deaths"] / max(1, total_time_in_minutes), 2),
+            "damage_dealt_pm": round(data["total_damage"] / max(1, total_time_in_minutes), 2),
+            "damage_taken_pm": round(data["total_taken"] / max(1, total_time_in_minutes), 2),
+            "shielding_pm": round(data["total_shielding"] / max(1, total_time_in_minutes), 2),
+            "self_healing_pm": round(data["total_self_healing"] / max(1, total_time_in_minutes), 2),
+            "credits_pm": round(data["total_credits"] / max(1, total_time_in_minutes), 2),
+            "obj_time": round(data["total_obj_time"] / games_played, 2) if games_played > 0 else 0,
+            "avg_kills": round(data["total_kills"] / games_played, 2) if games_played > 0 else 0,
+            "avg_deaths": round(data["total_deaths"] / games_played, 2) if games_played > 0 else 0,
+            "avg_damage_dealt": round(data["total_damage"] / games_played) if games_played > 0 else 0,
+            "avg_damage_taken": round(data["total_taken"] / games_played) if games_played > 0 else 0,
+            "avg_self_healing": round(data["total_self_healing"] / games_played) if games_played > 0 else 0,
+            "avg_shielding": round(data["total_shielding"] / games_played) if games_played > 0 else 0,
+            "avg_credits": round(data["total_credits"] / games_played) if games_played > 0 else 0,
+            "damage_delta": round((data["total_damage"] - data["total_taken"]) / games_played) if games_played > 0 else 0,
+            "kill_share": data["avg_kill_share"] or 0,
+            "damage_share": data["avg_damage_share"] or 0,
+            "damage_healed_pct": round((data["total_healing"] / total_enemy_damage) * 100, 2) if total_enemy_damage > 0 else 0,
+        }
+
+        total_healing = data["total_healing"]
+        support_time = total_time_in_minutes
+        support_games = games_played
+
+        if not champions:
+            support_champs = [champ for champ, role in CHAMPION_ROLES.items() if role == "Support"]
+            placeholders = ', '.join('?' for _ in support_champs)
+            healing_conditions = [f"ps.player_id = ?", f"ps.champ IN ({placeholders})"]
+            healing_params = [player_id] + support_champs
+            db._apply_match_filters(healing_conditions, healing_params, filters, player_alias="ps")
+            healing_where_clause = " AND ".join(healing_conditions)
+            cursor.execute(f"""
+                WITH TeamTotals AS (
+                    SELECT match_id, team, SUM(damage) AS team_damage
+                    FROM player_stats
+                    GROUP BY match_id, team
+                )
+                SELECT SUM(ps.healing), SUM(m.time), COUNT(ps.match_id), SUM(COALESCE(ott.team_damage, 0))
+                FROM player_stats ps
+                JOIN matches m ON ps.match_id = m.match_id
+                LEFT JOIN TeamTotals ott ON ps.match_id = ott.match_id AND ps.team != ott.team
+                WHERE {healing_where_clause}
+            """, healing_params)
+            healing_row = cursor.fetchone()
+            total_healing = healing_row[0] or 0
+            support_time = healing_row[1] or 0
+            support_games = healing_row[2] or 0
+            support_enemy_damage = healing_row[3] or 0
+            stats_dict["damage_healed_pct"] = round((total_healing / support_enemy_damage) * 100, 2) if support_enemy_damage > 0 else 0
+            
+        stats_dict["healing_pm"] = round(total_healing / max(1, support_time), 2)
+        stats_dict["avg_healing"] = round(total_healing / max(1, support_games))
+        stats_dict["damage_healing_pm"] = round(stats_dict["damage_dealt_pm"] + stats_dict["healing_pm"], 2)
+
+        return stats_dict
+    finally:
+        conn.close()
+
+
+def filter_cases(now):
+    support = get_champions_for_role("Support")
+    some_map = sorted(db.MAP_POOL_DISPLAY_NAMES)[0]
+    champion = sorted(CHAMPION_ROLES)[0]
+    return [
+        ("all games", None, None),
+        ("last 90 days", None, {"registered_after": now - 90 * 86400}),
+        ("wins", None, {"result": "wins"}),
+        ("losses", None, {"result": "losses"}),
+        (f"map {some_map}", None, {"map": some_map}),
+        (f"vs {champion}", None, {"vs_champions": [champion]}),
+        ("support role", support, None),
+        (f"{champion} only", [champion], None),
+    ]
+
+
+def timed(func, *args):
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check that the single-pass get_player_stats matches the old two-query version, and compare timings."
+    )
+    parser.add_argument("--db", help="Existing database to check instead of a generated one.")
+    parser.add_argument("--matches", type=int, default=3000)
+    parser.add_argument("--players", type=int, default=150)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--limit-players", type=int, default=40, help="Players to check per filter case.")
+    args = parser.parse_args()
+
+    if args.db:
+        # Work on a migrated copy so the check never writes to a live database.
+        path = os.path.join(tempfile.gettempdir(), "check_player_stats.db")
+        shutil.copyfile(args.db, path)
+        use_database(path)
+        db.create_database()
+    else:
+        path = generate_synthetic_db(DEFAULT_SYNTHETIC_DB_PATH, args.matches, args.players, args.seed)
+        use_database(path)
+    conn = sqlite3.connect(path)
+    player_ids = [row[0] for row in conn.execute("SELECT player_id FROM players ORDER BY player_id LIMIT ?;", (args.limit_players,))]
+    conn.close()
+
+    mismatches = 0
+    legacy_times = []
+    current_times = []
+    for label, champions, filters in filter_cases(int(time.time())):
+        case_legacy = []
+        case_current = []
+        for player_id in player_ids:
+            expected, legacy_seconds = timed(legacy_get_player_stats, player_id, champions, filters)
+            actual, current_seconds = timed(db.get_player_stats, player_id, champions, filters)
+            case_legacy.append(legacy_seconds)
+            case_current.append(current_seconds)
+            if expected != actual:
+                mismatches += 1
+                differing = sorted(
+                    key for key in set(expected or {}) | set(actual or {})
+                    if (expected or {}).get(key) != (actual or {}).get(key)
+                )
+                print(f"MISMATCH {label} player {player_id}: {', '.join(differing) or 'None vs result'}")
+        legacy_times.extend(case_legacy)
+        current_times.extend(case_current)
+        print(
+            f"{label:<24} two-query {statistics.median(case_legacy) * 1000:7.2f}ms  "
+            f"single-pass {statistics.median(case_current) * 1000:7.2f}ms (median of {len(player_ids)})"
+        )
+
+    legacy_total = sum(legacy_times)
+    current_total = sum(current_times)
+    print(
+        f"Total: two-query {legacy_total:.3f}s, single-pass {current_total:.3f}s "
+        f"({(1 - current_total / legacy_total) * 100 if legacy_total else 0:.0f}% faster), {mismatches} mismatches"
+    )
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
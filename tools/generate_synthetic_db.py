@@ -0,0 +1,224 @@
+import argparse
+import itertools
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+import db
+from core.constants import CHAMPION_ROLES
+from utils.match_filters import SEASON_FILTERS
+
+
+DEFAULT_SYNTHETIC_DB_PATH = os.path.join(tempfile.gettempdir(), "synthetic_match_data.db")
+TALENTS = ["Talent A", "Talent B", "Talent C", "Talent D"]
+REGIONS = ["EU", "EU", "EU", "NA"]
+# Roughly the shape of match_data.db: a few players hold alts, some never link
+# a Discord account, and the odd scoreboard is missing players.
+ALT_RATIO = 0.06
+UNLINKED_RATIO = 0.1
+INCOMPLETE_RATIO = 0.03
+# Days of history before the first recorded season boundary, so the earliest
+# season filter has matches too.
+PRE_SEASON_DAYS = 120
+INSERT_BATCH_MATCHES = 5000
+
+
+def use_database(path):
+    """Point every db.py query at ``path`` instead of match_data.db."""
+    db.DATABASE_PATH = path
+
+
+def season_history_days(now):
+    """Days from a little before the first season boundary up to ``now``."""
+    boundaries = [
+        int(datetime.strptime(season[key], "%Y-%m-%d").timestamp())
+        for season in SEASON_FILTERS.values()
+        for key in ("after", "before")
+        if season.get(key)
+    ]
+    return max(1, (now - min(boundaries)) // 86400 + PRE_SEASON_DAYS)
+
+
+def database_shape(path):
+    """Return ``(matches, players)`` counted in an existing database."""
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        matches = conn.execute("SELECT COUNT(*) FROM matches;").fetchone()[0]
+        players = conn.execute("SELECT COUNT(*) FROM players;").fetchone()[0]
+    finally:
+        conn.close()
+    return matches, players
+
+
+def _skewed_weights(count, rng, exponent):
+    """Zipf-like weights in shuffled order: a few players and champions dominate, like the real queue."""
+    weights = [1 / (rank ** exponent) for rank in range(1, count + 1)]
+    rng.shuffle(weights)
+    return list(itertools.accumulate(weights))
+
+
+def _pick_distinct(rng, population, cum_weights, count):
+    picked = []
+    seen = set()
+    while len(picked) < count:
+        choice = rng.choices(population, cum_weights=cum_weights)[0]
+        if choice not in seen:
+            seen.add(choice)
+            picked.append(choice)
+    return picked
+
+
+def _player_rows(rng, players):
+    rows = []
+    for player_id in range(1, players + 1):
+        alts = None
+        if rng.random() < ALT_RATIO:
+            alts = json.dumps([f"player{player_id}_alt{index}" for index in range(1, rng.randint(1, 3) + 1)])
+        discord_id = None if rng.random() < UNLINKED_RATIO else str(10**17 + player_id)
+        rows.append((player_id, f"player{player_id}", discord_id, alts))
+    return rows
+
+
+def _stat_row(rng, match_id, player_id, champ, team):
+    support = CHAMPION_ROLES[champ] == "Support"
+    return (
+        match_id,
+        player_id,
+        champ,
+        rng.choice(TALENTS),
+        rng.randint(2000, 9000),
+        rng.randint(0, 30),
+        rng.randint(0, 15),
+        rng.randint(0, 30),
+        rng.randint(20000, 160000),
+        rng.randint(20000, 150000),
+        rng.randint(0, 200),
+        rng.randint(0, 60000),
+        rng.randint(80000, 250000) if support else rng.randint(0, 5000),
+        rng.randint(0, 30000),
+        team,
+    )
+
+
+def _insert_batch(cursor, match_rows, stat_rows):
+    cursor.executemany(
+        """
+        INSERT INTO matches (match_id, queue_num, time, region, map, team1_score, team2_score, registered_at, player_count, is_complete)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?);
+        """,
+        match_rows,
+    )
+    cursor.executemany(
+        """
+        INSERT INTO player_stats (match_id, player_id, champ, talent, credits, kills, deaths, assists, damage, taken, objective_time, shielding, healing, self_healing, team)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?);
+        """,
+        stat_rows,
+    )
+
+
+def generate_synthetic_db(path=DEFAULT_SYNTHETIC_DB_PATH, matches=2000, players=200, seed=1, days=None):
+    """Build a match database with realistic shape.
+
+    Ten players per match on two teams with scores to 4, skewed player and
+    champion popularity, alts, unlinked players, a few incomplete scoreboards
+    and activity that grows towards the present. ``days`` of history end now;
+    by default they span every season in ``SEASON_FILTERS``.
+    """
+    if os.path.exists(path):
+        os.remove(path)
+    previous_path = db.DATABASE_PATH
+    use_database(path)
+    try:
+        db.create_database()
+    finally:
+        use_database(previous_path)
+
+    rng = random.Random(seed)
+    champions = sorted(CHAMPION_ROLES)
+    maps = sorted(db.MAP_POOL_DISPLAY_NAMES)
+    now = int(time.time())
+    days = days or season_history_days(now)
+    player_ids = list(range(1, players + 1))
+    player_weights = _skewed_weights(players, rng, 0.8)
+    champion_weights = _skewed_weights(len(champions), rng, 0.6)
+
+    conn = sqlite3.connect(path)
+    cursor = conn.cursor()
+    cursor.executemany(
+        "INSERT INTO players (player_id, player_ign, discord_id, alt_igns) VALUES (?, ?, ?, ?);",
+        _player_rows(rng, players),
+    )
+
+    match_rows = []
+    stat_rows = []
+    for match_id in range(1, matches + 1):
+        winner = rng.choice((1, 2))
+        loser_score = rng.randint(0, 3)
+        team1_score, team2_score = (4, loser_score) if winner == 1 else (loser_score, 4)
+        # Linear growth in activity: more matches in recent seasons.
+        registered_at = now - int(days * 86400 * (1 - rng.random() ** 0.5))
+        lineup = _pick_distinct(rng, player_ids, player_weights, min(10, players))
+        if rng.random() < INCOMPLETE_RATIO:
+            lineup = lineup[: rng.randint(6, 9)]
+        for slot, player_id in enumerate(lineup):
+            champ = rng.choices(champions, cum_weights=champion_weights)[0]
+            stat_rows.append(_stat_row(rng, match_id, player_id, champ, 1 if slot < 5 else 2))
+        match_rows.append(
+            (
+                match_id,
+                match_id,
+                rng.randint(8, 25),
+                rng.choice(REGIONS),
+                rng.choice(maps),
+                team1_score,
+                team2_score,
+                registered_at,
+                len(lineup),
+                int(len(lineup) == 10),
+            )
+        )
+        if len(match_rows) >= INSERT_BATCH_MATCHES:
+            _insert_batch(cursor, match_rows, stat_rows)
+            match_rows, stat_rows = [], []
+
+    _insert_batch(cursor, match_rows, stat_rows)
+    # Statistics as create_database leaves them on a live database.
+    cursor.execute("ANALYZE;")
+    conn.commit()
+    conn.close()
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic match database for benchmarks and regression checks.")
+    parser.add_argument("--output", default=DEFAULT_SYNTHETIC_DB_PATH, help="Database path to (re)create.")
+    parser.add_argument("--matches", type=int, default=2000)
+    parser.add_argument("--players", type=int, default=200)
+    parser.add_argument("--like", help="Take --matches and --players from this database (e.g. match_data.db).")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply the match and player counts, e.g. 10 or 100.")
+    parser.add_argument("--days", type=int, help="Days of history; defaults to covering every season.")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    matches, players = database_shape(args.like) if args.like else (args.matches, args.players)
+    matches = max(1, int(matches * args.scale))
+    players = max(10, int(players * args.scale))
+
+    started = time.perf_counter()
+    path = generate_synthetic_db(args.output, matches, players, args.seed, args.days)
+    print(f"Wrote {matches} matches for {players} players to {path} in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+import argparse
+import importlib.util
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# What run.py imports before the bot starts, then each cog it loads.
+BOT_MODULES = [
+    "utils.boot",
+    "discord",
+    "dotenv",
+    "discord.ext.commands",
+    "db",
+    "utils.command_sync",
+    "utils.metrics",
+    "utils.query_trace",
+    "cogs.admin",
+    "cogs.general",
+    "cogs.stats",
+    "cogs.listeners",
+]
+FIRST_PARTY_PACKAGES = {"cogs", "core", "utils", "db", "tools"}
+IMPORT_TIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def _measure_once(modules):
+    """Import ``modules`` in a fresh interpreter; return (wall seconds, {module: (self_us, cumulative_us, depth)})."""
+    code = (
+        "import time\n"
+        "started = time.perf_counter()\n"
+        + "".join(f"import {module}\n" for module in modules)
+        + "print(time.perf_counter() - started)\n"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing {modules} failed:\n{completed.stderr[-2000:]}")
+
+    timings = {}
+    for line in completed.stderr.splitlines():
+        found = IMPORT_TIME_RE.match(line)
+        if found:
+            self_us, cumulative_us, indent, name = found.groups()
+            timings[name] = (int(self_us), int(cumulative_us), len(indent) // 2)
+    return float(completed.stdout.strip().splitlines()[-1]), timings
+
+
+def measure(modules, runs):
+    walls = []
+    samples = {}
+    for _ in range(runs):
+        wall, timings = _measure_once(modules)
+        walls.append(wall)
+        for name, (self_us, cumulative_us, depth) in timings.items():
+            samples.setdefault(name, {"self": [], "cumulative": [], "depth": depth})
+            samples[name]["self"].append(self_us)
+            samples[name]["cumulative"].append(cumulative_us)
+
+    report_modules = {
+        name: {
+            "self_ms": statistics.median(sample["self"]) / 1000,
+            "cumulative_ms": statistics.median(sample["cumulative"]) / 1000,
+            "depth": sample["depth"],
+        }
+        for name, sample in samples.items()
+    }
+    packages = {}
+    for name, entry in report_modules.items():
+        package = name.split(".")[0]
+        packages[package] = packages.get(package, 0.0) + entry["self_ms"]
+    return {
+        "modules_requested": modules,
+        "runs": runs,
+        "wall_ms_median": statistics.median(walls) * 1000,
+        "wall_ms_min": min(walls) * 1000,
+        "packages_self_ms": dict(sorted(packages.items(), key=lambda item: item[1], reverse=True)),
+        "stale_bytecode": stale_bytecode(report_modules),
+        "modules": report_modules,
+    }
+
+
+def _is_first_party(name):
+    return name.split(".")[0] in FIRST_PARTY_PACKAGES
+
+
+def stale_bytecode(module_names):
+    """First-party modules whose .pyc is missing or older than the source, so they compile on import."""
+    stale = []
+    for name in module_names:
+        if not _is_first_party(name):
+            continue
+        relative = name.replace(".", os.sep)
+        source = os.path.join(ROOT_DIR, relative, "__init__.py")
+        if not os.path.exists(source):
+            source = os.path.join(ROOT_DIR, f"{relative}.py")
+        if not os.path.exists(source):
+            continue
+        cached = importlib.util.cache_from_source(source)
+        if not os.path.exists(cached) or os.path.getmtime(cached) < os.path.getmtime(source):
+            stale.append(name)
+    return stale
+
+
+def print_report(report, top):
+    print(
+        f"Importing {len(report['modules_requested'])} module(s): "
+        f"median {report['wall_ms_median']:.0f} ms, best {report['wall_ms_min']:.0f} ms over {report['runs']} run(s)"
+    )
+
+    print(f"\nTop {top} packages by total self time:")
+    for package, self_ms in list(report["packages_self_ms"].items())[:top]:
+        print(f"  {self_ms:8.1f} ms  {package}")
+
+    modules = report["modules"]
+    print(f"\nTop {top} modules by self time:")
+    for name, entry in sorted(modules.items(), key=lambda item: item[1]["self_ms"], reverse=True)[:top]:
+        print(f"  {entry['self_ms']:8.1f} ms  {name}")
+
+    print("\nFirst-party modules (self / cumulative):")
+    for name, entry in sorted(modules.items(), key=lambda item: item[1]["cumulative_ms"], reverse=True):
+        if _is_first_party(name):
+            print(f"  {entry['self_ms']:8.1f} ms {entry['cumulative_ms']:8.1f} ms  {name}")
+
+    if report["stale_bytecode"]:
+        print(
+            f"\nCompiled from source on every import (no fresh .pyc): {', '.join(report['stale_bytecode'])}. "
+            "Run `python -m compileall -q .` first, as start_bossman.sh does."
+        )
+
+
+def print_comparison(report, baseline):
+    delta = report["wall_ms_median"] - baseline["wall_ms_median"]
+    print(
+        f"\nMedian import time {baseline['wall_ms_median']:.0f} ms -> {report['wall_ms_median']:.0f} ms "
+        f"({delta:+.0f} ms)"
+    )
+    names = {
+        name
+        for name in set(report["modules"]) | set(baseline["modules"])
+        if _is_first_party(name)
+    }
+    for name in sorted(names):
+        before = baseline["modules"].get(name, {}).get("cumulative_ms")
+        after = report["modules"].get(name, {}).get("cumulative_ms")
+        if before is None:
+            print(f"  new      {after:8.1f} ms  {name}")
+        elif after is None:
+            print(f"  gone     {before:8.1f} ms  {name}")
+        elif abs(after - before) >= 0.5:
+            print(f"  {after - before:+8.1f} ms  {name} ({before:.1f} -> {after:.1f})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure per-module import time with python -X importtime.")
+    parser.add_argument(
+        "modules",
+        nargs="*",
+        help="Modules to import, in order. Defaults to what the bot imports at startup.",
+    )
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to measure; medians are reported.")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--json", dest="json_path", help="Write the report to this path.")
+    parser.add_argument("--compare", help="Print the difference against an earlier --json report.")
+    args = parser.parse_args()
+
+    report = measure(args.modules or BOT_MODULES, max(1, args.runs))
+    print_report(report, args.top)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as baseline_file:
+            print_comparison(report, json.load(baseline_file))
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as report_file:
+            json.dump(report, report_file, indent=2)
+        print(f"\nWrote {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
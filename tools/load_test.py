@@ -0,0 +1,699 @@
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import random
+import shlex
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+import discord
+from discord.ext import commands
+
+import db
+from core.constants import CHAMPION_ROLES
+from tools.generate_synthetic_db import generate_synthetic_db, use_database
+from utils.admission import admission
+from utils.checks import is_exec
+from utils.loop_monitor import loop_monitor
+from utils.member_index import member_index
+from utils.metrics import percentile
+from utils.response_cache import response_cache
+from utils.snapshot import analytics_snapshot
+
+
+# Same list as run.py, which cannot be imported without starting the bot.
+COGS = ["cogs.admin", "cogs.general", "cogs.stats", "cogs.listeners"]
+GUILD_ID = 1
+DEFAULT_LOAD_TEST_DB_PATH = os.path.join(tempfile.gettempdir(), "load_test_match_data.db")
+# Finer than the bot's default so short runs still get enough lag samples.
+LOOP_LAG_INTERVAL_SECONDS = 0.05
+SCOREBOARD = "scoreboard"
+# (weight, command). Placeholders are filled per request: {player} is another
+# linked member, {role} a role and {champion} a champion. "scoreboard" posts a
+# new PaladinsAssistant scoreboard to #match-results.
+DEFAULT_MIX = [
+    (8, "!stats"),
+    (6, "!stats {player}"),
+    (3, "!stats me {role} season 4"),
+    (5, "!lb wr"),
+    (3, "!lb kda {role} last 30d"),
+    (3, "!clb wr"),
+    (4, "!mates"),
+    (2, "!mates {player} last 30d"),
+    (2, "!enemies"),
+    (3, "!top"),
+    (3, "!history"),
+    (2, "!pickrate"),
+    (2, "!cstats {champion}"),
+    (2, "!compare {player}"),
+    (2, "/stats role_or_champion={role}"),
+    (2, "/leaderboard stat=kda"),
+    (2, SCOREBOARD),
+]
+
+
+class StubRole:
+    def __init__(self, name):
+        self.name = name
+        self.id = hash(name) & 0xFFFFFFFF
+
+
+class StubAvatar:
+    url = "https://cdn.discordapp.com/embed/avatars/0.png"
+
+
+class StubMember:
+    """The parts of :class:`discord.Member` the cogs read."""
+
+    def __init__(self, member_id, name, guild, roles=(), bot=False, discriminator="0"):
+        self.id = member_id
+        self.name = name
+        self.display_name = name
+        self.global_name = name
+        self.nick = None
+        self.guild = guild
+        self.roles = list(roles)
+        self.bot = bot
+        self.discriminator = discriminator
+        self.mention = f"<@{member_id}>"
+        self.display_avatar = StubAvatar()
+        self.avatar = self.display_avatar
+        self.color = self.colour = discord.Colour.default()
+        self.created_at = self.joined_at = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        self.mutual_guilds = [guild] if guild else []
+
+    def __eq__(self, other):
+        return getattr(other, "id", None) == self.id
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __str__(self):
+        return self.name
+
+
+class StubTyping:
+    def __await__(self):
+        return asyncio.sleep(0).__await__()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class StubMessage:
+    _next_id = 1
+
+    def __init__(self, content, author, channel, embeds=None):
+        StubMessage._next_id += 1
+        self.id = StubMessage._next_id
+        self.content = content
+        self.author = author
+        self.channel = channel
+        self.guild = channel.guild
+        self.embeds = embeds or []
+        self.attachments = []
+        self.mentions = []
+        self.role_mentions = []
+        self.reference = None
+        self._state = None
+        self.created_at = datetime.now(timezone.utc)
+
+    async def reply(self, content=None, **kwargs):
+        return await self.channel.send(content, **kwargs)
+
+    async def edit(self, **kwargs):
+        return self
+
+    async def delete(self, **kwargs):
+        return None
+
+    async def add_reaction(self, emoji):
+        return None
+
+
+class StubChannel:
+    """A text channel that records what would have been sent instead of calling Discord."""
+
+    def __init__(self, channel_id, name, guild):
+        self.id = channel_id
+        self.name = name
+        self.guild = guild
+        self.mention = f"<#{channel_id}>"
+        self.sent = 0
+        self.last_content = None
+
+    async def send(self, content=None, **kwargs):
+        # Serializing is part of what a real send costs.
+        for embed in [kwargs.get("embed"), *(kwargs.get("embeds") or [])]:
+            if embed is not None:
+                embed.to_dict()
+        self.sent += 1
+        self.last_content = content
+        return StubMessage(content or "", self.guild.me, self)
+
+    def typing(self):
+        return StubTyping()
+
+    async def history(self, **kwargs):
+        return
+        yield
+
+
+class StubGuild:
+    def __init__(self, guild_id, name):
+        self.id = guild_id
+        self.name = name
+        self.icon = None
+        self.chunked = True
+        self.members = []
+        self._members_by_id = {}
+        self.me = None
+        self.roles = []
+        self.text_channels = []
+
+    def add_member(self, member):
+        self.members.append(member)
+        self._members_by_id[member.id] = member
+
+    def get_member(self, member_id):
+        return self._members_by_id.get(int(member_id)) if member_id is not None else None
+
+    def get_member_named(self, name):
+        return next((member for member in self.members if name in (member.name, member.display_name)), None)
+
+    def get_channel(self, channel_id):
+        return next((channel for channel in self.text_channels if channel.id == channel_id), None)
+
+
+class StubResponse:
+    def __init__(self, interaction):
+        self._interaction = interaction
+        self._done = False
+
+    def is_done(self):
+        return self._done
+
+    async def defer(self, **kwargs):
+        self._done = True
+
+    async def send_message(self, content=None, **kwargs):
+        self._done = True
+        await self._interaction.channel.send(content, **kwargs)
+
+
+class StubFollowup:
+    def __init__(self, interaction):
+        self._interaction = interaction
+
+    async def send(self, content=None, **kwargs):
+        return await self._interaction.channel.send(content, **kwargs)
+
+
+class StubInteraction:
+    def __init__(self, bot, command, user, channel):
+        self.client = bot
+        self.command = command
+        self.user = user
+        self.guild = channel.guild
+        self.channel = channel
+        self.message = None
+        self.extras = {}
+        self.response = StubResponse(self)
+        self.followup = StubFollowup(self)
+
+
+class LoadTestContext(commands.Context):
+    """Context whose replies go to the stub channel instead of the Discord API."""
+
+    async def send(self, content=None, **kwargs):
+        return await self.channel.send(content, **kwargs)
+
+    async def reply(self, content=None, **kwargs):
+        return await self.channel.send(content, **kwargs)
+
+    def typing(self, **kwargs):
+        return StubTyping()
+
+
+class LoadTestBot(commands.Bot):
+    """A real command bot that never logs in; user lookups are answered from the stub guild."""
+
+    def __init__(self, guild):
+        intents = discord.Intents.default()
+        intents.message_content = True
+        intents.members = True
+        super().__init__(command_prefix=["!"], intents=intents, help_command=None)
+        self.stub_guild = guild
+        self.stub_user = StubMember(999, "BOSSMAN", guild, bot=True)
+        guild.me = self.stub_user
+        self.command_errors = {}
+        self.before_invoke(self._label_command_task)
+
+    @property
+    def user(self):
+        return self.stub_user
+
+    @property
+    def guilds(self):
+        return [self.stub_guild]
+
+    def get_guild(self, guild_id):
+        return self.stub_guild if guild_id == self.stub_guild.id else None
+
+    def get_user(self, user_id):
+        return self.stub_guild.get_member(user_id)
+
+    async def fetch_user(self, user_id):
+        member = self.stub_guild.get_member(user_id)
+        if member is None:
+            raise discord.NotFound(_NotFoundResponse(), "Unknown User")
+        return member
+
+    async def _label_command_task(self, ctx):
+        # Same attribution run.py sets up for the live bot.
+        loop_monitor.label_current_task(f"command:{ctx.command.qualified_name}")
+
+    async def on_command_error(self, ctx, error):
+        # Listeners.on_command_error still answers the user; this just keeps
+        # the failure for the report.
+        self.command_errors[id(ctx.message)] = error
+
+
+class _NotFoundResponse:
+    status = 404
+    reason = "Not Found"
+
+
+def build_guild(exec_role_name="Executive"):
+    """A guild whose members are the linked players in the database, named by their IGN."""
+    guild = StubGuild(GUILD_ID, "Load test")
+    conn = db._connect()
+    try:
+        rows = conn.execute(
+            "SELECT discord_id, player_ign FROM players WHERE discord_id IS NOT NULL ORDER BY player_id;"
+        ).fetchall()
+    finally:
+        conn.close()
+    exec_role = StubRole(exec_role_name)
+    for index, (discord_id, ign) in enumerate(rows):
+        guild.add_member(StubMember(int(discord_id), ign, guild, roles=[exec_role] if index == 0 else []))
+    guild.text_channels = [
+        StubChannel(10, "general", guild),
+        StubChannel(11, "match-results", guild),
+    ]
+    return guild
+
+
+def load_mix(path):
+    """Read ``[weight] command`` lines; blank lines and ``#`` comments are skipped."""
+    mix = []
+    with open(path, "r", encoding="utf-8") as mix_file:
+        for line in mix_file:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            weight, _, rest = line.partition(" ")
+            if weight.isdigit() and rest.strip():
+                mix.append((int(weight), rest.strip()))
+            else:
+                mix.append((1, line))
+    return mix
+
+
+def _template_metric_key(bot, template):
+    if template == SCOREBOARD:
+        return None
+    if template.startswith("/"):
+        return f"slash:{template[1:].split()[0]}"
+    command = bot.all_commands.get(template[1:].split()[0])
+    return f"command:{command.qualified_name}" if command else None
+
+
+def weight_mix_from_metrics(bot, mix, path):
+    """Reweight ``mix`` by the command counts in the last line of a METRICS_DUMP_PATH file."""
+    with open(path, "r", encoding="utf-8") as dump_file:
+        lines = [line for line in dump_file if line.strip()]
+    recorded = json.loads(lines[-1])["metrics"]
+    counts = {key: entry["count"] for key, entry in recorded.items() if key.split(":")[0] in ("command", "slash")}
+
+    templates_by_key = {}
+    for weight, template in mix:
+        key = _template_metric_key(bot, template)
+        templates_by_key.setdefault(key, []).append((weight, template))
+
+    weighted = []
+    for key, templates in templates_by_key.items():
+        if key is None:
+            weighted.extend(templates)
+            continue
+        total = sum(weight for weight, _ in templates)
+        for weight, template in templates:
+            share = counts.get(key, 0) * weight / total
+            if share > 0:
+                weighted.append((share, template))
+    missing = sorted(key for key in counts if key not in templates_by_key)
+    return weighted, missing
+
+
+class LoadTest:
+    def __init__(self, bot, guild, mix, seed):
+        self.bot = bot
+        self.guild = guild
+        self.mix = mix
+        self.rng = random.Random(seed)
+        self.members = [member for member in guild.members if not member.bot]
+        self.exec_member = next(member for member in self.members if is_exec(_AuthorOnly(member)))
+        self.channel = guild.text_channels[0]
+        self.results_channel = guild.text_channels[1]
+        self.champions = sorted(CHAMPION_ROLES)
+        self.roles = sorted({role.lower() for role in CHAMPION_ROLES.values()})
+        self.maps = sorted(db.MAP_POOL_DISPLAY_NAMES)
+        self.next_match_id = _first_free_match_id()
+        self.samples = {}
+
+    def _fill(self, template, author):
+        other = self.rng.choice([member for member in self.members[:200] if member != author] or self.members)
+        return template.format(
+            player=other.display_name,
+            role=self.rng.choice(self.roles),
+            champion=self.rng.choice(self.champions),
+        )
+
+    def _scoreboard_text(self):
+        self.next_match_id += 1
+        lineup = self.rng.sample(self.members, min(10, len(self.members)))
+        winner = self.rng.choice((1, 2))
+        loser = self.rng.randint(0, 3)
+        scores = (4, loser) if winner == 1 else (loser, 4)
+        lines = [f"{self.next_match_id}, {self.rng.randint(8, 25)}, EU, {self.rng.choice(self.maps)}, {scores[0]}, {scores[1]}"]
+        for member in lineup:
+            lines.append(
+                f"[{member.display_name}, {self.rng.choice(self.champions)}, Talent A, 1, "
+                f"{self.rng.randint(2000, 9000)}, {self.rng.randint(0, 30)}/{self.rng.randint(0, 15)}/{self.rng.randint(0, 30)}, "
+                f"{self.rng.randint(20000, 160000)}, {self.rng.randint(20000, 150000)}, {self.rng.randint(0, 200)}, "
+                f"{self.rng.randint(0, 60000)}, {self.rng.randint(0, 5000)}, {self.rng.randint(0, 30000)}]"
+            )
+        return "\n".join(lines)
+
+    async def _run_scoreboard(self):
+        author = StubMember(1000, "PaladinsAssistant", self.guild, bot=True, discriminator="2894")
+        # A channel per post, so the confirmation read back is this post's own.
+        channel = StubChannel(self.results_channel.id, self.results_channel.name, self.guild)
+        message = StubMessage(f"```\n{self._scoreboard_text()}\n```", author, channel)
+        await self.bot.get_cog("Listeners").scoreboard_ingestion(message)
+        if not (channel.last_content or "").startswith("✅"):
+            return f"scoreboard not recorded: {channel.last_content}"
+        return None
+
+    async def _run_prefix(self, content, author):
+        message = StubMessage(content, author, self.channel)
+        ctx = await self.bot.get_context(message, cls=LoadTestContext)
+        if ctx.command is None:
+            return f"unknown command {ctx.invoked_with}"
+        if is_exec in ctx.command.checks:
+            message.author = self.exec_member
+        await self.bot.invoke(ctx)
+        error = self.bot.command_errors.pop(id(message), None)
+        return f"{type(error).__name__}: {error}" if error else None
+
+    async def _run_slash(self, content, author):
+        name, *options = shlex.split(content[1:])
+        command = self.bot.tree.get_command(name)
+        if command is None:
+            return f"unknown slash command {name}"
+        kwargs = {}
+        parameters = {parameter.name: parameter for parameter in command.parameters}
+        for option in options:
+            key, _, value = option.partition("=")
+            option_type = parameters[key].type
+            if option_type is discord.AppCommandOptionType.integer:
+                kwargs[key] = int(value)
+            elif option_type is discord.AppCommandOptionType.boolean:
+                kwargs[key] = value.lower() in ("1", "true", "yes")
+            elif option_type in (discord.AppCommandOptionType.user, discord.AppCommandOptionType.mentionable):
+                kwargs[key] = self.guild.get_member_named(value)
+            else:
+                kwargs[key] = value
+        interaction = StubInteraction(self.bot, command, author, self.channel)
+        await command.callback(command.binding, interaction, **kwargs)
+        return None
+
+    async def run_one(self, template):
+        author = self.rng.choice(self.members)
+        content = self._fill(template, author)
+        started = time.perf_counter()
+        try:
+            if template == SCOREBOARD:
+                error = await self._run_scoreboard()
+            elif content.startswith("/"):
+                error = await self._run_slash(content, author)
+            else:
+                error = await self._run_prefix(content, author)
+        except Exception as exc:
+            error = f"{type(exc).__name__}: {exc}"
+        elapsed = time.perf_counter() - started
+        sample = self.samples.setdefault(template, {"latencies": [], "errors": {}})
+        sample["latencies"].append(elapsed)
+        if error:
+            sample["errors"][error] = sample["errors"].get(error, 0) + 1
+
+    async def run(self, requests, concurrency):
+        weights = [weight for weight, _ in self.mix]
+        templates = [template for _, template in self.mix]
+        plan = self.rng.choices(templates, weights=weights, k=requests)
+        queue = asyncio.Queue()
+        for template in plan:
+            queue.put_nowait(template)
+
+        async def worker():
+            while not queue.empty():
+                await self.run_one(queue.get_nowait())
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return time.perf_counter() - started
+
+
+def _first_free_match_id():
+    # Scoreboard IDs are 9-12 digits; keep clear of earlier runs on a reused database.
+    conn = db._connect()
+    try:
+        highest = conn.execute("SELECT MAX(match_id) FROM matches;").fetchone()[0] or 0
+    finally:
+        conn.close()
+    return max(900_000_000_000, highest)
+
+
+class _AuthorOnly:
+    def __init__(self, author):
+        self.author = author
+
+
+def _latency_summary(latencies):
+    return {
+        "count": len(latencies),
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": max(latencies, default=0.0) * 1000,
+        "mean_ms": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+    }
+
+
+def _loop_lag_summary():
+    stats = loop_monitor.stats()
+    return {
+        "count": stats["samples"],
+        "p50_ms": stats["lag_p50_ms"],
+        "p95_ms": stats["lag_p95_ms"],
+        "p99_ms": stats["lag_p99_ms"],
+        "max_ms": stats["lag_max_ms"],
+        "blocked": stats["blocked_total"],
+    }
+
+
+def build_report(load_test, elapsed, args, database):
+    all_latencies = [value for sample in load_test.samples.values() for value in sample["latencies"]]
+    errors = sum(sum(sample["errors"].values()) for sample in load_test.samples.values())
+    return {
+        "meta": {
+            "created_at": int(time.time()),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+            "database": database,
+        },
+        "elapsed_s": elapsed,
+        "throughput_rps": len(all_latencies) / elapsed if elapsed else 0.0,
+        "errors": errors,
+        "latency": _latency_summary(all_latencies),
+        "loop_lag": _loop_lag_summary(),
+        "loop_blocks": [
+            {"label": label, "count": count, "blocked_ms": total} for label, (count, total) in loop_monitor.top_offenders(10)
+        ],
+        "commands": {
+            template: dict(_latency_summary(sample["latencies"]), errors=sample["errors"])
+            for template, sample in sorted(load_test.samples.items())
+        },
+        "admission": admission.stats(),
+        "response_cache": response_cache.stats(),
+        "snapshot": analytics_snapshot.stats(),
+    }
+
+
+def print_report(report):
+    latency = report["latency"]
+    lag = report["loop_lag"]
+    print(
+        f"{latency['count']} requests in {report['elapsed_s']:.1f}s at concurrency {report['meta']['concurrency']}: "
+        f"{report['throughput_rps']:.1f} req/s, {report['errors']} error(s)"
+    )
+    print(
+        f"Latency p50 {latency['p50_ms']:.0f} ms, p95 {latency['p95_ms']:.0f} ms, "
+        f"p99 {latency['p99_ms']:.0f} ms, max {latency['max_ms']:.0f} ms"
+    )
+    print(
+        f"Event loop lag p50 {lag['p50_ms']:.1f} ms, p99 {lag['p99_ms']:.1f} ms, max {lag['max_ms']:.1f} ms "
+        f"over {lag['count']} samples; {lag['blocked']} block(s) over {loop_monitor.threshold_ms:.0f} ms"
+    )
+    for block in report["loop_blocks"]:
+        print(f"    {block['count']}x {block['blocked_ms']:.0f} ms in {block['label']}")
+    print(f"\n{'command':<40} {'count':>6} {'p50':>8} {'p95':>8} {'max':>8}  errors")
+    for template, entry in report["commands"].items():
+        errors = sum(entry["errors"].values())
+        print(
+            f"{template:<40} {entry['count']:>6} {entry['p50_ms']:>6.0f}ms {entry['p95_ms']:>6.0f}ms "
+            f"{entry['max_ms']:>6.0f}ms  {errors or ''}"
+        )
+        for error, count in entry["errors"].items():
+            print(f"    {count}x {error[:200]}")
+    queue = report["admission"]
+    cache = report["response_cache"]
+    print(
+        f"\nHeavy command queue: {queue['admitted']} admitted, {queue['queued_total']} queued, "
+        f"rejected {queue['rejected']}, wait p95 {queue['wait_p95_ms']:.0f} ms"
+    )
+    print(f"Response cache: {cache['hits']} hits, {cache['misses']} misses, {cache['invalidations']} invalidations")
+    snapshot = report["snapshot"]
+    if snapshot["ready"]:
+        print(
+            f"Analytics snapshot: {snapshot['refreshes']} refresh(es), last {snapshot['refresh_ms']:.0f} ms; "
+            f"{snapshot['routed']} heavy reads routed to it, {snapshot['fallbacks']} to the live database"
+        )
+
+
+def print_comparison(report, baseline):
+    print("\nAgainst the baseline:")
+    for label, key in (("throughput req/s", "throughput_rps"), ("errors", "errors")):
+        print(f"  {label:<20} {baseline[key]:10.1f} -> {report[key]:10.1f}")
+    for section in ("latency", "loop_lag"):
+        for stat in ("p50_ms", "p95_ms", "p99_ms", "max_ms"):
+            print(f"  {section + ' ' + stat:<20} {baseline[section][stat]:10.1f} -> {report[section][stat]:10.1f}")
+    for template, entry in report["commands"].items():
+        before = baseline["commands"].get(template)
+        if before:
+            print(f"  {template:<40} p95 {before['p95_ms']:8.0f} -> {entry['p95_ms']:8.0f} ms")
+
+
+def prepare_database(args):
+    if args.db:
+        # Scoreboard posts insert matches, so always work on a copy.
+        shutil.copyfile(args.db, args.output)
+    elif not (args.reuse and os.path.exists(args.output)):
+        generate_synthetic_db(args.output, args.matches, args.players, args.seed)
+    use_database(args.output)
+    db.create_database()
+    conn = sqlite3.connect(args.output)
+    try:
+        matches = conn.execute("SELECT COUNT(*) FROM matches;").fetchone()[0]
+        players = conn.execute("SELECT COUNT(*) FROM players;").fetchone()[0]
+    finally:
+        conn.close()
+    return {"path": args.output, "matches": matches, "players": players}
+
+
+async def run_load_test(args):
+    guild = build_guild()
+    bot = LoadTestBot(guild)
+    # Entering the bot sets up its ready event, so startup work the cogs defer
+    # until ready just waits and is cancelled on exit.
+    async with bot:
+        for cog in COGS:
+            await bot.load_extension(cog)
+        member_index.build(bot.guilds)
+        loop_monitor.interval = LOOP_LAG_INTERVAL_SECONDS
+        loop_monitor.set_debug(True)
+        loop_monitor.start()
+
+        mix = load_mix(args.mix) if args.mix else list(DEFAULT_MIX)
+        if args.recorded:
+            mix, missing = weight_mix_from_metrics(bot, mix, args.recorded)
+            if missing:
+                print(f"Recorded commands with no template in the mix: {', '.join(missing)}")
+        load_test = LoadTest(bot, guild, mix, args.seed)
+
+        if args.warmup:
+            with contextlib.redirect_stdout(io.StringIO()):
+                await load_test.run(args.warmup, args.concurrency)
+            load_test.samples.clear()
+        loop_monitor.reset()
+
+        # The cogs print freely (scoreboard parsing especially); keep the
+        # report readable and the terminal out of the measurement.
+        with contextlib.redirect_stdout(io.StringIO()):
+            elapsed = await load_test.run(args.requests, args.concurrency)
+        loop_monitor.stop()
+        return load_test, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Replay a command mix against the cogs with stub Discord objects and report latency and loop lag."
+    )
+    parser.add_argument("--db", help="Database to copy for the run. Defaults to a generated synthetic database.")
+    parser.add_argument("--output", default=DEFAULT_LOAD_TEST_DB_PATH, help="Where the run's database copy lives.")
+    parser.add_argument("--reuse", action="store_true", help="Reuse --output if it already exists.")
+    parser.add_argument("--matches", type=int, default=3500)
+    parser.add_argument("--players", type=int, default=400)
+    parser.add_argument("--mix", help="File of '[weight] command' lines to replay instead of the default mix.")
+    parser.add_argument("--recorded", help="Weight the mix by command counts from a METRICS_DUMP_PATH file.")
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=20, help="Untimed requests first, to warm caches.")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", dest="json_path", help="Write the report to this path.")
+    parser.add_argument("--compare", help="Print the difference against an earlier --json report.")
+    args = parser.parse_args()
+
+    database = prepare_database(args)
+    print(f"Database {database['path']}: {database['matches']} matches, {database['players']} players")
+    load_test, elapsed = asyncio.run(run_load_test(args))
+    report = build_report(load_test, elapsed, args, database)
+    print_report(report)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as baseline_file:
+            print_comparison(report, json.load(baseline_file))
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as report_file:
+            json.dump(report, report_file, indent=2)
+        print(f"\nWrote {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
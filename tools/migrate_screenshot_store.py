@@ -0,0 +1,113 @@
+import argparse
+import os
+import sqlite3
+import sys
+
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from db import create_database, discard_screenshot_files, get_screenshot_store_stats, link_match_screenshot
+from utils.match_screenshots import (
+    SCREENSHOT_BLOB_DIR,
+    SCREENSHOT_PREVIEW_DIR,
+    create_screenshot_preview,
+    resolve_screenshot_path,
+    screenshot_extension,
+    store_screenshot_file,
+)
+
+
+def _legacy_rows():
+    conn = sqlite3.connect("match_data.db")
+    conn.row_factory = sqlite3.Row
+    try:
+        return [
+            dict(row)
+            for row in conn.execute(
+                """
+                SELECT *
+                FROM match_screenshots
+                WHERE content_hash IS NULL OR preview_path IS NULL
+                ORDER BY match_id;
+                """
+            )
+        ]
+    finally:
+        conn.close()
+
+
+def migrate_rows(dry_run=False):
+    migrated = 0
+    missing = 0
+    for row in _legacy_rows():
+        source_path = resolve_screenshot_path(row["file_path"])
+        if not source_path or not source_path.exists():
+            missing += 1
+            print(f"Match {row['match_id']}: {row['file_path']} is missing from disk.")
+            continue
+        if dry_run:
+            migrated += 1
+            continue
+
+        file_path, content_hash = row["file_path"], row["content_hash"]
+        legacy_path = None
+        if not content_hash:
+            legacy_path = str(source_path)
+            file_path, content_hash = store_screenshot_file(legacy_path, screenshot_extension(source_path.name))
+        preview_path = row["preview_path"] or create_screenshot_preview(file_path, content_hash)
+        link_match_screenshot(
+            row["match_id"],
+            file_path,
+            source_url=row["source_url"],
+            message_id=row["message_id"],
+            attachment_id=row["attachment_id"],
+            channel_id=row["channel_id"],
+            created_at=row["created_at"],
+            saved_at=row["saved_at"],
+            content_hash=content_hash,
+            preview_path=preview_path,
+            source_path=legacy_path,
+        )
+        migrated += 1
+    return migrated, missing
+
+
+def collect_orphans(dry_run=False):
+    candidates = []
+    for directory in (SCREENSHOT_BLOB_DIR, SCREENSHOT_PREVIEW_DIR):
+        if os.path.isdir(directory):
+            candidates.extend(f"{directory}/{name}" for name in os.listdir(directory))
+    if dry_run:
+        return len(candidates)
+    return discard_screenshot_files(*candidates)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Move saved screenshots into the content-addressed store, build previews, and remove orphans."
+    )
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would change.")
+    args = parser.parse_args()
+
+    os.chdir(ROOT_DIR)
+    create_database()
+    before = get_screenshot_store_stats()
+    migrated, missing = migrate_rows(args.dry_run)
+    collected = collect_orphans(args.dry_run)
+    after = get_screenshot_store_stats()
+
+    print(f"{'Would migrate' if args.dry_run else 'Migrated'} rows: {migrated} ({missing} missing from disk)")
+    if args.dry_run:
+        print(f"Stored files checked for orphans: {collected}")
+    else:
+        print(f"Orphaned files removed: {collected}")
+    print(
+        f"Rows: {after['rows']}, distinct images: {before['blobs']} -> {after['blobs']}, "
+        f"with preview: {after['with_preview']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
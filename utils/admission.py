@@ -0,0 +1,235 @@
+# utils/admission.py
+
+import asyncio
+import contextvars
+import functools
+import os
+import time
+from collections import OrderedDict, deque
+
+import discord
+
+from utils.metrics import metrics, percentile
+
+
+# Cost units per command class. Commands not listed here are light (a few
+# indexed lookups, e.g. !link or !alts) and are never queued.
+COMMAND_COSTS = {
+    "leaderboard": 3,
+    "champ_lb": 3,
+    "map": 3,
+    "query": 3,
+    "pickrate": 2,
+    "mates": 2,
+    "enemies": 2,
+    "related_champs": 2,
+    "champion_relationship": 2,
+    "pair_summary": 2,
+    "talents": 2,
+    "compare": 2,
+    "champcompare": 2,
+    "champmapwr": 2,
+    "cstats": 2,
+}
+HEAVY_COMMAND_CAPACITY = int(os.getenv("HEAVY_COMMAND_CAPACITY", "4"))
+HEAVY_COMMAND_QUEUE_LIMIT = int(os.getenv("HEAVY_COMMAND_QUEUE_LIMIT", "20"))
+HEAVY_COMMAND_PER_USER = int(os.getenv("HEAVY_COMMAND_PER_USER", "2"))
+
+# Set while a command holds a slot, so heavy handlers that call each other
+# (e.g. !map -> !leaderboard) do not queue behind themselves.
+_admitted = contextvars.ContextVar("admitted", default=False)
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, message):
+        super().__init__(message)
+        self.message = message
+
+
+class AdmissionController:
+    """Weighted slots for heavy commands, with a round-robin queue across users.
+
+    A command is admitted while the cost of running commands fits in
+    ``capacity``. Overflow waits in a per-user queue; each freed slot goes to
+    the next user in rotation, so one user spamming ``!lb`` cannot push
+    everyone else to the back.
+    """
+
+    def __init__(self, capacity=HEAVY_COMMAND_CAPACITY, queue_limit=HEAVY_COMMAND_QUEUE_LIMIT, per_user=HEAVY_COMMAND_PER_USER):
+        self.capacity = capacity
+        self.queue_limit = queue_limit
+        self.per_user = per_user
+        self.active_cost = 0
+        self._waiters = OrderedDict()
+        self._user_load = {}
+        self.admitted = 0
+        self.queued_total = 0
+        self.rejected = {"queue_full": 0, "per_user": 0}
+        self.max_depth = 0
+        self._waits = deque(maxlen=1024)
+
+    @property
+    def depth(self):
+        return sum(len(waiters) for waiters in self._waiters.values())
+
+    def _fits(self, cost):
+        return self.active_cost + cost <= self.capacity
+
+    async def acquire(self, user_id, cost, on_queued=None):
+        """Wait for a slot and return the seconds spent queued, or raise :class:`AdmissionRejected`."""
+        cost = max(1, min(cost, self.capacity))
+        if self._user_load.get(user_id, 0) >= self.per_user:
+            self.rejected["per_user"] += 1
+            raise AdmissionRejected(
+                f"You already have {self.per_user} heavy commands running or queued. Wait for them to finish first."
+            )
+        if not self._waiters and self._fits(cost):
+            self.active_cost += cost
+            self._user_load[user_id] = self._user_load.get(user_id, 0) + 1
+            self._admit(0.0)
+            return 0.0
+        if self.depth >= self.queue_limit:
+            self.rejected["queue_full"] += 1
+            raise AdmissionRejected("The bot is busy with other heavy commands right now. Try again in a minute.")
+
+        started = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(user_id, deque()).append((future, cost))
+        self._user_load[user_id] = self._user_load.get(user_id, 0) + 1
+        self.queued_total += 1
+        self.max_depth = max(self.max_depth, self.depth)
+        try:
+            if on_queued is not None:
+                await on_queued(self.depth)
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just as we were cancelled.
+                self._release_cost(cost)
+            else:
+                self._remove_waiter(user_id, future)
+            self._drop_load(user_id)
+            raise
+        wait = time.monotonic() - started
+        self._admit(wait)
+        return wait
+
+    def _admit(self, wait):
+        self.admitted += 1
+        self._waits.append(wait)
+
+    def _remove_waiter(self, user_id, future):
+        waiters = self._waiters.get(user_id)
+        if not waiters:
+            return
+        self._waiters[user_id] = deque(item for item in waiters if item[0] is not future)
+        if not self._waiters[user_id]:
+            del self._waiters[user_id]
+        self._grant()
+
+    def _drop_load(self, user_id):
+        load = self._user_load.get(user_id, 0) - 1
+        if load > 0:
+            self._user_load[user_id] = load
+        else:
+            self._user_load.pop(user_id, None)
+
+    def release(self, user_id, cost):
+        self._drop_load(user_id)
+        self._release_cost(max(1, min(cost, self.capacity)))
+
+    def _release_cost(self, cost):
+        self.active_cost -= cost
+        self._grant()
+
+    def _grant(self):
+        # Serve users in rotation. The head waiter is never skipped for a
+        # cheaper one behind it, so a costly command cannot starve.
+        while self._waiters:
+            user_id, waiters = next(iter(self._waiters.items()))
+            future, cost = waiters[0]
+            if future.done():
+                waiters.popleft()
+            elif self._fits(cost):
+                waiters.popleft()
+                self.active_cost += cost
+                future.set_result(None)
+            else:
+                return
+            if waiters:
+                self._waiters.move_to_end(user_id)
+            else:
+                del self._waiters[user_id]
+
+    def stats(self):
+        waits = list(self._waits)
+        return {
+            "capacity": self.capacity,
+            "active_cost": self.active_cost,
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+            "admitted": self.admitted,
+            "queued_total": self.queued_total,
+            "rejected": dict(self.rejected),
+            "wait_p50_ms": percentile(waits, 50) * 1000,
+            "wait_p95_ms": percentile(waits, 95) * 1000,
+            "wait_max_ms": max(waits, default=0.0) * 1000,
+        }
+
+
+admission = AdmissionController()
+
+
+def _command_name(ctx, cost_class):
+    interaction = getattr(ctx, "interaction", None)
+    command = getattr(ctx, "command", None) or getattr(interaction, "command", None)
+    return getattr(command, "qualified_name", None) or cost_class
+
+
+async def _notify_queued(ctx, position):
+    interaction = getattr(ctx, "interaction", None)
+    if interaction is not None:
+        # Slash commands must be acknowledged within 3 seconds.
+        if not interaction.response.is_done():
+            await interaction.response.defer(thinking=True)
+        return
+    try:
+        await ctx.typing()
+    except discord.HTTPException:
+        pass
+
+
+def admission_controlled(cost_class):
+    """Gate a ``(self, ctx, ...)`` command handler behind :data:`admission`.
+
+    Apply it under ``@commands.command`` (or to a shared helper) so the prefix
+    command and any slash command that calls the same handler are both gated.
+    """
+    cost = COMMAND_COSTS.get(cost_class, 1)
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(cog, ctx, *args, **kwargs):
+            if _admitted.get():
+                return await func(cog, ctx, *args, **kwargs)
+
+            name = _command_name(ctx, cost_class)
+            user_id = getattr(getattr(ctx, "author", None), "id", None)
+            try:
+                wait = await admission.acquire(user_id, cost, on_queued=lambda position: _notify_queued(ctx, position))
+            except AdmissionRejected as e:
+                metrics.record("queue", name, 0.0, error=True)
+                await ctx.send(e.message)
+                return None
+            metrics.record("queue", name, wait)
+
+            token = _admitted.set(True)
+            try:
+                return await func(cog, ctx, *args, **kwargs)
+            finally:
+                _admitted.reset(token)
+                admission.release(user_id, cost)
+
+        return wrapper
+
+    return decorator
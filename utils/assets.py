@@ -0,0 +1,296 @@
+# utils/assets.py
+
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import discord
+
+from core.constants import CHAMPION_ROLES
+from db import MAP_POOL_DISPLAY_NAMES
+
+
+ASSET_ROOT = "icons"
+ASSET_MANIFEST_PATH = f"{ASSET_ROOT}/manifest.json"
+CHAMPION_ASSET_DIRS = {"icon": "champ_icons", "header": "champ_headers"}
+MAP_ASSET_DIRS = {"image": "maps"}
+# Upper bound on icon bytes kept in memory; champion icons are ~250 KB each.
+ICON_CACHE_MAX_BYTES = int(os.getenv("ICON_CACHE_MAX_BYTES", str(24 * 1024 * 1024)))
+ICON_CACHE_PRELOAD = int(os.getenv("ICON_CACHE_PRELOAD", "20"))
+
+
+def asset_name_candidates(name):
+    """File stems an asset for ``name`` may use, e.g. ``Sha Lin`` -> ``sha_lin``, ``sha-lin``, ``shalin``."""
+    base = str(name or "").lower().replace("'", "").strip()
+    return [base.replace(" ", "_"), base.replace(" ", "-"), base.replace(" ", "")]
+
+
+def _scan_directory(directory):
+    """Map lowercase file stems to paths and sizes for the PNGs in ``directory``."""
+    entries = {}
+    totals = {"files": 0, "bytes": 0}
+    if not os.path.isdir(directory):
+        return entries, totals
+    with os.scandir(directory) as scan:
+        for entry in scan:
+            if not entry.is_file():
+                continue
+            size = entry.stat().st_size
+            totals["files"] += 1
+            totals["bytes"] += size
+            stem, extension = os.path.splitext(entry.name)
+            if extension.lower() == ".png":
+                entries[stem.lower()] = {"path": f"{directory}/{entry.name}", "bytes": size}
+    return entries, totals
+
+
+def _resolve(entries, name):
+    for stem in asset_name_candidates(name):
+        if stem in entries:
+            return entries[stem]
+    return None
+
+
+def asset_fingerprint(root=ASSET_ROOT):
+    """Hash of the champion and map names and the mtimes of ``root``'s subdirectories.
+
+    A directory's mtime changes when a file in it is added, removed or
+    renamed, so a manifest with a different fingerprint no longer matches
+    what is on disk.
+    """
+    directories = {}
+    if os.path.isdir(root):
+        with os.scandir(root) as scan:
+            for entry in scan:
+                if entry.is_dir():
+                    directories[entry.name] = entry.stat().st_mtime_ns
+    payload = json.dumps(
+        [sorted(CHAMPION_ROLES), sorted(MAP_POOL_DISPLAY_NAMES), sorted(directories.items())],
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def build_asset_manifest(root=ASSET_ROOT):
+    """Index champion and map assets by canonical name, plus per-directory totals."""
+    started = time.perf_counter()
+    # Taken before the scan, so a change made while it runs shows up next time.
+    fingerprint = asset_fingerprint(root)
+    scanned = {}
+    directories = {}
+    if os.path.isdir(root):
+        for name in sorted(os.listdir(root)):
+            directory = f"{root}/{name}"
+            if os.path.isdir(directory):
+                scanned[name], directories[name] = _scan_directory(directory)
+
+    manifest = {
+        "built_at": int(time.time()),
+        "fingerprint": fingerprint,
+        "champions": {},
+        "maps": {},
+        "missing": [],
+        "directories": directories,
+    }
+    for section, names, asset_dirs in (
+        ("champions", sorted(CHAMPION_ROLES), CHAMPION_ASSET_DIRS),
+        ("maps", sorted(MAP_POOL_DISPLAY_NAMES), MAP_ASSET_DIRS),
+    ):
+        for name in names:
+            assets = {}
+            for kind, directory in asset_dirs.items():
+                found = _resolve(scanned.get(directory, {}), name)
+                if found:
+                    assets[kind] = found
+                else:
+                    manifest["missing"].append(f"{section[:-1]} {kind}: {name}")
+            manifest[section][name] = assets
+
+    manifest["build_seconds"] = round(time.perf_counter() - started, 4)
+    return manifest
+
+
+def write_asset_manifest(manifest, path=ASSET_MANIFEST_PATH):
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as manifest_file:
+        json.dump(manifest, manifest_file, indent=2, sort_keys=True)
+    os.replace(temp_path, path)
+
+
+class AssetIndex:
+    """Dict lookups for asset paths, loaded once from the prebuilt manifest or a scan."""
+
+    def __init__(self):
+        self.manifest = None
+        self.source = None
+        self._champion_lookup = {}
+
+    def load(self, manifest_path=ASSET_MANIFEST_PATH):
+        manifest = None
+        if os.path.exists(manifest_path):
+            try:
+                with open(manifest_path, "r", encoding="utf-8") as manifest_file:
+                    manifest = json.load(manifest_file)
+                self.source = manifest_path
+            except (OSError, ValueError) as e:
+                print(f"Ignoring unreadable asset manifest {manifest_path}: {e}")
+        if manifest is not None and manifest.get("fingerprint") != asset_fingerprint():
+            print(
+                f"Asset manifest {manifest_path} is out of date (champions, maps or icons changed); "
+                "rescanning. Run tools/build_asset_manifest.py to rebuild it."
+            )
+            manifest = None
+        if manifest is None:
+            manifest = build_asset_manifest()
+            self.source = "scan"
+        self.manifest = manifest
+
+        # Accept any casing/spacing variant callers pass for a champion name.
+        self._champion_lookup = {}
+        for name, assets in manifest["champions"].items():
+            for stem in [name.lower(), *asset_name_candidates(name)]:
+                self._champion_lookup.setdefault(stem, assets)
+
+        if manifest["missing"]:
+            print(f"Missing {len(manifest['missing'])} asset(s): {', '.join(manifest['missing'])}")
+        return manifest
+
+    def _ensure_loaded(self):
+        if self.manifest is None:
+            self.load()
+
+    def champion_asset(self, champion_name, kind="icon"):
+        self._ensure_loaded()
+        assets = self._champion_lookup.get(str(champion_name or "").lower())
+        if assets is None:
+            for stem in asset_name_candidates(champion_name):
+                assets = self._champion_lookup.get(stem)
+                if assets is not None:
+                    break
+        return (assets or {}).get(kind)
+
+    def champion_icon_path(self, champion_name):
+        asset = self.champion_asset(champion_name, "icon")
+        return asset["path"] if asset else None
+
+    def map_image_path(self, map_name):
+        self._ensure_loaded()
+        asset = self.manifest["maps"].get(map_name, {}).get("image")
+        return asset["path"] if asset else None
+
+
+asset_index = AssetIndex()
+
+
+class IconCache:
+    """LRU of icon file bytes, bounded by total size, that builds ``discord.File`` objects.
+
+    ``discord.File`` consumes its stream when sent, so every call wraps the
+    cached bytes in a fresh ``BytesIO`` instead of reopening the file.
+    The deferred preload fills it from a worker thread while commands read
+    it on the loop, so entries and counters change under ``_lock``; files are
+    read outside it.
+    """
+
+    def __init__(self, max_bytes=ICON_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_bytes(self, path):
+        with self._lock:
+            data = self._entries.get(path)
+            if data is not None:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return data
+            self.misses += 1
+
+        with open(path, "rb") as icon_file:
+            data = icon_file.read()
+        self._store(path, data)
+        return data
+
+    def _store(self, path, data):
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            # Both threads may have read the same file; count it once.
+            previous = self._entries.pop(path, None)
+            if previous is not None:
+                self.size -= len(previous)
+            self._entries[path] = data
+            self.size += len(data)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+                self.evictions += 1
+
+    def get_file(self, path, filename):
+        """Return a ``discord.File`` for ``path``, or ``None`` if it cannot be read."""
+        try:
+            data = self.get_bytes(path)
+        except OSError as e:
+            print(f"Could not read icon {path}: {e}")
+            return None
+        return discord.File(io.BytesIO(data), filename=filename)
+
+    def preload(self, paths):
+        loaded = 0
+        for path in paths:
+            needed = asset_size(path)
+            with self._lock:
+                if path in self._entries:
+                    continue
+                if self.size + needed > self.max_bytes:
+                    break
+            try:
+                with open(path, "rb") as icon_file:
+                    self._store(path, icon_file.read())
+                loaded += 1
+            except OSError:
+                continue
+        return loaded
+
+    def stats(self):
+        with self._lock:
+            entries = len(self._entries)
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups * 100 if lookups else 0.0,
+        }
+
+
+def asset_size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+icon_cache = IconCache()
+
+
+def champion_icon_file(champion_name, filename="champ_icon.png"):
+    """Return a cached ``discord.File`` of the champion's icon, or ``None``."""
+    path = asset_index.champion_icon_path(champion_name)
+    return icon_cache.get_file(path, filename) if path else None
+
+
+def preload_champion_icons(champion_names):
+    paths = [path for path in map(asset_index.champion_icon_path, champion_names) if path]
+    return icon_cache.preload(paths)
@@ -0,0 +1,129 @@
+# utils/boot.py
+
+import asyncio
+import contextlib
+import json
+import os
+import time
+
+
+# Fast boot runs only what commands need before the bot answers, and pushes
+# the rest (history backfill, OCR warmup, icon preload, schema checks that
+# already passed, slash command sync) to after the first ready.
+FAST_BOOT = os.getenv("FAST_BOOT", "0") == "1"
+FAST_BOOT_DEFER_SECONDS = int(os.getenv("FAST_BOOT_DEFER_SECONDS", "30"))
+BOOT_REPORT_PATH = os.getenv("BOOT_REPORT_PATH", "boot_report.json")
+
+
+class BootProfiler:
+    """Wall-clock timings for each startup phase, written to a JSON report.
+
+    Also measures the gap between every ready/resume and the first command
+    completed after it, which is the latency users notice after a restart
+    or reconnect.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.started_at = time.time()
+        self._last_mark = self.started
+        self.phases = []
+        self.events = []
+        self._ready_at = None
+        self._ready_kind = None
+
+    def _elapsed(self, at=None):
+        return round(((at if at is not None else time.perf_counter()) - self.started) * 1000, 1)
+
+    def mark(self, name):
+        """Record the time since the previous mark as phase ``name``."""
+        now = time.perf_counter()
+        self.phases.append({"phase": name, "ms": round((now - self._last_mark) * 1000, 1), "at_ms": self._elapsed(now)})
+        self._last_mark = now
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        error = None
+        try:
+            yield
+        except Exception as e:
+            error = str(e)
+            raise
+        finally:
+            finished = time.perf_counter()
+            entry = {"phase": name, "ms": round((finished - started) * 1000, 1), "at_ms": self._elapsed(finished)}
+            if error:
+                entry["error"] = error
+            self.phases.append(entry)
+            self._last_mark = finished
+
+    def ready(self, kind="ready"):
+        """Note a gateway ready or resume; the next command completion is timed against it."""
+        now = time.perf_counter()
+        self._ready_at = now
+        self._ready_kind = kind
+        self.events.append({"event": kind, "at_ms": self._elapsed(now)})
+
+    def command_completed(self, name):
+        if self._ready_at is None:
+            return
+        now = time.perf_counter()
+        self.events.append(
+            {
+                "event": f"first_command_after_{self._ready_kind}",
+                "command": name,
+                "ms_after_ready": round((now - self._ready_at) * 1000, 1),
+                "at_ms": self._elapsed(now),
+            }
+        )
+        self._ready_at = None
+        self.write()
+
+    def report(self):
+        return {
+            "started_at": int(self.started_at),
+            "fast_boot": FAST_BOOT,
+            "phases": list(self.phases),
+            "events": list(self.events[-50:]),
+        }
+
+    def summary(self):
+        return ", ".join(f"{entry['phase']} {entry['ms']:.0f}ms" for entry in self.phases)
+
+    def write(self, path=BOOT_REPORT_PATH):
+        if not path:
+            return
+        temp_path = f"{path}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as report_file:
+                json.dump(self.report(), report_file, indent=2)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"Could not write boot report to {path}: {e}")
+
+
+boot_profiler = BootProfiler()
+
+
+async def run_deferred(bot, name, func, *args):
+    """Run ``func`` once the bot is ready, after the fast-boot delay when fast boot is on.
+
+    ``func`` may be a coroutine function or a blocking function, which runs in
+    a worker thread. Its duration is recorded as boot phase ``name``.
+    """
+    await bot.wait_until_ready()
+    if FAST_BOOT and FAST_BOOT_DEFER_SECONDS > 0:
+        await asyncio.sleep(FAST_BOOT_DEFER_SECONDS)
+    try:
+        with boot_profiler.phase(f"deferred:{name}"):
+            if asyncio.iscoroutinefunction(func):
+                result = await func(*args)
+            else:
+                result = await asyncio.to_thread(func, *args)
+    except Exception as e:
+        print(f"Deferred startup task {name} failed: {e}")
+        return None
+    finally:
+        boot_profiler.write()
+    return result
@@ -0,0 +1,82 @@
+# utils/command_sync.py
+
+import hashlib
+import json
+import os
+import time
+
+
+COMMAND_SYNC_STATE_PATH = os.getenv("COMMAND_SYNC_STATE_PATH", "command_sync.json")
+FORCE_COMMAND_SYNC = os.getenv("FORCE_COMMAND_SYNC", "0") == "1"
+
+
+def command_tree_payload(tree, guild=None):
+    """The payload ``tree.sync`` would upload for ``guild``, in a stable order.
+
+    It carries every name, description, parameter, choice (including the
+    ``Literal`` filters such as ``TimeRange``), permission and context flag.
+    """
+    payload = [command.to_dict(tree) for command in tree.get_commands(guild=guild)]
+    return sorted(payload, key=lambda command: (command.get("type", 1), command["name"]))
+
+
+def payload_fingerprint(payload):
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def command_tree_fingerprint(tree, guild=None):
+    return payload_fingerprint(command_tree_payload(tree, guild))
+
+
+def _state_key(application_id, guild):
+    return f"{application_id}:{guild.id if guild else 'global'}"
+
+
+def load_sync_state(path=COMMAND_SYNC_STATE_PATH):
+    try:
+        with open(path, "r", encoding="utf-8") as state_file:
+            return json.load(state_file)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable command sync state {path}: {e}")
+        return {}
+
+
+def save_sync_state(state, path=COMMAND_SYNC_STATE_PATH):
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as state_file:
+        json.dump(state, state_file, indent=2, sort_keys=True)
+    os.replace(temp_path, path)
+
+
+def last_synced(tree, guild=None, path=COMMAND_SYNC_STATE_PATH):
+    return load_sync_state(path).get(_state_key(tree.client.application_id, guild))
+
+
+async def sync_command_tree(tree, guild=None, force=False, path=COMMAND_SYNC_STATE_PATH):
+    """Sync ``tree`` to Discord only if its fingerprint changed since the last successful sync.
+
+    Returns ``(synced, command_count, fingerprint)``. Sync errors propagate and
+    leave the stored fingerprint untouched, so the next start retries.
+    """
+    payload = command_tree_payload(tree, guild)
+    fingerprint = payload_fingerprint(payload)
+    state = load_sync_state(path)
+    key = _state_key(tree.client.application_id, guild)
+    previous = state.get(key)
+    if not force and previous and previous.get("fingerprint") == fingerprint:
+        return False, len(payload), fingerprint
+
+    synced = await tree.sync(guild=guild)
+    state[key] = {
+        "fingerprint": fingerprint,
+        "commands": len(synced),
+        "synced_at": int(time.time()),
+    }
+    try:
+        save_sync_state(state, path)
+    except OSError as e:
+        print(f"Could not save command sync state to {path}: {e}")
+    return True, len(synced), fingerprint
@@ -1,8 +1,11 @@
 # utils/converters.py
 
+import re
+
 import discord
 from discord.ext import commands
 from db import get_discord_id_for_ign, get_player_by_ign, get_player_id
+from utils.member_index import member_index
 
 
 DEFAULT_AVATAR_URL = "https://cdn.discordapp.com/embed/avatars/0.png"
@@ -51,41 +54,52 @@ def resolve_player_id(target_user):
     return get_player_id(str(discord_id))
 
 
+# Mentions, raw IDs and name#discriminator still go through MemberConverter;
+# plain names are answered from the member index when it has been built.
+_MEMBER_REFERENCE_RE = re.compile(r"^(<@!?\d+>|\d{15,20}|.+#\d{4})$")
+
+
 class PlayerConverter(commands.Converter):
     async def convert(self, ctx, argument):
         if argument.lower() == "me":
             return ctx.author
 
-        try:
-            return await commands.MemberConverter().convert(ctx, argument)
-        except commands.MemberNotFound:
-            if argument.isdigit():
-                try:
-                    return await ctx.bot.fetch_user(int(argument))
-                except discord.NotFound:
-                    pass
-
-            lower_arg = argument.lower()
-            if ctx.guild is not None:
-                for member in ctx.guild.members:
-                    if member.display_name.lower() == lower_arg or member.name.lower() == lower_arg:
-                        return member
-                for member in ctx.guild.members:
-                    if member.display_name.lower().startswith(lower_arg) or member.name.lower().startswith(lower_arg):
-                        return member
-
-            found_id = get_discord_id_for_ign(argument)
-            if found_id:
-                try:
-                    return await ctx.bot.fetch_user(int(found_id))
-                except discord.NotFound:
-                    pass
-
-            # Final fallback: the IGN exists in the DB but isn't linked to any
-            # Discord account (typical after a scoreboard ingest). Return a
-            # proxy so stats commands can still render.
-            row = get_player_by_ign(argument)
-            if row:
-                return UnlinkedPlayer(row["player_id"], row["player_ign"])
-
-            raise commands.BadArgument(f'User or IGN "{argument}" not found.')
+        indexed = ctx.guild is not None and member_index.is_ready(ctx.guild.id)
+        if indexed and not _MEMBER_REFERENCE_RE.match(argument):
+            member = member_index.find(ctx.guild, argument)
+            if member:
+                return member
+        else:
+            try:
+                return await commands.MemberConverter().convert(ctx, argument)
+            except commands.MemberNotFound:
+                if argument.isdigit():
+                    try:
+                        return await ctx.bot.fetch_user(int(argument))
+                    except discord.NotFound:
+                        pass
+
+                lower_arg = argument.lower()
+                if ctx.guild is not None and not indexed:
+                    for member in ctx.guild.members:
+                        if member.display_name.lower() == lower_arg or member.name.lower() == lower_arg:
+                            return member
+                    for member in ctx.guild.members:
+                        if member.display_name.lower().startswith(lower_arg) or member.name.lower().startswith(lower_arg):
+                            return member
+
+        found_id = get_discord_id_for_ign(argument)
+        if found_id:
+            try:
+                return await ctx.bot.fetch_user(int(found_id))
+            except discord.NotFound:
+                pass
+
+        # Final fallback: the IGN exists in the DB but isn't linked to any
+        # Discord account (typical after a scoreboard ingest). Return a
+        # proxy so stats commands can still render.
+        row = get_player_by_ign(argument)
+        if row:
+            return UnlinkedPlayer(row["player_id"], row["player_ign"])
+
+        raise commands.BadArgument(f'User or IGN "{argument}" not found.')
@@ -0,0 +1,188 @@
+# utils/loop_monitor.py
+
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+import weakref
+from collections import deque
+
+from utils.metrics import metrics, percentile
+
+
+LOOP_MONITOR_INTERVAL_SECONDS = float(os.getenv("LOOP_MONITOR_INTERVAL_SECONDS", "0.25"))
+# A beat this late counts as a block; in debug mode the loop thread's stack is
+# captured while it is still stuck.
+LOOP_BLOCK_THRESHOLD_MS = float(os.getenv("LOOP_BLOCK_THRESHOLD_MS", "200"))
+LOOP_MONITOR_DEBUG = os.getenv("LOOP_MONITOR_DEBUG", "0") == "1"
+LOOP_BLOCK_HISTORY = 50
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _project_frame(stack):
+    """The innermost frame from this repository, e.g. ``db.py:812 in get_leaderboard``."""
+    for frame in reversed(stack):
+        if frame.filename.startswith("<"):
+            continue
+        filename = os.path.abspath(frame.filename)
+        if filename.startswith(PROJECT_ROOT + os.sep) and os.sep + "site-packages" + os.sep not in filename:
+            return f"{os.path.relpath(filename, PROJECT_ROOT)}:{frame.lineno} in {frame.name}"
+    return None
+
+
+class LoopMonitor:
+    """Measures event loop scheduling lag and, in debug mode, catches what blocks it.
+
+    A heartbeat task sleeps for ``interval`` and records how late it wakes up.
+    In debug mode a watchdog thread watches the heartbeat; when it is more than
+    ``threshold_ms`` overdue it grabs the loop thread's stack and the command
+    or listener whose task is running, so the block is attributed while it is
+    still happening rather than guessed at afterwards.
+    """
+
+    def __init__(self, interval=LOOP_MONITOR_INTERVAL_SECONDS, threshold_ms=LOOP_BLOCK_THRESHOLD_MS, debug=LOOP_MONITOR_DEBUG):
+        self.interval = interval
+        self.threshold_ms = threshold_ms
+        self.debug = debug
+        self.blocks = deque(maxlen=LOOP_BLOCK_HISTORY)
+        self.blocked_total = 0
+        self.max_lag_ms = 0.0
+        self.started_at = None
+        self._lags = deque(maxlen=1024)
+        self._labels = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self._loop = None
+        self._loop_thread_id = None
+        self._beat_due = None
+        self._capture = None
+        self._heartbeat_task = None
+        self._watchdog = None
+        self._stopped = threading.Event()
+
+    def start(self):
+        """Start the heartbeat on the running loop, and the watchdog if debug mode is on."""
+        if self._heartbeat_task and not self._heartbeat_task.done():
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self.started_at = time.time()
+        self._stopped.clear()
+        self._heartbeat_task = self._loop.create_task(self._heartbeat(), name="loop-monitor")
+        if self.debug:
+            self._start_watchdog()
+
+    def stop(self):
+        self._stopped.set()
+        if self._heartbeat_task and not self._heartbeat_task.done():
+            self._heartbeat_task.cancel()
+        self._heartbeat_task = None
+
+    def set_debug(self, enabled):
+        self.debug = enabled
+        if enabled and self._heartbeat_task:
+            self._start_watchdog()
+
+    def label_current_task(self, label):
+        """Attribute blocks in the current task to ``label``, e.g. ``command:leaderboard``."""
+        task = asyncio.current_task()
+        if task is not None:
+            self._labels[task] = label
+
+    def _start_watchdog(self):
+        if self._watchdog and self._watchdog.is_alive():
+            return
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def _heartbeat(self):
+        while True:
+            due = self._beat_due = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            self._record(max(0.0, time.perf_counter() - due), due)
+
+    def _record(self, lag, due):
+        lag_ms = lag * 1000
+        self._lags.append(lag_ms)
+        self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+        metrics.record("loop", "lag", lag)
+        with self._lock:
+            capture, self._capture = self._capture, None
+        if capture is not None and capture.pop("due") != due:
+            capture = None
+        if lag_ms < self.threshold_ms:
+            return
+        self.blocked_total += 1
+        block = capture or {"at": int(time.time()), "label": None, "task": None, "site": None, "stack": None}
+        # The late beat measures the whole block, not just the part seen by the watchdog.
+        block["blocked_ms"] = lag_ms
+        self.blocks.append(block)
+        print(f"Event loop blocked for {lag_ms:.0f} ms" + (f" by {block['label']}" if block["label"] else ""))
+
+    def _watch(self):
+        poll = max(0.01, self.threshold_ms / 4000)
+        captured_for = None
+        while not self._stopped.wait(poll) and self.debug:
+            due = self._beat_due
+            if due is None or due == captured_for:
+                continue
+            if (time.perf_counter() - due) * 1000 >= self.threshold_ms:
+                captured_for = due
+                capture = self._capture_loop_state()
+                capture["due"] = due
+                with self._lock:
+                    self._capture = capture
+
+    def _capture_loop_state(self):
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = traceback.extract_stack(frame) if frame is not None else []
+        # Read from this thread without touching the loop; the loop is busy
+        # running exactly this task.
+        task = asyncio.tasks._current_tasks.get(self._loop)
+        label = self._labels.get(task) if task is not None else None
+        task_name = task.get_name() if task is not None else None
+        return {
+            "at": int(time.time()),
+            "label": label or task_name or "callback",
+            "task": task_name,
+            "site": _project_frame(stack),
+            "stack": "".join(traceback.format_list(stack[-25:])),
+        }
+
+    def stats(self):
+        lags = list(self._lags)
+        return {
+            "running": bool(self._heartbeat_task and not self._heartbeat_task.done()),
+            "debug": self.debug,
+            "interval_ms": self.interval * 1000,
+            "threshold_ms": self.threshold_ms,
+            "samples": len(lags),
+            "lag_p50_ms": percentile(lags, 50),
+            "lag_p95_ms": percentile(lags, 95),
+            "lag_p99_ms": percentile(lags, 99),
+            "lag_max_ms": self.max_lag_ms,
+            "blocked_total": self.blocked_total,
+        }
+
+    def recent_blocks(self, limit=10):
+        return list(self.blocks)[-limit:][::-1]
+
+    def top_offenders(self, limit=5):
+        """Labels by total blocked time over the recorded blocks."""
+        totals = {}
+        for block in self.blocks:
+            label = block["label"] or "unattributed"
+            count, total = totals.get(label, (0, 0.0))
+            totals[label] = (count + 1, total + block["blocked_ms"])
+        return sorted(totals.items(), key=lambda item: item[1][1], reverse=True)[:limit]
+
+    def reset(self):
+        self.blocks.clear()
+        self._lags.clear()
+        self.blocked_total = 0
+        self.max_lag_ms = 0.0
+        self.started_at = time.time()
+
+
+loop_monitor = LoopMonitor()
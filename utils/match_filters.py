@@ -5,7 +5,7 @@ from datetime import datetime, timedelta
 from discord.ext import commands
 
 from core.constants import resolve_champion_name
-from db import resolve_map_name
+from db import MatchFilters, resolve_map_name
 from utils.converters import PlayerConverter, resolve_player_id
 
 
@@ -27,6 +27,10 @@ SCORE_FILTER_ALIASES = {
     "sweep": "sweep", "sweeps": "sweep",
 }
 
+# Relative periods ("last 7d") start on a bucket boundary, so the same request
+# made a few seconds apart parses to equal filters and shares cached results.
+TIME_BUCKET_SECONDS = 60
+
 TIME_FILTER_KEYWORDS = {
     "time", "last", "since", "after", "from", "between", "before", "until", "season",
 }
@@ -214,7 +218,7 @@ def _apply_season_filter(filters, season):
 
 
 def _set_last_registered_filter(filters, seconds, label):
-    filters["registered_after"] = int(time.time()) - seconds
+    filters["registered_after"] = (int(time.time()) - seconds) // TIME_BUCKET_SECONDS * TIME_BUCKET_SECONDS
     filters.pop("registered_before", None)
     filters["time_label"] = f"Recorded {label}"
 
@@ -363,6 +367,16 @@ def stat_flag(value):
 
 
 async def extract_match_filters(ctx, args):
+    """Split filter tokens out of ``args``.
+
+    Returns ``(remaining_args, MatchFilters, error)``; ``error`` is a message
+    for the user, or ``None``.
+    """
+    remaining, filters, error = await _extract_match_filter_values(ctx, args)
+    return remaining, MatchFilters(filters), error
+
+
+async def _extract_match_filter_values(ctx, args):
     args = list(args)
     filters = {}
     remaining = []
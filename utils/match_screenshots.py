@@ -1,10 +1,22 @@
+import hashlib
 import os
+import time
 from pathlib import Path
+from urllib.parse import parse_qs, urlparse
 
 
 IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg")
 MATCH_SCREENSHOT_DIR = "match_screenshots"
+# Originals are stored once per distinct image, named by their SHA-256, so
+# re-uploads and replacements that repeat an image share a single file.
+SCREENSHOT_BLOB_DIR = f"{MATCH_SCREENSHOT_DIR}/blobs"
+SCREENSHOT_PREVIEW_DIR = f"{MATCH_SCREENSHOT_DIR}/previews"
 MAX_SCREENSHOT_BYTES = 10 * 1024 * 1024
+PREVIEW_MAX_WIDTH = 1280
+PREVIEW_JPEG_QUALITY = 75
+# Treat signed CDN links as stale slightly before Discord expires them so an
+# embed is not rendered from a URL that dies while the message is loading.
+CDN_URL_EXPIRY_MARGIN_SECONDS = 10 * 60
 
 
 def screenshot_extension(filename):
@@ -48,16 +60,81 @@ def validate_image_file(file_path, extension):
     return False
 
 
-def move_screenshot_file(source_path, match_id, attachment_id, extension):
+def hash_screenshot_file(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as image_file:
+        for chunk in iter(lambda: image_file.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def store_screenshot_file(source_path, extension):
+    """Move an image into the content-addressed store.
+
+    Returns ``(file_path, content_hash)``. When an identical image is already
+    stored the existing blob is reused and the source file is left in place:
+    until the link commits, a cleanup of the blob's last reference could still
+    delete it, and ``db.link_match_screenshot(source_path=...)`` restores it
+    from there. The caller removes the source afterwards.
+    """
     extension = str(extension or "").lower()
+    if extension == ".jpeg":
+        extension = ".jpg"
     if extension not in IMAGE_EXTENSIONS or not validate_image_file(source_path, extension):
         raise ValueError("The attachment is not a valid PNG or JPEG image.")
 
-    os.makedirs(MATCH_SCREENSHOT_DIR, exist_ok=True)
-    relative_path = Path(MATCH_SCREENSHOT_DIR) / f"{int(match_id)}_{int(attachment_id)}{extension}"
-    destination_path = resolve_screenshot_path(relative_path.as_posix())
-    os.replace(source_path, destination_path)
-    return relative_path.as_posix()
+    content_hash = hash_screenshot_file(source_path)
+    os.makedirs(SCREENSHOT_BLOB_DIR, exist_ok=True)
+    relative_path = f"{SCREENSHOT_BLOB_DIR}/{content_hash}{extension}"
+    destination_path = resolve_screenshot_path(relative_path)
+    if not destination_path.exists():
+        os.replace(source_path, destination_path)
+    return relative_path, content_hash
+
+
+def create_screenshot_preview(file_path, content_hash):
+    """Write a downscaled JPEG preview and return its relative path.
+
+    Returns ``None`` when OpenCV is unavailable, the image cannot be decoded,
+    or the preview would not be meaningfully smaller than the original.
+    """
+    try:
+        import cv2
+    except ImportError:
+        return None
+
+    source_path = resolve_screenshot_path(file_path)
+    if not source_path or not source_path.exists():
+        return None
+
+    relative_path = f"{SCREENSHOT_PREVIEW_DIR}/{content_hash}.jpg"
+    destination_path = resolve_screenshot_path(relative_path)
+    if destination_path.exists():
+        return relative_path
+
+    image = cv2.imread(str(source_path))
+    if image is None:
+        return None
+    height, width = image.shape[:2]
+    if width > PREVIEW_MAX_WIDTH:
+        scale = PREVIEW_MAX_WIDTH / width
+        image = cv2.resize(image, (PREVIEW_MAX_WIDTH, int(height * scale)), interpolation=cv2.INTER_AREA)
+    ok, encoded = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, PREVIEW_JPEG_QUALITY])
+    if not ok or len(encoded) >= source_path.stat().st_size * 0.8:
+        return None
+
+    os.makedirs(SCREENSHOT_PREVIEW_DIR, exist_ok=True)
+    temp_path = f"{destination_path}.tmp"
+    with open(temp_path, "wb") as preview_file:
+        preview_file.write(encoded.tobytes())
+    os.replace(temp_path, destination_path)
+    return relative_path
+
+
+def save_screenshot(source_path, extension):
+    """Store an image and its preview; returns ``(file_path, content_hash, preview_path)``."""
+    file_path, content_hash = store_screenshot_file(source_path, extension)
+    return file_path, content_hash, create_screenshot_preview(file_path, content_hash)
 
 
 def remove_screenshot_file(file_path):
@@ -65,7 +142,24 @@ def remove_screenshot_file(file_path):
     if not resolved_path:
         return False
     try:
-        resolved_path.unlink(missing_ok=True)
+        resolved_path.unlink()
         return True
     except OSError:
+        # Includes FileNotFoundError: nothing was removed.
+        return False
+
+
+def cdn_url_expires_at(url):
+    """Return the expiry timestamp encoded in a signed Discord CDN URL, if any."""
+    try:
+        expiry = parse_qs(urlparse(str(url or "")).query).get("ex")
+        return int(expiry[0], 16) if expiry else None
+    except ValueError:
+        return None
+
+
+def cdn_url_is_fresh(url, now=None):
+    expires_at = cdn_url_expires_at(url)
+    if expires_at is None:
         return False
+    return expires_at - CDN_URL_EXPIRY_MARGIN_SECONDS > (now or time.time())
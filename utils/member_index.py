@@ -0,0 +1,131 @@
+# utils/member_index.py
+
+import bisect
+import time
+
+
+class _GuildIndex:
+    def __init__(self):
+        self.keys_by_member = {}
+        self.members_by_key = {}
+        self.sorted_keys = []
+
+    def add(self, member_id, keys):
+        self.remove(member_id)
+        self.keys_by_member[member_id] = keys
+        for key in keys:
+            owners = self.members_by_key.get(key)
+            if owners is None:
+                self.members_by_key[key] = [member_id]
+                bisect.insort(self.sorted_keys, key)
+            else:
+                owners.append(member_id)
+
+    def remove(self, member_id):
+        for key in self.keys_by_member.pop(member_id, ()):
+            owners = self.members_by_key.get(key, [])
+            if member_id in owners:
+                owners.remove(member_id)
+            if not owners:
+                self.members_by_key.pop(key, None)
+                position = bisect.bisect_left(self.sorted_keys, key)
+                if position < len(self.sorted_keys) and self.sorted_keys[position] == key:
+                    del self.sorted_keys[position]
+
+    def exact(self, key):
+        owners = self.members_by_key.get(key)
+        return owners[0] if owners else None
+
+    def prefix(self, key):
+        # The first sorted key with this prefix is the shortest/alphabetically
+        # earliest name, which is the most likely intended member.
+        position = bisect.bisect_left(self.sorted_keys, key)
+        if position < len(self.sorted_keys) and self.sorted_keys[position].startswith(key):
+            return self.members_by_key[self.sorted_keys[position]][0]
+        return None
+
+
+class MemberIndex:
+    """Casefolded member names per guild, kept in sync by the listeners cog.
+
+    Replaces linear scans of ``guild.members`` in :class:`PlayerConverter` and
+    the discord_id -> display name lookups used by leaderboards.
+    """
+
+    def __init__(self):
+        self._guilds = {}
+        self._display_names = {}
+        self._timings = {}
+        self.built_at = None
+
+    @staticmethod
+    def _member_keys(member):
+        names = (
+            getattr(member, "display_name", None),
+            getattr(member, "name", None),
+            getattr(member, "global_name", None),
+        )
+        return tuple({name.casefold() for name in names if name})
+
+    def build(self, guilds):
+        started = time.perf_counter()
+        self._guilds = {}
+        self._display_names = {}
+        for guild in guilds:
+            for member in guild.members:
+                self.add_member(member)
+        self.built_at = time.time()
+        self._record("build", time.perf_counter() - started)
+
+    def add_member(self, member):
+        guild_index = self._guilds.setdefault(member.guild.id, _GuildIndex())
+        guild_index.add(member.id, self._member_keys(member))
+        self._display_names[member.id] = member.display_name or member.name
+
+    def remove_member(self, member):
+        guild_index = self._guilds.get(member.guild.id)
+        if guild_index:
+            guild_index.remove(member.id)
+        self._display_names.pop(member.id, None)
+
+    def is_ready(self, guild_id):
+        return guild_id in self._guilds
+
+    def find(self, guild, argument):
+        """Return the member whose name is, or else starts with, ``argument``."""
+        started = time.perf_counter()
+        guild_index = self._guilds.get(guild.id)
+        member = None
+        if guild_index:
+            key = argument.casefold()
+            member_id = guild_index.exact(key)
+            if member_id is None:
+                member_id = guild_index.prefix(key)
+            member = guild.get_member(member_id) if member_id is not None else None
+        self._record("find", time.perf_counter() - started)
+        return member
+
+    def display_name(self, discord_id):
+        started = time.perf_counter()
+        name = self._display_names.get(int(discord_id))
+        self._record("display_name", time.perf_counter() - started)
+        return name
+
+    def _record(self, kind, seconds):
+        count, total, worst = self._timings.get(kind, (0, 0.0, 0.0))
+        self._timings[kind] = (count + 1, total + seconds, max(worst, seconds))
+
+    def stats(self):
+        return {
+            "guilds": len(self._guilds),
+            "members": len(self._display_names),
+            "keys": sum(len(index.sorted_keys) for index in self._guilds.values()),
+            "built_at": self.built_at,
+            "timings": {
+                kind: {"count": count, "mean_us": total / count * 1e6, "max_us": worst * 1e6}
+                for kind, (count, total, worst) in self._timings.items()
+            },
+        }
+
+
+member_index = MemberIndex()
@@ -0,0 +1,117 @@
+# utils/metrics.py
+
+import functools
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+
+
+# Percentiles are computed over the most recent samples of each metric so a
+# slow startup period does not dominate the numbers forever.
+METRICS_SAMPLE_WINDOW = 1024
+METRICS_DUMP_PATH = os.getenv("METRICS_DUMP_PATH", "")
+METRICS_DUMP_INTERVAL_SECONDS = int(os.getenv("METRICS_DUMP_INTERVAL_SECONDS", "3600"))
+
+
+def percentile(values, percent):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(percent / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class _Metric:
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.samples = deque(maxlen=METRICS_SAMPLE_WINDOW)
+
+    def record(self, seconds, error):
+        self.count += 1
+        self.errors += int(bool(error))
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.samples.append(seconds)
+
+    def summary(self):
+        samples = list(self.samples)
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "mean_ms": self.total_seconds / self.count * 1000 if self.count else 0.0,
+            "p50_ms": percentile(samples, 50) * 1000,
+            "p95_ms": percentile(samples, 95) * 1000,
+            "p99_ms": percentile(samples, 99) * 1000,
+            "max_ms": self.max_seconds * 1000,
+            "total_s": self.total_seconds,
+        }
+
+
+class MetricsRegistry:
+    """Latency and error counters for commands and db queries, grouped by kind."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+
+    def record(self, kind, name, seconds, error=False):
+        # db functions also run in worker threads via single_flight.
+        with self._lock:
+            metric = self._metrics.get((kind, name))
+            if metric is None:
+                metric = self._metrics[(kind, name)] = _Metric()
+            metric.record(seconds, error)
+
+    def snapshot(self, kind=None):
+        with self._lock:
+            return {
+                f"{metric_kind}:{name}": metric.summary()
+                for (metric_kind, name), metric in self._metrics.items()
+                if kind is None or metric_kind == kind
+            }
+
+    def top(self, kind=None, sort_key="p95_ms", limit=10):
+        rows = sorted(self.snapshot(kind).items(), key=lambda item: item[1][sort_key], reverse=True)
+        return rows[:limit]
+
+    def reset(self):
+        with self._lock:
+            self._metrics.clear()
+            self.started_at = time.time()
+
+    def dump(self, path):
+        """Append one JSON line with the current snapshot, for offline analysis."""
+        line = json.dumps({"at": int(time.time()), "since": int(self.started_at), "metrics": self.snapshot()})
+        with open(path, "a", encoding="utf-8") as dump_file:
+            dump_file.write(line + "\n")
+
+
+metrics = MetricsRegistry()
+
+
+def instrumented(kind):
+    """Record call latency and exceptions of a synchronous function under ``kind``."""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            error = False
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                error = True
+                raise
+            finally:
+                metrics.record(kind, func.__name__, time.perf_counter() - started, error)
+
+        return wrapper
+
+    return decorator
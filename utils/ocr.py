@@ -0,0 +1,174 @@
+# utils/ocr.py
+
+import gc
+import os
+import re
+import time
+
+from utils.memory import current_rss_bytes, release_freed_memory
+
+
+OCR_MATCH_ID_RE = re.compile(r"\bID\s*[:#-]?\s*(\d{9,12})(?!\d)", re.IGNORECASE)
+OCR_STANDALONE_MATCH_ID_RE = re.compile(r"(?<!\d)(\d{9,12})(?!\d)")
+OCR_TEXT_ALLOWLIST = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789:/().- "
+# Vertical centres (as a fraction of image height) of the header strips that
+# may contain the "ID: <match id>" line, tried in a single recognition pass.
+OCR_HEADER_STRIP_RATIOS = (0.045, 0.06, 0.075, 0.09, 0.105, 0.12, 0.135, 0.15)
+OCR_FALLBACK_STRIP_RATIOS = (0.015, 0.03)
+OCR_STRIP_X_RANGE = (0.12, 0.45)
+OCR_STRIP_HALF_HEIGHT_RATIO = 0.0175
+
+
+class MatchIdReader:
+    """Reads match IDs from scoreboard screenshots with EasyOCR.
+
+    Has no Discord dependency, so tools can run OCR without importing the
+    bot. The model is loaded on first use and can be unloaded again; callers
+    that share one instance across threads must serialize those calls.
+    """
+
+    def __init__(self):
+        self.reader = None
+        self.last_used = time.monotonic()
+        self.load_count = 0
+        self.unload_count = 0
+        self.last_load_seconds = None
+        self.last_unload = None
+
+    @property
+    def loaded(self):
+        return self.reader is not None
+
+    def load(self):
+        # EasyOCR imports PyTorch, so keep it lazy to avoid spending hundreds of
+        # megabytes until the model is actually needed.
+        os.environ.setdefault("OMP_NUM_THREADS", "1")
+        os.environ.setdefault("MKL_NUM_THREADS", "1")
+
+        import cv2
+        import easyocr
+        import torch
+
+        self.last_used = time.monotonic()
+        if self.reader is None:
+            load_started = time.perf_counter()
+            torch.set_num_threads(1)
+            try:
+                torch.set_num_interop_threads(1)
+            except RuntimeError:
+                pass
+
+            if hasattr(torch.backends, "nnpack") and hasattr(torch.backends.nnpack, "set_flags"):
+                torch.backends.nnpack.set_flags(False)
+            cv2.setNumThreads(1)
+
+            self.reader = easyocr.Reader(
+                ["en"],
+                gpu=False,
+                detector=False,
+                recognizer=True,
+                quantize=True,
+                verbose=False,
+            )
+            self.last_load_seconds = time.perf_counter() - load_started
+            self.load_count += 1
+            if self.load_count > 1:
+                print(f"Reloaded EasyOCR in {self.last_load_seconds:.1f}s.")
+
+        return self.reader
+
+    def unload(self):
+        if self.reader is None:
+            return
+        rss_before = current_rss_bytes()
+        self.reader = None
+        gc.collect()
+        release_freed_memory()
+        self.unload_count += 1
+        self.last_unload = {
+            "at": time.time(),
+            "rss_before": rss_before,
+            "rss_after": current_rss_bytes(),
+        }
+
+    def get_match_id(self, img):
+        import cv2
+
+        reader = self.load()
+
+        image = cv2.imread(img, cv2.IMREAD_GRAYSCALE)
+        if image is None:
+            raise ValueError("Could not read the screenshot image.")
+
+        height, width = image.shape[:2]
+
+        # Cropped ID attachments do not include the literal "ID" label. Only
+        # allow a standalone number when the image itself is a small crop so a
+        # scoreboard stat cannot be mistaken for the match ID.
+        if width <= 1200 and height <= 300:
+            texts = reader.recognize(
+                image,
+                decoder="greedy",
+                batch_size=1,
+                workers=0,
+                detail=0,
+                allowlist="0123456789",
+            )
+            compact_text = "".join(texts).replace(" ", "")
+            found_id = OCR_STANDALONE_MATCH_ID_RE.fullmatch(compact_text)
+            match_id = int(found_id.group(1)) if found_id else None
+            if match_id is not None:
+                return match_id
+
+        # Recognition-only OCR avoids loading EasyOCR's large text detector.
+        # The match metadata occupies one of these overlapping header strips.
+        results = self._recognize_match_id_strips(reader, image, OCR_HEADER_STRIP_RATIOS)
+        match_id = self._find_best_ocr_match_id(results)
+        if match_id is not None:
+            return match_id
+
+        # Some screenshots are cropped through the top of the Victory heading,
+        # moving the metadata line above the normal range.
+        results = self._recognize_match_id_strips(reader, image, OCR_FALLBACK_STRIP_RATIOS)
+        return self._find_best_ocr_match_id(results)
+
+    @staticmethod
+    def _recognize_match_id_strips(reader, image, height_ratios):
+        height, width = image.shape[:2]
+        x_start = int(width * OCR_STRIP_X_RANGE[0])
+        x_end = int(width * OCR_STRIP_X_RANGE[1])
+        half_height = max(14, int(height * OCR_STRIP_HALF_HEIGHT_RATIO))
+        boxes = []
+        for ratio in height_ratios:
+            center = int(height * ratio)
+            boxes.append(
+                [
+                    x_start,
+                    x_end,
+                    max(0, center - half_height),
+                    min(height, center + half_height),
+                ]
+            )
+
+        return reader.recognize(
+            image,
+            horizontal_list=boxes,
+            free_list=[],
+            decoder="greedy",
+            batch_size=1,
+            workers=0,
+            detail=1,
+            allowlist=OCR_TEXT_ALLOWLIST,
+        )
+
+    @staticmethod
+    def _find_best_ocr_match_id(results):
+        candidates = []
+        for _, text, confidence in results:
+            for found_id in OCR_MATCH_ID_RE.finditer(text):
+                candidates.append((confidence, int(found_id.group(1))))
+
+        if not candidates:
+            return None
+
+        return max(candidates, key=lambda candidate: candidate[0])[1]
@@ -0,0 +1,149 @@
+# utils/query_engine.py
+
+import csv
+import gzip
+import io
+import os
+import sqlite3
+import tempfile
+import time
+
+import db
+from utils.metrics import instrumented
+from utils.query_trace import connect
+
+
+QUERY_TIMEOUT_SECONDS = float(os.getenv("QUERY_TIMEOUT_SECONDS", "5"))
+QUERY_MAX_ROWS = int(os.getenv("QUERY_MAX_ROWS", "100000"))
+# Measured on the uncompressed CSV, so the cap bounds the work, not just the upload.
+QUERY_MAX_BYTES = int(os.getenv("QUERY_MAX_BYTES", str(16 * 1024 * 1024)))
+QUERY_PREVIEW_ROWS = 25
+FETCH_BATCH_ROWS = 500
+# SQLite VM instructions between deadline checks.
+PROGRESS_CHECK_INSTRUCTIONS = 10_000
+
+READ_ACTIONS = {
+    sqlite3.SQLITE_SELECT,
+    sqlite3.SQLITE_READ,
+    sqlite3.SQLITE_FUNCTION,
+    sqlite3.SQLITE_RECURSIVE,
+}
+# Pragmas that only report on the schema: the first set takes a table or index
+# name, the second is allowed only without a value, i.e. when reading it.
+SCHEMA_PRAGMAS = {"table_info", "table_xinfo", "table_list", "index_list", "index_info", "index_xinfo", "foreign_key_list"}
+READ_PRAGMAS = {"user_version", "page_count", "page_size", "freelist_count"}
+
+
+class QueryTimeout(Exception):
+    pass
+
+
+class QueryResult:
+    """Columns, the first rows for an inline preview, and the whole result as gzipped CSV.
+
+    ``csv_file`` is a temporary file positioned at the start; call :meth:`close`
+    once it has been sent.
+    """
+
+    def __init__(self, columns, preview, row_count, truncated, elapsed, csv_file, csv_bytes):
+        self.columns = columns
+        self.preview = preview
+        self.row_count = row_count
+        self.truncated = truncated
+        self.elapsed = elapsed
+        self.csv_file = csv_file
+        self.csv_bytes = csv_bytes
+
+    @property
+    def complete_preview(self):
+        return not self.truncated and self.row_count <= len(self.preview)
+
+    def close(self):
+        self.csv_file.close()
+
+
+def _authorize(action, arg1, arg2, db_name, trigger):
+    if action in READ_ACTIONS:
+        return sqlite3.SQLITE_OK
+    if action == sqlite3.SQLITE_PRAGMA:
+        pragma = (arg1 or "").lower()
+        if pragma in SCHEMA_PRAGMAS or (pragma in READ_PRAGMAS and arg2 is None):
+            return sqlite3.SQLITE_OK
+    # Writes are already impossible on a mode=ro connection; this also stops
+    # ATTACH (which could create files) and pragmas that change the connection.
+    return sqlite3.SQLITE_DENY
+
+
+def _open_read_only(path):
+    conn = connect(f"file:{path}?mode=ro", uri=True)
+    conn.set_authorizer(_authorize)
+    return conn
+
+
+@instrumented("db")
+def run_readonly_query(sql_query, path=None, timeout=QUERY_TIMEOUT_SECONDS, max_rows=QUERY_MAX_ROWS, max_bytes=QUERY_MAX_BYTES):
+    """Run one statement on a read-only connection and stream its rows into a gzipped CSV.
+
+    Raises :class:`QueryTimeout` once ``timeout`` seconds pass and
+    ``sqlite3.Error`` for invalid or refused SQL. Reading stops after
+    ``max_rows`` rows or ``max_bytes`` of CSV; ``truncated`` says which.
+    """
+    started = time.monotonic()
+    deadline = started + timeout
+    conn = _open_read_only(path or db.DATABASE_PATH)
+    # Checked inside SQLite's VM, so a runaway join or recursive CTE is
+    # interrupted mid-statement rather than after it finishes.
+    conn.set_progress_handler(lambda: int(time.monotonic() > deadline), PROGRESS_CHECK_INSTRUCTIONS)
+
+    csv_file = tempfile.TemporaryFile()
+    try:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(sql_query)
+            columns = [column[0] for column in cursor.description or ()]
+            preview = []
+            row_count = 0
+            csv_bytes = 0
+            truncated = None
+            with gzip.GzipFile(fileobj=csv_file, mode="wb") as gzipped:
+                text = io.StringIO()
+                writer = csv.writer(text)
+                if columns:
+                    writer.writerow(columns)
+                while columns and truncated is None:
+                    rows = cursor.fetchmany(FETCH_BATCH_ROWS)
+                    if not rows:
+                        break
+                    for row in rows:
+                        if row_count >= max_rows:
+                            truncated = f"row limit of {max_rows}"
+                            break
+                        writer.writerow(row)
+                        if len(preview) < QUERY_PREVIEW_ROWS:
+                            preview.append(row)
+                        row_count += 1
+                    chunk = text.getvalue().encode("utf-8")
+                    text.seek(0)
+                    text.truncate()
+                    csv_bytes += len(chunk)
+                    gzipped.write(chunk)
+                    if csv_bytes >= max_bytes and truncated is None:
+                        truncated = f"size limit of {max_bytes // 1024} KB"
+                if text.tell():
+                    chunk = text.getvalue().encode("utf-8")
+                    csv_bytes += len(chunk)
+                    gzipped.write(chunk)
+        except sqlite3.OperationalError as e:
+            if time.monotonic() > deadline and "interrupted" in str(e):
+                raise QueryTimeout(f"Query stopped after {timeout:g}s.") from e
+            raise
+        finally:
+            cursor.close()
+    except BaseException:
+        csv_file.close()
+        raise
+    finally:
+        conn.close()
+
+    csv_file.seek(0)
+    return QueryResult(columns, preview, row_count, truncated, time.monotonic() - started, csv_file, csv_bytes)
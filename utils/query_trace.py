@@ -0,0 +1,325 @@
+# utils/query_trace.py
+
+import hashlib
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+
+
+QUERY_TRACE_ENABLED = os.getenv("QUERY_TRACE", "1") != "0"
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "100"))
+# Slow queries are logged to their own file so writing a log row never waits
+# on (or extends) a write transaction held against match_data.db.
+SLOW_QUERY_LOG_PATH = os.getenv("SLOW_QUERY_LOG_PATH", "query_log.db")
+SLOW_QUERY_LOG_MAX_ROWS = 5000
+EXPLAINABLE_STATEMENTS = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE", "REPLACE")
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_STRING_LITERAL_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST_RE = re.compile(r"\?(?:\s*,\s*\?)+")
+
+
+def normalize_sql(sql):
+    """Collapse a statement to its shape: literals become ``?`` and ``IN (?, ?, ...)`` lists become ``?+``."""
+    shape = _WHITESPACE_RE.sub(" ", sql).strip().rstrip(";").strip()
+    shape = _STRING_LITERAL_RE.sub("?", shape)
+    shape = _NUMBER_LITERAL_RE.sub("?", shape)
+    return _PLACEHOLDER_LIST_RE.sub("?+", shape)
+
+
+def shape_hash(normalized_sql):
+    return hashlib.sha1(normalized_sql.encode("utf-8")).hexdigest()[:12]
+
+
+def parameter_shape(params):
+    """Describe bound parameters by type, with runs collapsed, e.g. ``int, str x3``."""
+    if not params:
+        return ""
+    if isinstance(params, dict):
+        return ", ".join(f"{key}:{type(value).__name__}" for key, value in sorted(params.items()))
+    runs = []
+    for value in params:
+        name = type(value).__name__
+        if runs and runs[-1][0] == name:
+            runs[-1][1] += 1
+        else:
+            runs.append([name, 1])
+    return ", ".join(name if count == 1 else f"{name} x{count}" for name, count in runs)
+
+
+def format_query_plan(rows):
+    """Render ``EXPLAIN QUERY PLAN`` rows as an indented tree."""
+    depths = {0: -1}
+    lines = []
+    for node_id, parent_id, _, detail in rows:
+        depth = depths.get(parent_id, -1) + 1
+        depths[node_id] = depth
+        lines.append(f"{'  ' * depth}{detail}")
+    return "\n".join(lines)
+
+
+class QueryTracer:
+    """Per-shape timings for every traced statement, plus a log of slow ones with their plans."""
+
+    def __init__(self, threshold_ms=SLOW_QUERY_THRESHOLD_MS, log_path=SLOW_QUERY_LOG_PATH):
+        self.threshold_ms = threshold_ms
+        self.log_path = log_path
+        self._shapes = {}
+        self._lock = threading.Lock()
+        self._log_ready = False
+        self.slow_logged = 0
+
+    def record(self, connection, trace):
+        elapsed_ms = trace["elapsed"] * 1000
+        normalized = normalize_sql(trace["sql"])
+        digest = shape_hash(normalized)
+        with self._lock:
+            shape = self._shapes.get(digest)
+            if shape is None:
+                shape = self._shapes[digest] = {
+                    "sql": normalized,
+                    "caller": trace["caller"],
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "rows": 0,
+                    "slow": 0,
+                }
+            shape["count"] += 1
+            shape["total_ms"] += elapsed_ms
+            shape["max_ms"] = max(shape["max_ms"], elapsed_ms)
+            shape["rows"] += trace["rows"]
+            if elapsed_ms >= self.threshold_ms:
+                shape["slow"] += 1
+
+        if elapsed_ms >= self.threshold_ms:
+            plan = self._explain(connection, trace["sql"], trace["params"])
+            self._log_slow_query(digest, normalized, trace, elapsed_ms, plan)
+
+    @staticmethod
+    def _explain(connection, sql, params):
+        if not sql.lstrip().upper().startswith(EXPLAINABLE_STATEMENTS):
+            return ""
+        # A plain cursor, so the plan lookup is not traced itself.
+        cursor = sqlite3.Connection.cursor(connection)
+        try:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            return format_query_plan(cursor.fetchall())
+        except sqlite3.Error as e:
+            return f"(plan unavailable: {e})"
+        finally:
+            cursor.close()
+
+    def _log_connection(self):
+        conn = sqlite3.connect(self.log_path, timeout=1)
+        if not self._log_ready:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS slow_query_log (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    shape_hash TEXT NOT NULL,
+                    sql TEXT NOT NULL,
+                    param_shape TEXT,
+                    caller TEXT,
+                    rows INTEGER,
+                    elapsed_ms REAL NOT NULL,
+                    query_plan TEXT,
+                    logged_at INTEGER NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_slow_query_log_shape ON slow_query_log(shape_hash);")
+            conn.commit()
+            self._log_ready = True
+        return conn
+
+    def _log_slow_query(self, digest, normalized, trace, elapsed_ms, plan):
+        try:
+            conn = self._log_connection()
+        except sqlite3.Error as e:
+            print(f"Could not open slow query log {self.log_path}: {e}")
+            return
+        try:
+            conn.execute(
+                """
+                INSERT INTO slow_query_log (shape_hash, sql, param_shape, caller, rows, elapsed_ms, query_plan, logged_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?);
+                """,
+                (
+                    digest,
+                    normalized,
+                    parameter_shape(trace["params"]),
+                    trace["caller"],
+                    trace["rows"],
+                    round(elapsed_ms, 3),
+                    plan,
+                    int(time.time()),
+                ),
+            )
+            conn.execute(
+                "DELETE FROM slow_query_log WHERE id <= (SELECT MAX(id) FROM slow_query_log) - ?;",
+                (SLOW_QUERY_LOG_MAX_ROWS,),
+            )
+            conn.commit()
+            self.slow_logged += 1
+        except sqlite3.Error as e:
+            print(f"Could not write slow query log entry: {e}")
+        finally:
+            conn.close()
+
+    def slowest_shapes(self, limit=10):
+        """Logged slow query shapes, slowest first, each with its most recent plan."""
+        if not os.path.exists(self.log_path):
+            return []
+        conn = self._log_connection()
+        conn.row_factory = sqlite3.Row
+        try:
+            rows = conn.execute(
+                """
+                SELECT
+                    shape_hash,
+                    COUNT(*) AS hits,
+                    MAX(elapsed_ms) AS max_ms,
+                    AVG(elapsed_ms) AS avg_ms,
+                    MAX(logged_at) AS last_seen
+                FROM slow_query_log
+                GROUP BY shape_hash
+                ORDER BY max_ms DESC
+                LIMIT ?;
+                """,
+                (limit,),
+            ).fetchall()
+            shapes = []
+            for row in rows:
+                latest = conn.execute(
+                    """
+                    SELECT sql, param_shape, caller, rows, query_plan
+                    FROM slow_query_log
+                    WHERE shape_hash = ?
+                    ORDER BY id DESC
+                    LIMIT 1;
+                    """,
+                    (row["shape_hash"],),
+                ).fetchone()
+                shapes.append({**dict(row), **dict(latest)})
+            return shapes
+        finally:
+            conn.close()
+
+    def clear(self):
+        with self._lock:
+            self._shapes.clear()
+        if os.path.exists(self.log_path):
+            conn = self._log_connection()
+            try:
+                conn.execute("DELETE FROM slow_query_log;")
+                conn.commit()
+            finally:
+                conn.close()
+
+    def stats(self):
+        with self._lock:
+            shapes = {digest: dict(shape) for digest, shape in self._shapes.items()}
+        return {
+            "threshold_ms": self.threshold_ms,
+            "shapes": len(shapes),
+            "statements": sum(shape["count"] for shape in shapes.values()),
+            "slow_logged": self.slow_logged,
+            "by_total": sorted(shapes.items(), key=lambda item: item[1]["total_ms"], reverse=True),
+        }
+
+
+query_tracer = QueryTracer()
+
+
+class TracedCursor(sqlite3.Cursor):
+    """Cursor that times each statement, including the fetches that read its rows.
+
+    A statement's trace is finished when the cursor runs its next statement or
+    when the cursor or its connection is closed.
+    """
+
+    _trace = None
+
+    def execute(self, sql, parameters=()):
+        self._finish_trace()
+        trace = {
+            "sql": sql,
+            "params": parameters,
+            "rows": 0,
+            "caller": sys._getframe(1).f_code.co_name,
+            "elapsed": 0.0,
+        }
+        started = time.perf_counter()
+        try:
+            super().execute(sql, parameters)
+        finally:
+            trace["elapsed"] = time.perf_counter() - started
+            self._trace = trace
+        return self
+
+    def _timed_fetch(self, fetch, *args):
+        started = time.perf_counter()
+        result = fetch(*args)
+        if self._trace is not None:
+            self._trace["elapsed"] += time.perf_counter() - started
+            if isinstance(result, list):
+                self._trace["rows"] += len(result)
+            elif result is not None:
+                self._trace["rows"] += 1
+        return result
+
+    def fetchone(self):
+        return self._timed_fetch(super().fetchone)
+
+    def fetchmany(self, *args):
+        return self._timed_fetch(super().fetchmany, *args)
+
+    def fetchall(self):
+        return self._timed_fetch(super().fetchall)
+
+    def _finish_trace(self):
+        trace, self._trace = self._trace, None
+        if trace is None:
+            return
+        if trace["rows"] == 0 and self.rowcount > 0:
+            trace["rows"] = self.rowcount
+        try:
+            query_tracer.record(self.connection, trace)
+        except Exception as e:
+            print(f"Query trace failed: {e}")
+
+    def close(self):
+        self._finish_trace()
+        super().close()
+
+
+class TracedConnection(sqlite3.Connection):
+    """Connection whose cursors (including ``conn.execute``) are :class:`TracedCursor`."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._traced_cursors = []
+
+    def cursor(self, factory=TracedCursor):
+        cursor = super().cursor(factory)
+        if isinstance(cursor, TracedCursor):
+            self._traced_cursors.append(cursor)
+        return cursor
+
+    def close(self):
+        for cursor in self._traced_cursors:
+            cursor._finish_trace()
+        self._traced_cursors.clear()
+        super().close()
+
+
+def connect(path, **kwargs):
+    """``sqlite3.connect`` with statement tracing unless ``QUERY_TRACE=0``."""
+    if QUERY_TRACE_ENABLED:
+        kwargs.setdefault("factory", TracedConnection)
+    return sqlite3.connect(path, **kwargs)
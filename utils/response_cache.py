@@ -0,0 +1,122 @@
+# utils/response_cache.py
+
+import os
+import time
+from collections import OrderedDict
+
+import discord
+
+from db import MatchFilters, get_data_generation
+from utils.assets import champion_icon_file
+
+
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "256"))
+# Upper bound on staleness for things the data generation does not track,
+# such as member nicknames and avatars baked into a rendered embed.
+RESPONSE_CACHE_TTL_SECONDS = int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "600"))
+# Filters passed as plain dicts may carry unsnapped "last 7d" bounds, so
+# time bounds are bucketed in the key to let repeat requests share an entry.
+TIME_KEY_BUCKET_SECONDS = 60
+TIME_FILTER_KEYS = {"registered_after", "registered_before"}
+
+
+def freeze_key(value):
+    if isinstance(value, dict):
+        return tuple(sorted((key, freeze_key(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = [freeze_key(item) for item in value]
+        return tuple(sorted(items, key=repr) if isinstance(value, (set, frozenset)) else items)
+    return value
+
+
+def canonical_filters(filters):
+    if not filters:
+        return ()
+    if isinstance(filters, MatchFilters):
+        # Already normalized, with relative periods snapped when parsed.
+        return filters
+    canonical = dict(filters)
+    for key in TIME_FILTER_KEYS & set(canonical):
+        if canonical[key] is not None:
+            canonical[key] = int(canonical[key]) // TIME_KEY_BUCKET_SECONDS
+    return freeze_key(canonical)
+
+
+def response_key(command, *parts, filters=None):
+    """Canonical cache key shared by the prefix and slash variants of a command.
+
+    The data generation is part of the key so a response rendered from a
+    query that raced with a write is never served after that write.
+    """
+    return (command, freeze_key(parts), canonical_filters(filters), get_data_generation())
+
+
+class ResponseCache:
+    """LRU of rendered embeds, dropped wholesale whenever match data changes."""
+
+    def __init__(self, max_entries=RESPONSE_CACHE_MAX_ENTRIES, ttl_seconds=RESPONSE_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._generation = get_data_generation()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.seconds_saved = 0.0
+
+    def _check_generation(self):
+        generation = get_data_generation()
+        if generation != self._generation:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._generation = generation
+
+    def get(self, key):
+        self._check_generation()
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry["stored_at"] > self.ttl_seconds:
+            self._entries.pop(key, None)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        self.seconds_saved += entry["render_seconds"]
+        return entry
+
+    def put(self, key, embed, icon=None, render_seconds=0.0):
+        """Store ``embed`` and an optional ``(champion_name, filename)`` icon reference."""
+        self._check_generation()
+        self._entries[key] = {
+            "embed": embed.to_dict(),
+            "icon": icon,
+            "render_seconds": render_seconds,
+            "stored_at": time.monotonic(),
+        }
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def send_cached(self, ctx, key):
+        """Send the cached response for ``key`` and return True, or return False on a miss."""
+        entry = self.get(key)
+        if entry is None:
+            return False
+        embed = discord.Embed.from_dict(entry["embed"])
+        icon_file = champion_icon_file(*entry["icon"]) if entry["icon"] else None
+        await ctx.send(embed=embed, file=icon_file)
+        return True
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups * 100 if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "seconds_saved": self.seconds_saved,
+        }
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,58 @@
+# utils/single_flight.py
+
+import asyncio
+import copy
+
+from db import get_data_generation
+from utils.response_cache import freeze_key
+
+
+class SingleFlight:
+    """Runs read queries off the event loop, sharing one run among identical concurrent calls.
+
+    The key includes the db data generation at call time, so a caller that
+    arrives after a write never joins a computation started before it.
+    """
+
+    def __init__(self):
+        self._in_flight = {}
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+        self.coalesced_by_function = {}
+
+    def _key(self, func, args, kwargs):
+        return (func.__module__, func.__qualname__, freeze_key(args), freeze_key(kwargs), get_data_generation())
+
+    async def run(self, func, *args, **kwargs):
+        self.calls += 1
+        key = self._key(func, args, kwargs)
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            self.coalesced_by_function[func.__name__] = self.coalesced_by_function.get(func.__name__, 0) + 1
+            # Callers format and sometimes mutate rows, so joiners get a copy.
+            return copy.deepcopy(await asyncio.shield(future))
+
+        self.executions += 1
+        future = asyncio.ensure_future(asyncio.to_thread(func, *args, **kwargs))
+        self._in_flight[key] = future
+        try:
+            return await asyncio.shield(future)
+        finally:
+            if future.done() and self._in_flight.get(key) is future:
+                del self._in_flight[key]
+            elif not future.done():
+                future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+
+    def stats(self):
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._in_flight),
+            "coalesced_by_function": dict(self.coalesced_by_function),
+        }
+
+
+single_flight = SingleFlight()
@@ -0,0 +1,203 @@
+# utils/snapshot.py
+
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+
+
+# Heavy reads (leaderboards, pick rates, matchup tables) run against a copy of
+# match_data.db made with SQLite's online backup API, so they never hold a read
+# lock on the file ingest writes to. Set ANALYTICS_SNAPSHOT_PATH to "" to read
+# everything from the live database.
+ANALYTICS_SNAPSHOT_PATH = os.getenv("ANALYTICS_SNAPSHOT_PATH", "match_data_snapshot.db")
+# Refresh after this many writes, or this long after the first write the
+# snapshot does not have yet, whichever comes first.
+SNAPSHOT_REFRESH_INGESTS = int(os.getenv("SNAPSHOT_REFRESH_INGESTS", "3"))
+SNAPSHOT_REFRESH_SECONDS = int(os.getenv("SNAPSHOT_REFRESH_SECONDS", "300"))
+# Reads fall back to the live database once the snapshot misses a write older
+# than this.
+SNAPSHOT_MAX_STALENESS_SECONDS = int(os.getenv("SNAPSHOT_MAX_STALENESS_SECONDS", "600"))
+SNAPSHOT_POLL_SECONDS = 5
+# Pages copied per backup step; the source is only locked during a step.
+SNAPSHOT_BACKUP_PAGES = 1024
+
+# Run on the copy only, so none of it costs the ingest writer anything.
+# player_match_shares is MatchShares from db._match_shares_ctes computed once
+# for every row; team totals and shares are what the unfiltered leaderboards
+# spend most of their time on.
+SNAPSHOT_BUILD_SQL = """
+    CREATE TABLE player_match_shares AS
+    WITH TeamTotals AS (
+        SELECT
+            match_id,
+            team,
+            SUM(kills + assists) AS team_kill_participations,
+            SUM(damage) AS team_damage
+        FROM player_stats
+        GROUP BY match_id, team
+    )
+    SELECT
+        ps.*,
+        tt.team_kill_participations,
+        tt.team_damage,
+        COALESCE(ott.team_damage, 0) AS enemy_team_damage,
+        CASE WHEN tt.team_kill_participations > 0 THEN CAST(ps.kills + ps.assists AS REAL) * 100.0 / tt.team_kill_participations ELSE 0 END AS kill_share,
+        CASE WHEN tt.team_damage > 0 THEN CAST(ps.damage AS REAL) * 100.0 / tt.team_damage ELSE 0 END AS damage_share
+    FROM player_stats ps
+    JOIN TeamTotals tt ON ps.match_id = tt.match_id AND ps.team = tt.team
+    LEFT JOIN TeamTotals ott ON ps.match_id = ott.match_id AND ps.team != ott.team;
+
+    CREATE INDEX idx_player_match_shares_match ON player_match_shares (match_id, team);
+    CREATE INDEX idx_player_match_shares_champ ON player_match_shares (champ);
+    CREATE INDEX idx_player_match_shares_player ON player_match_shares (player_id);
+
+    -- Matchup and pick rate tables join player_stats to itself and to players.
+    CREATE INDEX IF NOT EXISTS idx_player_stats_player_match ON player_stats (player_id, match_id, team, champ);
+    CREATE INDEX IF NOT EXISTS idx_player_stats_match_champ ON player_stats (match_id, champ, team);
+    CREATE INDEX IF NOT EXISTS idx_players_discord ON players (discord_id, player_id);
+
+    ANALYZE;
+"""
+
+
+class AnalyticsSnapshot:
+    """A read-optimized copy of the match database and how far behind it is.
+
+    Writers call :meth:`note_write`; :meth:`read_path` hands out the snapshot
+    only while every write it is missing is younger than ``max_staleness``.
+    :meth:`refresh` rebuilds it beside the old one and swaps it in, so readers
+    never see a half-built copy.
+    """
+
+    def __init__(
+        self,
+        path=ANALYTICS_SNAPSHOT_PATH,
+        refresh_ingests=SNAPSHOT_REFRESH_INGESTS,
+        refresh_seconds=SNAPSHOT_REFRESH_SECONDS,
+        max_staleness=SNAPSHOT_MAX_STALENESS_SECONDS,
+    ):
+        self.path = path
+        self.refresh_ingests = refresh_ingests
+        self.refresh_seconds = refresh_seconds
+        self.max_staleness = max_staleness
+        self.refreshed_at = None
+        self.last_refresh_seconds = None
+        self.refreshes = 0
+        self.failures = 0
+        self.last_error = None
+        self.last_failed_at = None
+        self.routed = 0
+        self.fallbacks = 0
+        self._ready = False
+        self._refreshing = False
+        self._writes = deque()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return bool(self.path)
+
+    def note_write(self):
+        with self._lock:
+            self._writes.append(time.monotonic())
+
+    def staleness(self):
+        """Seconds since the oldest write the snapshot does not include, 0 if none."""
+        with self._lock:
+            return time.monotonic() - self._writes[0] if self._writes else 0.0
+
+    def read_path(self):
+        """The snapshot path if it is fresh enough to read from, else ``None``."""
+        if not (self.enabled and self._ready) or self.staleness() > self.max_staleness:
+            if self.enabled:
+                self.fallbacks += 1
+            return None
+        self.routed += 1
+        return self.path
+
+    def refresh_due(self):
+        if not self.enabled or self._refreshing:
+            return False
+        # A failed copy is not retried on every poll; it reads the whole database.
+        if self.last_failed_at is not None and time.monotonic() - self.last_failed_at < self.refresh_seconds:
+            return False
+        if not self._ready:
+            return True
+        with self._lock:
+            pending = len(self._writes)
+        return pending >= self.refresh_ingests or (pending and self.staleness() >= self.refresh_seconds)
+
+    def refresh(self, source_path):
+        """Copy ``source_path`` with the backup API, build the analytic tables and swap it in.
+
+        Returns True when a new snapshot is in place. Runs in a worker thread.
+        """
+        with self._lock:
+            if self._refreshing:
+                return False
+            self._refreshing = True
+        started = time.perf_counter()
+        # Writes noted before the copy starts are certainly in it.
+        cutoff = time.monotonic()
+        building_path = f"{self.path}.building"
+        try:
+            if os.path.exists(building_path):
+                os.remove(building_path)
+            source = sqlite3.connect(f"file:{source_path}?mode=ro", uri=True)
+            target = sqlite3.connect(building_path)
+            try:
+                source.backup(target, pages=SNAPSHOT_BACKUP_PAGES)
+                target.executescript(SNAPSHOT_BUILD_SQL)
+                target.commit()
+            finally:
+                target.close()
+                source.close()
+            os.replace(building_path, self.path)
+        except (sqlite3.Error, OSError) as e:
+            self.failures += 1
+            self.last_error = str(e)
+            self.last_failed_at = time.monotonic()
+            print(f"Analytics snapshot refresh failed: {e}")
+            return False
+        finally:
+            self._refreshing = False
+
+        with self._lock:
+            while self._writes and self._writes[0] <= cutoff:
+                self._writes.popleft()
+        self._ready = True
+        self.refreshes += 1
+        self.refreshed_at = time.time()
+        self.last_refresh_seconds = time.perf_counter() - started
+        self.last_error = None
+        self.last_failed_at = None
+        return True
+
+    def stats(self):
+        with self._lock:
+            pending = len(self._writes)
+        try:
+            size = os.path.getsize(self.path) if self._ready else None
+        except OSError:
+            size = None
+        return {
+            "enabled": self.enabled,
+            "ready": self._ready,
+            "path": self.path,
+            "age_s": time.time() - self.refreshed_at if self.refreshed_at else None,
+            "refresh_ms": self.last_refresh_seconds * 1000 if self.last_refresh_seconds is not None else None,
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+            "last_error": self.last_error,
+            "pending_writes": pending,
+            "staleness_s": self.staleness(),
+            "max_staleness_s": self.max_staleness,
+            "routed": self.routed,
+            "fallbacks": self.fallbacks,
+            "size_bytes": size,
+        }
+
+
+analytics_snapshot = AnalyticsSnapshot()
@@ -1,5 +1,6 @@
 # utils/views.py
 
+import asyncio
 import discord
 from discord.ui import View, Button, Modal, TextInput, Select
 from db import (
@@ -188,7 +189,7 @@ class QueueNumModal(Modal):
                 return
 
             # Insert the data directly.
-            insert_scoreboard(match_data, int(queue_num))
+            await asyncio.to_thread(insert_scoreboard, match_data, int(queue_num))
             if match_data.get("is_complete", True):
                 await interaction.response.send_message(f"✅ Match {match_id} for queue {queue_num} successfully recorded.", ephemeral=True)
             else: